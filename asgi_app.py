@@ -0,0 +1,480 @@
+"""
+CipherSafe ASGI App (asgi_app.py)
+---------------------------------
+The routes of ``webapp.py`` on an event loop (Starlette), for serving many
+concurrent, slow or idle connections from one process.
+
+- Cipher work runs on a bounded thread pool, never on the event loop.
+- Pad and key-store I/O runs in worker threads as well.
+- When the cipher pool is saturated, new requests get 503 + Retry-After
+  immediately instead of queueing without bound; batch streams already
+  in progress wait for room, which throttles their uploads through TCP.
+- File uploads and downloads go through small bounded queues, so a slow
+  client stalls only its own request.
+
+Run with:
+    uvicorn asgi_app:app --workers 4
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+from src.steganography.lsb_stego import IMAGE_ERRORS, LSBSteganography
+from src.telemetry.metrics import metrics, HTTP_LATENCY, HTTP_REQUESTS, PAYLOAD_BYTES
+from src.web.errors import JobError
+from src.web.jobs import (decrypt_text, encrypt_text, open_decrypt_stream,
+                          open_encrypt_stream, parse_item, parse_items, run_chunk)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+stego = LSBSteganography()
+
+# Threads running cipher work, and jobs admitted (running + queued) before 503s
+CIPHER_WORKERS = os.cpu_count() or 1
+MAX_PENDING = 256
+# Concurrent file streams; each holds one thread while its client sends
+STREAM_WORKERS = 32
+# Batch items handled per encrypt_many/decrypt_many call while streaming
+BATCH_CHUNK = 256
+# Chunks buffered in each direction of a file stream
+STREAM_QUEUE = 4
+# Longest NDJSON batch line accepted (bytes); longer ones get a 413
+MAX_NDJSON_LINE = 1 << 20
+
+
+# ---------------------
+# Worker Pools
+# ---------------------
+
+class ServerBusy(Exception):
+    """Raised when a worker pool has no room for another job."""
+
+
+class WorkerPool:
+    """
+    Bounded thread pool for blocking work, with admission control.
+
+    At most ``workers`` jobs run at once and at most ``max_pending`` are
+    admitted (running or queued). Past that, ``run`` raises ``ServerBusy``
+    unless asked to wait for room.
+    """
+
+    def __init__(self, name, workers, max_pending):
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix=f"ciphersafe-{name}")
+        self.slots = asyncio.Semaphore(max_pending)
+
+    @property
+    def busy(self):
+        return self.slots.locked()
+
+    async def run(self, fn, *args, wait=False):
+        """Run ``fn(*args)`` on the pool and return its result."""
+        if not wait and self.busy:
+            raise ServerBusy()
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    app.state.cipher_pool = WorkerPool("cipher", CIPHER_WORKERS, MAX_PENDING)
+    app.state.stream_pool = WorkerPool("stream", STREAM_WORKERS, STREAM_WORKERS)
+    try:
+        yield
+    finally:
+        app.state.cipher_pool.shutdown()
+        app.state.stream_pool.shutdown()
+
+
+def _cipher_pool(request):
+    return request.app.state.cipher_pool
+
+
+class _StreamResponse(Response):
+    """
+    Streams an async body.
+
+    Unlike ``StreamingResponse`` it does not listen for disconnects on
+    ``receive``, since the request body is still being read while the
+    response streams.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def __init__(self, content, headers=None, media_type=None, on_close=None):
+        self.content = content
+        self.status_code = 200
+        self.background = None
+        self.on_close = on_close
+        if media_type is not None:
+            self.media_type = media_type
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({'type': 'http.response.start', 'status': self.status_code,
+                        'headers': self.raw_headers})
+            async for chunk in self.content:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode(self.charset)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if self.on_close is not None:
+                await self.on_close()
+
+
+# ---------------------
+# Single Messages
+# ---------------------
+
+async def _json_object(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise JobError('Expected a JSON object')
+    return data
+
+async def encrypt(request):
+    data = await _json_object(request)
+    result = await _cipher_pool(request).run(
+        encrypt_text, data.get('mode', 'vigenere'), data.get('text', ''), data.get('key', ''))
+    return JSONResponse(result)
+
+async def decrypt(request):
+    data = await _json_object(request)
+    result = await _cipher_pool(request).run(
+        decrypt_text, data.get('mode', 'vigenere'), data.get('text', ''), data.get('key', ''))
+    return JSONResponse(result)
+
+
+# ---------------------
+# Batch Endpoints
+# ---------------------
+
+def _check_line_length(length):
+    if length > MAX_NDJSON_LINE:
+        raise JobError(f'NDJSON line exceeds {MAX_NDJSON_LINE} bytes', status=413)
+
+async def _ndjson_items(request):
+    """
+    Yield request items from an NDJSON body as its lines arrive.
+
+    Only the newly received bytes are searched for a newline, and the
+    unfinished line carried between chunks is capped at MAX_NDJSON_LINE.
+    """
+    buffer = bytearray()
+    async for chunk in request.stream():
+        start = len(buffer)  # the carried-over tail has no newline
+        buffer += chunk
+        end = buffer.rfind(b'\n', start)
+        if end >= 0:
+            for line in bytes(buffer[:end]).split(b'\n'):
+                _check_line_length(len(line))
+                if line.strip():
+                    yield parse_item(line)
+            del buffer[:end + 1]
+        _check_line_length(len(buffer))
+    if buffer.strip():
+        yield parse_item(bytes(buffer))
+
+async def _item_chunks(request):
+    """Yield lists of (index, item) pairs of at most BATCH_CHUNK items."""
+    if request.headers.get('content-type', '').split(';')[0].strip() == 'application/x-ndjson':
+        chunk, index = [], 0
+        async for item in _ndjson_items(request):
+            chunk.append((index, item))
+            index += 1
+            if len(chunk) == BATCH_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    items = await _cipher_pool(request).run(parse_items, await request.body())
+    numbered = enumerate(items)
+    while chunk := list(islice(numbered, BATCH_CHUNK)):
+        yield chunk
+
+async def _stream_batch(request, operation):
+    """Stream NDJSON results for a batch request, chunk by chunk."""
+    pool = _cipher_pool(request)
+    chunks = _item_chunks(request)
+    # Run the first chunk now so a bad body or a full pool get a plain error
+    first = await anext(chunks, [])
+    first_results = await pool.run(run_chunk, operation, first)
+
+    async def generate():
+        for result in first_results:
+            yield json.dumps(result) + '\n'
+        try:
+            async for chunk in chunks:
+                for result in await pool.run(run_chunk, operation, chunk, wait=True):
+                    yield json.dumps(result) + '\n'
+        except JobError as exc:
+            # The status line has gone out; end the stream with the error instead
+            yield json.dumps({'error': str(exc)}) + '\n'
+
+    return _StreamResponse(generate())
+
+async def encrypt_batch(request):
+    return await _stream_batch(request, 'encrypt')
+
+async def decrypt_batch(request):
+    return await _stream_batch(request, 'decrypt')
+
+
+# ---------------------
+# File Endpoints
+# ---------------------
+
+class _EndOfJob(Exception):
+    """Stops a file job's worker thread once the response is closed."""
+
+
+class _FileJob:
+    """
+    Runs a blocking ``open_*_stream`` job on a stream-pool thread.
+
+    The event loop feeds upload chunks in and takes cipher output back
+    through queues of ``STREAM_QUEUE`` chunks, so memory per stream stays
+    bounded and a slow client only ever stalls its own thread.
+    """
+
+    def __init__(self, request, open_stream):
+        self.request = request
+        self.open_stream = open_stream
+        self.loop = asyncio.get_running_loop()
+        self.inbox = asyncio.Queue(STREAM_QUEUE)
+        self.outbox = asyncio.Queue(STREAM_QUEUE)
+        self.closed = threading.Event()
+
+    # Worker thread side
+
+    def _call(self, coroutine):
+        if self.closed.is_set():
+            coroutine.close()
+            raise _EndOfJob()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def _chunks(self):
+        while (chunk := self._call(self.inbox.get())) is not None:
+            yield chunk
+
+    def _work(self):
+        try:
+            stream, headers = self.open_stream(self._chunks())
+            # Run the cipher up to its first output so key errors still get a plain 400
+            first = list(islice(stream, 1))
+            self._call(self.outbox.put(headers))
+            for piece in chain(first, stream):
+                self._call(self.outbox.put(piece))
+            self._call(self.outbox.put(None))
+        except _EndOfJob:
+            pass
+        except Exception as exc:
+            if isinstance(exc, ValueError) and not isinstance(exc, JobError):
+                exc = JobError(str(exc))
+            with contextlib.suppress(_EndOfJob):
+                self._call(self.outbox.put(exc))
+
+    # Event loop side
+
+    async def _feed(self):
+        with contextlib.suppress(Exception):  # client went away: end the upload early
+            async for chunk in self.request.stream():
+                if chunk:
+                    await self.inbox.put(chunk)
+        await self.inbox.put(None)
+
+    async def _next(self):
+        item = await self.outbox.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    async def start(self, pool):
+        """Start the job; returns its response headers once output begins."""
+        if pool.busy:
+            raise ServerBusy()
+        self.feeder = asyncio.ensure_future(self._feed())
+        self.worker = asyncio.ensure_future(pool.run(self._work, wait=True))
+        try:
+            return await self._next()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def body(self):
+        while (piece := await self._next()) is not None:
+            yield piece
+
+    async def close(self):
+        """Stop the job, unblocking its thread if the client went away."""
+        self.closed.set()
+        self.feeder.cancel()
+        while not self.worker.done():
+            while not self.outbox.empty():
+                self.outbox.get_nowait()
+            if self.inbox.empty():
+                self.inbox.put_nowait(None)
+            await asyncio.wait({self.worker}, timeout=0.05)
+        if not self.worker.cancelled():
+            self.worker.exception()
+
+async def _file_response(request, open_stream, filename):
+    job = _FileJob(request, open_stream)
+    headers = await job.start(request.app.state.stream_pool)
+    headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return _StreamResponse(job.body(), headers=headers, media_type='application/octet-stream',
+                           on_close=job.close)
+
+async def encrypt_file(request):
+    """
+    Encrypt an uploaded file, streaming it in and the ciphertext out.
+
+    Same contract as ``/encrypt/file`` in ``webapp.py``.
+    """
+    length = request.headers.get('content-length')
+    return await _file_response(request, lambda chunks: open_encrypt_stream(
+        request.query_params.get('mode', 'vigenere'), chunks,
+        key=request.headers.get('X-Cipher-Key', ''), length=int(length) if length else None),
+        'encrypted.bin')
+
+async def decrypt_file(request):
+    """
+    Decrypt an uploaded file produced by ``/encrypt/file``.
+
+    Same contract as ``/decrypt/file`` in ``webapp.py``.
+    """
+    pad_ref = dict(request.query_params)
+    pad_ref.setdefault('length', request.headers.get('content-length'))
+    return await _file_response(request, lambda chunks: open_decrypt_stream(
+        request.query_params.get('mode', 'vigenere'), chunks,
+        key=request.headers.get('X-Cipher-Key', ''), pad_ref=pad_ref),
+        'decrypted.bin')
+
+
+# ---------------------
+# Steganography
+# ---------------------
+
+async def _upload(request, field):
+    form = await request.form()
+    image = form.get(field)
+    if image is None or isinstance(image, str):
+        raise JobError('Missing image upload')
+    return form, image
+
+async def stego_encode(request):
+    form, image = await _upload(request, 'image')
+    compress = form.get('compress', '').lower() in ('1', 'true', 'yes')
+    try:
+        stego_png = await _cipher_pool(request).run(
+            stego.encode_bytes, image.file, form.get('text', ''), compress)
+    except IMAGE_ERRORS as exc:
+        raise JobError(str(exc)) from None
+    return Response(stego_png, media_type='image/png',
+                    headers={'Content-Disposition': 'attachment; filename=stego.png'})
+
+async def stego_decode(request):
+    _, image = await _upload(request, 'image')
+    try:
+        message = await _cipher_pool(request).run(stego.decode_bytes, image.file)
+    except IMAGE_ERRORS as exc:
+        raise JobError(str(exc)) from None
+    return JSONResponse({'message': message})
+
+
+# ---------------------
+# Pages and Metrics
+# ---------------------
+
+templates = Jinja2Templates(directory=os.path.join(BASE_DIR, 'templates'))
+# index.html is shared with the Flask app, which spells it url_for('static', filename=...)
+templates.env.globals['url_for'] = lambda endpoint, filename='': f'/{endpoint}/{filename}'
+
+async def home(request):
+    return templates.TemplateResponse(request, 'index.html')
+
+async def metrics_endpoint(request):
+    text = await asyncio.to_thread(metrics.render)
+    return Response(text, media_type='text/plain; version=0.0.4')
+
+
+# ---------------------
+# Instrumentation
+# ---------------------
+
+class Instrumentation:
+    """ASGI middleware recording request counts, latency and body sizes."""
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.paths = {route.endpoint: route.path for route in routes if isinstance(route, Route)}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                route = self.paths.get(scope.get('endpoint'), 'unmatched')
+                method = scope['method']
+                HTTP_LATENCY.observe(time.perf_counter() - started, route=route, method=method)
+                HTTP_REQUESTS.inc(route=route, method=method, status=message['status'])
+                length = dict(scope['headers']).get(b'content-length')
+                if length is not None:
+                    PAYLOAD_BYTES.observe(int(length), route=route)
+                if metrics.multiprocess_dir:
+                    asyncio.get_running_loop().run_in_executor(None, metrics.flush)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def _job_error(request, exc):
+    return JSONResponse({'error': str(exc)}, exc.status)
+
+async def _server_busy(request, exc):
+    return JSONResponse({'error': 'Server busy, retry shortly'}, 503, headers={'Retry-After': '1'})
+
+
+routes = [
+    Route('/', home),
+    Route('/metrics', metrics_endpoint),
+    Route('/encrypt', encrypt, methods=['POST']),
+    Route('/decrypt', decrypt, methods=['POST']),
+    Route('/encrypt/batch', encrypt_batch, methods=['POST']),
+    Route('/decrypt/batch', decrypt_batch, methods=['POST']),
+    Route('/encrypt/file', encrypt_file, methods=['POST']),
+    Route('/decrypt/file', decrypt_file, methods=['POST']),
+    Route('/stego/encode', stego_encode, methods=['POST']),
+    Route('/stego/decode', stego_decode, methods=['POST']),
+    Mount('/static', StaticFiles(directory=os.path.join(BASE_DIR, 'static')), name='static'),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan,
+                exception_handlers={JobError: _job_error, ServerBusy: _server_busy})
+app.add_middleware(Instrumentation, routes=routes)
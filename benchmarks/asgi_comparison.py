@@ -0,0 +1,233 @@
+"""
+CipherSafe ASGI vs WSGI Comparison (asgi_comparison.py)
+-------------------------------------------------------
+Starts the Flask app under gunicorn (sync workers, the render.com setup)
+and the ASGI app under uvicorn on local ports, then drives each with the
+same load: many keep-alive clients posting small ``/encrypt`` requests,
+plus a few clients trickling slow uploads to ``/encrypt/file`` the way
+phones on a bad network do.
+
+Usage:
+    python -m benchmarks.asgi_comparison [--connections 200] [--slow 8] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "flask (gunicorn sync)": [sys.executable, "-m", "gunicorn", "--workers", "{workers}",
+                              "--bind", "127.0.0.1:{port}", "--log-level", "warning", "webapp:app"],
+    "asgi (uvicorn)": [sys.executable, "-m", "uvicorn", "--workers", "{workers}",
+                       "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning",
+                       "asgi_app:app"],
+}
+
+
+# ---------------------
+# Minimal HTTP/1.1 Client
+# ---------------------
+
+def build_request(method, path, body=b"", headers=None, length=None):
+    """Raw bytes of one HTTP/1.1 request (``length`` overrides Content-Length)."""
+    length = len(body) if length is None else length
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", f"Content-Length: {length}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def read_response(reader):
+    """
+    Read one response off a connection.
+
+    Returns:
+        tuple: (status, lower-cased headers dict, body bytes)
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        parts = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            data = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            parts.append(data[:-2])
+        body = b"".join(parts)
+    else:
+        body = await reader.read()
+    return status, headers, body
+
+
+class Stats:
+    """Latencies and outcomes of the fast clients."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = 0
+
+    def summary(self, elapsed):
+        ordered = sorted(self.latencies)
+
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000 if ordered else None
+
+        return {
+            "requests": len(ordered),
+            "throughput": len(ordered) / elapsed,
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+            "p99_ms": percentile(99),
+            "mean_ms": statistics.fmean(ordered) * 1000 if ordered else None,
+            "statuses": dict(self.statuses),
+            "errors": self.errors,
+        }
+
+
+async def _close(conn):
+    if conn is not None:
+        conn[1].close()
+
+
+async def fast_client(port, request, deadline, stats, timeout):
+    """Send ``request`` back to back, reconnecting when the server closes."""
+    conn = None
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            reader, writer = conn
+            writer.write(request)
+            status, headers, _ = await asyncio.wait_for(read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            stats.errors += 1
+            await _close(conn)
+            conn = None
+            await asyncio.sleep(0.05)
+            continue
+        stats.latencies.append(time.perf_counter() - start)
+        stats.statuses[status] += 1
+        if headers.get("connection", "").lower() == "close":
+            await _close(conn)
+            conn = None
+    await _close(conn)
+
+
+async def slow_upload(port, deadline, size, interval):
+    """Upload ``size`` bytes to /encrypt/file, 1 KiB every ``interval`` seconds."""
+    piece = b"MEETATTHEDOCKS" * 73 + b"XX"  # 1 KiB
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.write(build_request("POST", "/encrypt/file?mode=vigenere", length=size,
+                                   headers={"X-Cipher-Key": "STEALTH", "Connection": "close"}))
+        try:
+            for _ in range(size // len(piece)):
+                if time.perf_counter() >= deadline:
+                    break
+                writer.write(piece)
+                await writer.drain()
+                await asyncio.sleep(interval)
+            else:
+                await asyncio.wait_for(read_response(reader), max(deadline - time.perf_counter(), 0.1))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            pass
+        writer.close()
+
+
+async def drive(port, connections, slow, duration, timeout):
+    """Run the fast and slow clients against one server for ``duration`` seconds."""
+    request = build_request("POST", "/encrypt", json.dumps(
+        {"text": "MEET AT THE DOCKS AT MIDNIGHT", "mode": "vigenere", "key": "STEALTH"}).encode(),
+        {"Content-Type": "application/json"})
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+    tasks = [fast_client(port, request, deadline, stats, timeout) for _ in range(connections)]
+    tasks += [slow_upload(port, deadline, 64 * 1024, 0.25) for _ in range(slow)]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return stats.summary(time.perf_counter() - start)
+
+
+# ---------------------
+# Servers
+# ---------------------
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(command, workers, env=None):
+    """
+    Launch a server subprocess and wait until it accepts connections.
+
+    Args:
+        env (dict, optional): Extra environment variables for the server.
+    """
+    port = _free_port()
+    args = [part.format(port=port, workers=workers) for part in command]
+    process = subprocess.Popen(args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               env={**os.environ, **(env or {})})
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, port
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited: {' '.join(args)}")
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"Server did not start: {' '.join(args)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the Flask and ASGI apps under load.")
+    parser.add_argument("--connections", type=int, default=200, help="Concurrent fast clients.")
+    parser.add_argument("--slow", type=int, default=8, help="Concurrent slow uploads.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes.")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-request timeout (s).")
+    args = parser.parse_args(argv)
+
+    print(f"{args.connections} clients + {args.slow} slow uploads, {args.duration:.0f}s, "
+          f"{args.workers} worker process(es)")
+    for name, command in SERVERS.items():
+        process, port = start_server(command, args.workers)
+        try:
+            result = asyncio.run(drive(port, args.connections, args.slow, args.duration, args.timeout))
+        finally:
+            process.terminate()
+            process.wait()
+        p50, p99 = result["p50_ms"], result["p99_ms"]
+        print(f"  {name:<22} {result['throughput']:>8,.0f} req/s  "
+              f"p50 {p50 or 0:7.1f} ms  p99 {p99 or 0:7.1f} ms  "
+              f"errors {result['errors']:<5} statuses {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
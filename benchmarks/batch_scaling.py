@@ -0,0 +1,52 @@
+"""
+CipherSafe Batch Scaling Benchmark (batch_scaling.py)
+-----------------------------------------------------
+Measures ``encrypt_many`` throughput for a fixed batch of messages as the
+number of worker processes grows.
+
+Usage:
+    python -m benchmarks.batch_scaling [--cipher vigenere] [--messages 200000]
+"""
+
+import argparse
+import os
+import time
+
+from src.ciphers.registry import registry, KEYGEN
+
+
+def run(cipher_name, messages, length, workers):
+    """
+    Time one ``encrypt_many`` call.
+
+    Returns:
+        float: Seconds taken.
+    """
+    cipher = registry.get(cipher_name)
+    key = None if registry.supports(cipher_name, KEYGEN) else "STEALTH"
+    batch = [("MEETATTHEDOCKS" * (length // 14 + 1))[:length]] * messages
+    start = time.perf_counter()
+    cipher.encrypt_many(batch, key, max_workers=workers)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark encrypt_many scaling with cores.")
+    parser.add_argument("--cipher", default="vigenere", help="Registered cipher name.")
+    parser.add_argument("--messages", type=int, default=200_000, help="Messages per batch.")
+    parser.add_argument("--length", type=int, default=64, help="Letters per message.")
+    args = parser.parse_args(argv)
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    print(f"{args.cipher}: {args.messages} messages x {args.length} letters")
+    baseline = None
+    for workers in counts:
+        elapsed = run(args.cipher, args.messages, args.length, workers)
+        baseline = baseline or elapsed
+        print(f"  workers={workers:<3} {elapsed:7.3f}s  {args.messages / elapsed:>10,.0f} msg/s  "
+              f"speedup x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+CipherSafe HTTP Load Test (load_test.py)
+----------------------------------------
+Drives ``/encrypt`` with a configurable mix of cipher modes and payload
+sizes and reports throughput and p50/p95/p99 latency, overall and per
+mode and size. Results can be saved as JSON to compare releases.
+
+Targets:
+    flask        webapp.py under gunicorn (sync workers), started locally
+    asgi         asgi_app.py under uvicorn, started locally
+    test-client  webapp.py in-process through Flask's test client
+    --url        an already running local server
+
+Locally started servers and the test client keep their vault, keys and
+pads in a throwaway data directory.
+
+Usage:
+    python -m benchmarks.load_test [--target flask] [--concurrency 16] [--duration 10]
+        [--modes vigenere:3,aes-gcm:1,vernam:1] [--sizes 64:6,1024:3,16384:1]
+        [--output results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from benchmarks.asgi_comparison import ROOT, SERVERS, build_request, read_response, start_server
+from src.ciphers.registry import registry, KEYGEN
+
+TARGETS = {"flask": "flask (gunicorn sync)", "asgi": "asgi (uvicorn)"}
+# Key sent for modes that cannot generate their own
+FIXED_KEY = "STEALTH"
+
+
+# ---------------------
+# Workload
+# ---------------------
+
+def parse_mix(spec, cast=str):
+    """
+    Parse a weighted mix such as ``"vigenere:3,vernam:1"``.
+
+    Returns:
+        list[tuple]: (value, weight) pairs; weights default to 1.
+    """
+    mix = []
+    for part in spec.split(","):
+        value, _, weight = part.strip().partition(":")
+        try:
+            mix.append((cast(value), float(weight) if weight else 1.0))
+        except ValueError:
+            raise ValueError(f"Invalid mix entry: {part!r}") from None
+    if not mix or any(weight <= 0 for _, weight in mix):
+        raise ValueError(f"Invalid mix: {spec!r}")
+    return mix
+
+
+class Workload:
+    """Weighted random choice of (mode, payload size) request bodies."""
+
+    def __init__(self, modes, sizes, seed=0):
+        """
+        Args:
+            modes (list): (mode, weight) pairs.
+            sizes (list): (letters, weight) pairs.
+            seed (int): Seed of the request sequence, for repeatable runs.
+        """
+        self.modes = [(registry.resolve(mode), weight) for mode, weight in modes]
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.bodies = {}
+        for mode, _ in self.modes:
+            key = "" if registry.supports(mode, KEYGEN) else FIXED_KEY
+            for size, _ in sizes:
+                text = ("MEET AT THE DOCKS " * (size // 18 + 1))[:size]
+                self.bodies[mode, size] = json.dumps({"text": text, "mode": mode, "key": key}).encode()
+
+    def next(self):
+        """Pick the next request: ((mode, size), JSON body)."""
+        mode = self.rng.choices([m for m, _ in self.modes], [w for _, w in self.modes])[0]
+        size = self.rng.choices([s for s, _ in self.sizes], [w for _, w in self.sizes])[0]
+        return (mode, size), self.bodies[mode, size]
+
+
+# ---------------------
+# Results
+# ---------------------
+
+def percentiles(latencies):
+    """p50/p95/p99/mean/max of a list of seconds, in milliseconds."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {"p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99),
+            "mean_ms": sum(ordered) / len(ordered) * 1000, "max_ms": ordered[-1] * 1000}
+
+
+class Recorder:
+    """Latencies and outcomes per (mode, size), ignoring the warm-up period."""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, kind, start, status=None):
+        """Record one request begun at ``start``; a None status is a transport error."""
+        if start < self.measure_from:
+            return
+        with self.lock:
+            if status is None:
+                self.errors += 1
+                return
+            self.latencies[kind].append(time.perf_counter() - start)
+            self.statuses[status] += 1
+
+    def summary(self, elapsed):
+        """Throughput and latency overall, by mode and by payload size."""
+        by_mode, by_size = defaultdict(list), defaultdict(list)
+        for (mode, size), values in self.latencies.items():
+            by_mode[mode] += values
+            by_size[size] += values
+        every = [value for values in self.latencies.values() for value in values]
+
+        def group(values):
+            return {"requests": len(values), "throughput": len(values) / elapsed, **percentiles(values)}
+
+        return {
+            **group(every),
+            "seconds": elapsed,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": self.errors,
+            "by_mode": {mode: group(values) for mode, values in sorted(by_mode.items())},
+            "by_size": {str(size): group(values) for size, values in sorted(by_size.items())},
+        }
+
+
+# ---------------------
+# Drivers
+# ---------------------
+
+async def http_client(host, port, workload, recorder, deadline, timeout):
+    """One keep-alive connection posting requests back to back."""
+    conn = None
+    while time.perf_counter() < deadline:
+        kind, body = workload.next()
+        request = build_request("POST", "/encrypt", body, {"Content-Type": "application/json"})
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+            conn[1].write(request)
+            status, headers, _ = await asyncio.wait_for(read_response(conn[0]), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            recorder.record(kind, start)
+            if conn is not None:
+                conn[1].close()
+            conn = None
+            await asyncio.sleep(0.05)
+            continue
+        recorder.record(kind, start, status)
+        if headers.get("connection", "").lower() == "close":
+            conn[1].close()
+            conn = None
+    if conn is not None:
+        conn[1].close()
+
+
+def run_http(host, port, workload, concurrency, duration, warmup, timeout):
+    """Load a server over HTTP; returns the ``Recorder`` summary."""
+    async def drive():
+        start = time.perf_counter()
+        recorder = Recorder(start + warmup)
+        deadline = start + warmup + duration
+        await asyncio.gather(*(http_client(host, port, workload, recorder, deadline, timeout)
+                               for _ in range(concurrency)))
+        return recorder.summary(time.perf_counter() - recorder.measure_from)
+
+    return asyncio.run(drive())
+
+
+def run_test_client(workload, concurrency, duration, warmup):
+    """Load ``webapp.py`` in-process, one Flask test client per thread."""
+    from webapp import app
+
+    start = time.perf_counter()
+    recorder = Recorder(start + warmup)
+    deadline = start + warmup + duration
+    pick = threading.Lock()  # the workload's random generator is not thread-safe
+
+    def client():
+        session = app.test_client()
+        while time.perf_counter() < deadline:
+            with pick:
+                kind, body = workload.next()
+            begun = time.perf_counter()
+            response = session.post("/encrypt", data=body, content_type="application/json")
+            recorder.record(kind, begun, response.status_code)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.perf_counter() - recorder.measure_from)
+
+
+def run(target, workload, concurrency, duration, warmup=1.0, workers=1, timeout=5.0, url=None):
+    """
+    Run one load test.
+
+    Args:
+        target (str): ``flask``, ``asgi`` or ``test-client``; ignored if
+            ``url`` is given.
+        url (str, optional): Base URL of an already running local server.
+
+    Returns:
+        dict: Summary from ``Recorder.summary``.
+    """
+    if url:
+        parts = urlsplit(url)
+        return run_http(parts.hostname or "127.0.0.1", parts.port or 80, workload,
+                        concurrency, duration, warmup, timeout)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        if target == "test-client":
+            from src.web.services import WebServices, use_services
+            previous = use_services(WebServices(data_dir=data_dir))
+            try:
+                return run_test_client(workload, concurrency, duration, warmup)
+            finally:
+                use_services(previous).close()
+
+        process, port = start_server(SERVERS[TARGETS[target]], workers,
+                                     env={"CIPHERSAFE_DATA_DIR": data_dir})
+        try:
+            return run_http("127.0.0.1", port, workload, concurrency, duration, warmup, timeout)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def environment():
+    """Where a run happened, so saved results can be compared fairly."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def _row(name, result):
+    return (f"  {name:<12} {result['requests']:>8,} req  {result['throughput']:>9,.1f} req/s  "
+            f"p50 {result['p50_ms'] or 0:7.2f}  p95 {result['p95_ms'] or 0:7.2f}  "
+            f"p99 {result['p99_ms'] or 0:7.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the CipherSafe web app.")
+    parser.add_argument("--target", choices=[*TARGETS, "test-client"], default="flask",
+                        help="Server to start locally, or Flask's in-process test client.")
+    parser.add_argument("--url", help="Load an already running local server instead.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds first.")
+    parser.add_argument("--modes", default="vigenere:3,aes-gcm:1,vernam:1",
+                        help="Weighted cipher modes, e.g. vigenere:3,vernam:1.")
+    parser.add_argument("--sizes", default="64:6,1024:3,16384:1",
+                        help="Weighted payload sizes in characters, e.g. 64:6,16384:1.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes.")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-request timeout (s).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the request mix.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    try:
+        workload = Workload(parse_mix(args.modes), parse_mix(args.sizes, int), args.seed)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    target = args.url or args.target
+    print(f"{target}: {args.concurrency} clients, {args.duration:.0f}s "
+          f"(+{args.warmup:.0f}s warm-up), modes {args.modes}, sizes {args.sizes}")
+    started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    result = run(args.target, workload, args.concurrency, args.duration,
+                 args.warmup, args.workers, args.timeout, args.url)
+
+    print(_row("all", result) + f"  errors {result['errors']}  statuses {result['statuses']}")
+    for mode, group in result["by_mode"].items():
+        print(_row(mode, group))
+    for size, group in result["by_size"].items():
+        print(_row(f"{size} chars", group))
+
+    if args.output:
+        config = {name: value for name, value in vars(args).items() if name != "output"}
+        report = {"started": started, "config": config, "environment": environment(), "results": result}
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+CipherSafe Benchmark Suite (suite.py)
+-------------------------------------
+Measures how the ciphers, LSB steganography, the diary vault and the key
+store scale with their data: messages from 1 KB to 100 MB, covers from
+0.1 to 50 megapixels, vaults and key stores from 1k to 1M entries.
+
+Every case reports its best throughput over ``--repeat`` runs and the
+peak memory (tracemalloc) one run allocates. Every run is compared
+against a baseline, by default the committed ``benchmarks/baseline.json``
+(quick profile); the suite exits non-zero when a case gets slower, or
+allocates more, than ``--threshold`` allows. Refresh the baseline with
+``--save benchmarks/baseline.json`` when a change is meant to move it.
+
+Usage:
+    python -m benchmarks.suite [--profile quick|full] [--only vault]
+        [--save baseline.json] [--baseline baseline.json | --no-compare]
+        [--threshold 0.2]
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.load_test import environment
+from src.ciphers.vernam import VernamCipher
+from src.ciphers.vigenere import VigenereCipher
+from src.diary.message import Message
+from src.diary.vault import DiaryVault
+from src.key_management.key_storage import KeyStorage
+from src.steganography.image_cache import PixelCache
+from src.steganography.lsb_stego import LSBSteganography
+
+KB, MB = 1024, 1024 * 1024
+MESSAGE_SIZES = {"quick": [KB, MB], "full": [KB, MB, 10 * MB, 100 * MB]}
+COVER_MEGAPIXELS = {"quick": [0.1, 1], "full": [0.1, 1, 10, 50]}
+ENTRY_COUNTS = {"quick": [1_000, 10_000], "full": [1_000, 10_000, 100_000, 1_000_000]}
+# Key lookups timed per keys-lookup run
+LOOKUPS = 1_000
+# Memory growth below this is noise, whatever the threshold says
+MEMORY_SLACK = MB
+# Fast cases keep repeating until their timed runs add up to this
+MIN_SECONDS = 0.5
+# Committed reference results every run is compared against by default
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# setup(param, workdir) -> (operation, work units one operation processes)
+Scenario = namedtuple("Scenario", ["name", "unit", "params", "setup"])
+
+
+# ---------------------
+# Scenarios
+# ---------------------
+
+def _text(size):
+    return ("MEETATTHEDOCKS" * (size // 14 + 1))[:size]
+
+
+def _vigenere_encrypt(size, workdir):
+    text, cipher = _text(size), VigenereCipher()
+    return lambda: cipher.encrypt(text, "STEALTH"), size / MB
+
+
+def _vernam_encrypt(size, workdir):
+    cipher = VernamCipher()
+    text, key = _text(size), cipher.generate_otp(size)
+    return lambda: cipher.encrypt(text, key), size / MB
+
+
+def _vernam_bytes(size, workdir):
+    data, pad = os.urandom(size), os.urandom(size)
+    cipher = VernamCipher()
+    return lambda: cipher.encrypt_bytes(data, pad), size / MB
+
+
+def _cover(megapixels):
+    """PNG bytes of a noisy gradient cover, and its capacity in payload bytes."""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(megapixels * 1_000_000 / width)
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 200, width, dtype=np.float32)
+    pixels = (ramp[None, :, None] + rng.integers(0, 48, (height, width, 3))).astype(np.uint8)
+    output = BytesIO()
+    Image.fromarray(pixels, "RGB").save(output, "PNG", compress_level=1)
+    return output.getvalue(), width * height * 3 // 8 - LSBSteganography.HEADER.size
+
+
+def _stego_encode(megapixels, workdir):
+    cover, capacity = _cover(megapixels)
+    payload = os.urandom(capacity // 4)
+    stego = LSBSteganography(cache=PixelCache(0))
+    return lambda: stego.encode_bytes(cover, payload), megapixels
+
+
+def _stego_decode(megapixels, workdir):
+    cover, capacity = _cover(megapixels)
+    stego = LSBSteganography(cache=PixelCache(0))
+    image = stego.encode_bytes(cover, os.urandom(capacity // 4))
+    return lambda: stego.decode_bytes(image, raw=True), megapixels
+
+
+def _filled_vault(count, workdir):
+    path = os.path.join(workdir, "vault.db")
+    vault = DiaryVault(path)
+    vault.add_messages([Message("ZOE", "MISATO", "Vigenère", _text(64), key_used="STEALTH")
+                        for _ in range(count)])
+    return path
+
+
+def _vault_append(count, workdir):
+    vault = DiaryVault(_filled_vault(count, workdir))
+    return lambda: vault.add_entry("ZOE", "MISATO", "Vigenère", _text(64), key_used="STEALTH"), 1
+
+
+def _vault_load(count, workdir):
+    path = _filled_vault(count, workdir)
+    return lambda: DiaryVault(path).list_all(), count
+
+
+def _keys(count):
+    rng = random.Random(count)
+    return {f"K{i}": "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=32)) for i in range(count)}
+
+
+def _keys_save_many(count, workdir):
+    keys = _keys(count)
+
+    def operation():
+        path = tempfile.mkdtemp(dir=workdir)
+        storage = KeyStorage(path)
+        storage.save_many("otp", keys)
+        storage.close()
+        shutil.rmtree(path)
+
+    return operation, count
+
+
+def _keys_lookup(count, workdir):
+    keys = list(_keys(count).items())
+    path = os.path.join(workdir, "keys")
+    storage = KeyStorage(path)
+    storage.save_many("otp", keys)
+    storage.close()
+    probes = [value for _, value in random.Random(0).choices(keys, k=LOOKUPS)]
+
+    def operation():
+        # A fresh instance, so the first lookup pays for loading the index
+        reopened = KeyStorage(path)
+        for value in probes:
+            reopened.key_exists("otp", value)
+        reopened.close()
+
+    return operation, LOOKUPS
+
+
+SCENARIOS = [
+    Scenario("vigenere-encrypt", "MB/s", MESSAGE_SIZES, _vigenere_encrypt),
+    Scenario("vernam-encrypt", "MB/s", MESSAGE_SIZES, _vernam_encrypt),
+    Scenario("vernam-bytes", "MB/s", MESSAGE_SIZES, _vernam_bytes),
+    Scenario("stego-encode", "MP/s", COVER_MEGAPIXELS, _stego_encode),
+    Scenario("stego-decode", "MP/s", COVER_MEGAPIXELS, _stego_decode),
+    Scenario("vault-append", "entries/s", ENTRY_COUNTS, _vault_append),
+    Scenario("vault-load", "entries/s", ENTRY_COUNTS, _vault_load),
+    Scenario("keys-save-many", "keys/s", ENTRY_COUNTS, _keys_save_many),
+    Scenario("keys-lookup", "lookups/s", ENTRY_COUNTS, _keys_lookup),
+]
+
+
+def case_name(scenario, param):
+    """Stable result key such as ``vernam-bytes[1MB]`` or ``vault-load[10k]``."""
+    if scenario.unit == "MB/s":
+        label = f"{param // MB}MB" if param >= MB else f"{param // KB}KB"
+    elif scenario.unit == "MP/s":
+        label = f"{param:g}MP"
+    else:
+        label = f"{param // 1_000_000}M" if param >= 1_000_000 else f"{param // 1000}k"
+    return f"{scenario.name}[{label}]"
+
+
+# ---------------------
+# Measurement
+# ---------------------
+
+def measure(operation, amount, repeat):
+    """
+    Time ``operation`` and trace the memory one call allocates.
+
+    Runs at least ``repeat`` times, and more (up to 1000) while the
+    runs so far add up to less than ``MIN_SECONDS``.
+
+    Returns:
+        dict: Best ``seconds``, ``throughput`` (units/s) and ``peak_mb``.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # Like timeit: no collector pauses inside the timed runs
+    gc.collect()
+    gc.disable()
+    try:
+        best, total, runs = float("inf"), 0.0, 0
+        while runs < repeat or (total < MIN_SECONDS and runs < 1000):
+            start = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - start
+            best, total, runs = min(best, elapsed), total + elapsed, runs + 1
+    finally:
+        gc.enable()
+    return {"seconds": best, "throughput": amount / best, "peak_mb": peak / MB}
+
+
+def run(profile="quick", only=None, repeat=3, report=print):
+    """
+    Run every case of ``profile`` whose name matches ``only`` (a glob or
+    substring).
+
+    Returns:
+        dict: {case name: measurement, with its ``unit``}.
+    """
+    results = {}
+    for scenario in SCENARIOS:
+        for param in scenario.params[profile]:
+            name = case_name(scenario, param)
+            if only and only not in name and not fnmatch.fnmatch(name, only):
+                continue
+            with tempfile.TemporaryDirectory() as workdir:
+                operation, amount = scenario.setup(param, workdir)
+                result = measure(operation, amount, repeat)
+                del operation
+            results[name] = {"unit": scenario.unit, **result}
+            report(f"  {name:<26} {result['throughput']:>14,.1f} {scenario.unit:<10} "
+                   f"{result['seconds'] * 1000:>10.2f} ms  peak {result['peak_mb']:>9.1f} MB")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline's.
+
+    A case regresses when its throughput drops by more than ``threshold``
+    (a fraction) or its peak memory grows by more than ``threshold``.
+
+    Returns:
+        list[str]: One line per regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        speed = result["throughput"] / before["throughput"] - 1
+        if speed < -threshold:
+            regressions.append(f"{name}: throughput {speed:+.0%} "
+                               f"({before['throughput']:,.1f} -> {result['throughput']:,.1f} {result['unit']})")
+        growth = result["peak_mb"] - before["peak_mb"]
+        if growth * MB > MEMORY_SLACK and growth > threshold * before["peak_mb"]:
+            regressions.append(f"{name}: peak memory {before['peak_mb']:.1f} -> {result['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ciphers, steganography, vault and key storage.")
+    parser.add_argument("--profile", choices=["quick", "full"], default="quick",
+                        help="quick: small sizes only; full: up to 100 MB / 50 MP / 1M entries.")
+    parser.add_argument("--only", help="Run cases matching this glob or substring, e.g. 'vault-*'.")
+    parser.add_argument("--repeat", type=int, default=3, help="Minimum timed runs per case (best is kept).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Compare against results saved with --save (default: the committed "
+                             "benchmarks/baseline.json).")
+    parser.add_argument("--no-compare", action="store_true", help="Only measure; skip the baseline check.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown / memory growth as a fraction (default 0.2).")
+    parser.add_argument("--save", help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+    # Read before --save can overwrite it, so a refresh still shows the change
+    baseline = None
+    if not args.no_compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"Benchmark suite ({args.profile}, best of {args.repeat})")
+    results = run(args.profile, args.only, args.repeat)
+
+    if args.save:
+        report = {"started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  "profile": args.profile, "environment": environment(), "results": results}
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if baseline is None:
+        return []
+    regressions = compare(results, baseline["results"], args.threshold)
+    compared = len(set(results) & set(baseline["results"]))
+    recorded = baseline.get("environment", {})
+    print(f"Compared {compared} case(s) with {os.path.relpath(args.baseline)} "
+          f"(commit {recorded.get('commit')}, {recorded.get('cpus')} CPU(s), "
+          f"Python {recorded.get('python')}), threshold {args.threshold:.0%}")
+    for line in regressions:
+        print(f"  REGRESSION {line}")
+    if not regressions:
+        print("  No regressions.")
+    return regressions
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main() else 0)
@@ -7,11 +7,15 @@ Manages user interaction with the diary system, encryption modules,
 key management, and storyline progression in a spy-themed interface.
 """
 
-from src.ciphers.vigenere import VigenereCipher
-from src.ciphers.vernam import VernamCipher
+from src.ciphers.compressed_vernam import CompressedVernamPipeline
+from src.ciphers.registry import registry, KEYGEN, ONE_TIME_PAD
 from src.key_management.otp_manager import OTPKeyManager
+from src.key_management.pad_manager import PadFileManager
 from src.diary.vault import DiaryVault
 from src.story.episodes import EpisodeManager
+from src.telemetry.profiling import profiler, add_profile_arguments, start_from_args
+from src.ui import commands
+import argparse
 import json
 import sys
 import os
@@ -30,45 +34,83 @@ def main_menu():
     print("2. Decrypt Received Message")
     print("3. View Diary Vault")
     print("4. Continue Story")
-    print("5. Exit")
+    print("5. Analyze Intercept")
+    print("6. Exit")
     print("=" * 60)
     return input("Select an option: ")
 
-def write_new_message(vault, vigenere, vernam, otp_manager):
+def select_cipher():
+    """Prompt for a registered cipher; returns its canonical name or None."""
+    names = registry.names()
+    options = ", ".join(f"{i}={registry.label(name)}" for i, name in enumerate(names, 1))
+    mode = input(f"Encryption Mode [{options}]: ").strip()
+    if mode.isdigit() and 1 <= int(mode) <= len(names):
+        return names[int(mode) - 1]
+    return None
+
+def write_new_message(vault, otp_manager, entry_pipeline=None):
+    """Encrypt and log a message; Vernam entries are compressed when ``entry_pipeline`` is set."""
     clear_screen()
     print("WRITE NEW MESSAGE\n")
     message = input("Enter your message: ").upper().strip()
     recipient = input("Recipient (e.g. MISATO): ").upper().strip()
-    mode = input("Encryption Mode [1=Vigenère, 2=Vernam OTP]: ")
+    name = select_cipher()
+    pad_ref = None
+
+    if name is None:
+        print("Invalid mode.")
+        return
 
-    if mode == "1":
-        keyword = input("Enter shared keyword (Vigenère): ").upper().strip()
-        ciphertext = vigenere.encrypt(message, keyword)
-        cipher_type = "Vigenère"
-        key_used = keyword
+    cipher = registry.get(name)
+    cipher_type = registry.label(name)
 
-    elif mode == "2":
-        otp_key = otp_manager.get_new_key(len(message))
-        ciphertext, key_used = vernam.encrypt(message, otp_key)
-        otp_manager.mark_key_used(key_used)
-        cipher_type = "Vernam OTP"
+    sealed = None
+    if entry_pipeline is not None and registry.supports(name, ONE_TIME_PAD):
+        try:
+            sealed = entry_pipeline.seal_entry(message)
+        except ValueError as exc:
+            print(f"[info] {exc} Sending it uncompressed.")
+
+    if sealed is not None:
+        ciphertext, segment, report = sealed
+        key_used, pad_ref = None, segment._asdict()
+        print(f"[info] Compressed ({report['codec']}): {report['pad_bytes_used']} of "
+              f"{report['original_bytes']} pad bytes used, from pad {segment.pad_id}.")
+
+    elif registry.supports(name, ONE_TIME_PAD):
+        segment, otp_key = otp_manager.reserve_pad_key(len(message))
+        if segment is None:
+            otp_key = otp_manager.get_new_key(len(message))
+        ciphertext, key_used = cipher.encrypt_message(message, otp_key)
+        if segment is None:
+            otp_manager.mark_key_used(key_used)
+        else:
+            # The pad itself holds the key; the vault only records where
+            pad_ref = segment._asdict()
+            key_used = None
+            print(f"[info] Key taken from pad {segment.pad_id} at offset {segment.offset}.")
 
         # Optional Steganography (future enhancement)
         use_steg = input("Embed in image using steganography? (y/n): ").lower()
         if use_steg == 'y':
             print("[info] Placeholder for steganography embedding...")
 
+    elif registry.supports(name, KEYGEN):
+        ciphertext, key_used = cipher.encrypt_message(message)
+        print(f"Generated {cipher_type} key (share securely): {key_used}")
+
     else:
-        print("Invalid mode.")
-        return
+        keyword = input(f"Enter shared keyword ({cipher_type}): ").upper().strip()
+        ciphertext, key_used = cipher.encrypt_message(message, keyword)
 
     vault.add_entry(sender="ZOE", receiver=recipient, cipher_type=cipher_type,
-                    ciphertext=ciphertext, plaintext=message, key_used=key_used)
+                    ciphertext=ciphertext, plaintext=message, key_used=key_used,
+                    pad_ref=pad_ref)
     print(f"\nMessage encrypted with {cipher_type}.")
     print(f"Ciphertext: {ciphertext}")
     pause()
 
-def decrypt_message(vault, vigenere, vernam, otp_manager):
+def decrypt_message(vault, otp_manager, entry_pipeline):
     clear_screen()
     print("DECRYPT RECEIVED MESSAGE\n")
     messages = vault.list_encrypted_only()
@@ -83,20 +125,33 @@ def decrypt_message(vault, vigenere, vernam, otp_manager):
     choice = int(input("Select a message to decrypt: ")) - 1
     msg = messages[choice]
 
-    if msg['cipher_type'] == "Vigenère":
-        keyword = input("Enter shared keyword: ").upper().strip()
-        plaintext = vigenere.decrypt(msg['ciphertext'], keyword)
-    elif msg['cipher_type'] == "Vernam OTP":
+    try:
+        name = registry.resolve(msg['cipher_type'])
+    except ValueError:
+        print("Unsupported cipher type.")
+        return
+    cipher = registry.get(name)
+
+    if registry.supports(name, ONE_TIME_PAD) and entry_pipeline.sealed_entry(msg.get('pad_ref')):
+        plaintext = entry_pipeline.open_entry(msg['ciphertext'], msg['pad_ref'])
+    elif registry.supports(name, ONE_TIME_PAD) and msg.get('pad_ref'):
+        plaintext = cipher.decrypt(msg['ciphertext'], otp_manager.pad_key(msg['pad_ref']))
+    elif registry.supports(name, ONE_TIME_PAD):
         otp_key = input("Enter OTP key: ").upper().strip()
         if otp_manager.is_key_used(otp_key):
             print("This OTP key has already been used and is invalid!")
             pause()
             return
-        plaintext = vernam.decrypt(msg['ciphertext'], otp_key)
+        plaintext = cipher.decrypt(msg['ciphertext'], otp_key)
         otp_manager.mark_key_used(otp_key)
     else:
-        print("Unsupported cipher type.")
-        return
+        key = input(f"Enter {msg['cipher_type']} key: ").strip()
+        try:
+            plaintext = cipher.decrypt(msg['ciphertext'], key)
+        except ValueError as exc:
+            print(f"Decryption failed: {exc}")
+            pause()
+            return
 
     print(f"\nDecrypted Message: {plaintext}")
     vault.update_entry(msg['id'], plaintext)
@@ -117,6 +172,44 @@ def view_diary(vault):
             print("-" * 60)
     pause()
 
+def analyze_intercept(vault):
+    clear_screen()
+    print("ANALYZE INTERCEPT\n")
+    # Imported here so NumPy only loads when the analyzer is used
+    from src.ciphers.vigenere_analysis import VigenereAnalyzer
+
+    ciphertext = input("Paste Vigenère ciphertext (blank to pick from vault): ").strip()
+    if not ciphertext:
+        label = registry.label("vigenere")
+        entries = [e for e in vault.list_all() if e['cipher_type'] == label]
+        if not entries:
+            print("No Vigenère intercepts in the vault.")
+            pause()
+            return
+        for i, e in enumerate(entries, 1):
+            print(f"{i}. From {e['sender']} at {e['timestamp']}")
+        choice = input("Select an intercept: ").strip()
+        if not (choice.isdigit() and 1 <= int(choice) <= len(entries)):
+            print("Invalid selection.")
+            pause()
+            return
+        ciphertext = entries[int(choice) - 1]['ciphertext']
+
+    try:
+        report = VigenereAnalyzer().analyze(ciphertext)
+    except ValueError as exc:
+        print(f"Analysis failed: {exc}")
+        pause()
+        return
+
+    kasiski = sorted(report['kasiski'].items(), key=lambda item: item[1], reverse=True)[:3]
+    print(f"\nEstimated key length: {report['key_length']} (IoC {report['ioc']:.4f})")
+    print("Kasiski periods: " + ", ".join(f"{p} ({share:.0%})" for p, share in kasiski))
+    print(f"Recovered key: {report['key']}")
+    plaintext = registry.get("vigenere").decrypt(ciphertext, report['key'])
+    print(f"Plaintext preview: {plaintext[:200]}")
+    pause()
+
 def continue_story(episodes):
     clear_screen()
     print("CONTINUE STORY\n")
@@ -129,25 +222,48 @@ def continue_story(episodes):
         print("All episodes completed!")
     pause()
 
-def main():
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Scripting subcommands (encrypt, decrypt, ...) run without the menu
+    if any(arg in commands.COMMANDS for arg in argv):
+        return commands.main(argv)
+
+    parser = argparse.ArgumentParser(
+        description="CipherSafe spy diary terminal.",
+        epilog=f"Non-interactive subcommands: {', '.join(commands.COMMANDS)} (see <command> --help).")
+    parser.add_argument("--compress-pads", action="store_true",
+                        help="Compress Vernam messages first so they use less pad "
+                             "(needs a byte pad: pads-create NAME SIZE --kind bytes).")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    start_from_args(args)
+
     clear_screen()
-    vigenere = VigenereCipher()
-    vernam = VernamCipher()
-    otp_manager = OTPKeyManager()
+    otp_manager = OTPKeyManager(pad_manager=PadFileManager())
+    # Opens compressed entries always; writes them only with --compress-pads
+    entry_pipeline = CompressedVernamPipeline(pad_manager=otp_manager.pad_manager)
     vault = DiaryVault()
     episodes = EpisodeManager()
 
     while True:
         choice = main_menu()
         if choice == "1":
-            write_new_message(vault, vigenere, vernam, otp_manager)
+            with profiler.operation("write"):
+                write_new_message(vault, otp_manager,
+                                  entry_pipeline if args.compress_pads else None)
         elif choice == "2":
-            decrypt_message(vault, vigenere, vernam, otp_manager)
+            with profiler.operation("decrypt"):
+                decrypt_message(vault, otp_manager, entry_pipeline)
         elif choice == "3":
-            view_diary(vault)
+            with profiler.operation("view"):
+                view_diary(vault)
         elif choice == "4":
-            continue_story(episodes)
+            with profiler.operation("story"):
+                continue_story(episodes)
         elif choice == "5":
+            with profiler.operation("analyze"):
+                analyze_intercept(vault)
+        elif choice == "6":
             print("Exiting CipherSafe. Goodbye, Agent ZOE.")
             sys.exit()
         else:
@@ -155,4 +271,4 @@ def main():
             pause()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
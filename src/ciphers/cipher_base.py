@@ -6,7 +6,19 @@ Provides a unified interface and structure for encryption systems
 like Vigenère and Vernam (One-Time Pad).
 """
 
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from src.ciphers.normalize import normalize
+
+
+def _run_batch(cipher, method, texts, keys):
+    """Worker entry point: apply one cipher method to a chunk of messages."""
+    fn = getattr(cipher, method)
+    return [fn(text, key) for text, key in zip(texts, keys)]
+
 
 class CipherBase(ABC):
     """
@@ -45,11 +57,91 @@ class CipherBase(ABC):
         """
         pass
 
+    def encrypt_message(self, plaintext, key=None):
+        """
+        Uniform entry point used by front ends for every cipher.
+
+        Ciphers that can create their own keys override this to generate
+        one when ``key`` is None.
+
+        Args:
+            plaintext (str): The plaintext message to encrypt.
+            key (str, optional): The encryption key.
+
+        Returns:
+            tuple: (ciphertext, key actually used)
+        """
+        if not key:
+            raise ValueError("This cipher needs a key to encrypt.")
+        return self.encrypt(plaintext, key), key
+
+    # ---------------------------
+    # Batch API
+    # ---------------------------
+
+    # Batches smaller than this run in the calling process; a process pool
+    # only pays for its start-up and pickling beyond a few thousand messages.
+    PARALLEL_MIN_ITEMS = 4096
+
+    def encrypt_many(self, plaintexts, keys=None, max_workers=None, chunk_size=None):
+        """
+        Encrypt a batch of messages.
+
+        Args:
+            plaintexts (sequence[str]): Messages to encrypt.
+            keys (str | sequence | None): One shared key, one key per
+                message, or None for ciphers that generate their own.
+            max_workers (int, optional): Worker processes for large batches
+                (defaults to the CPU count; 1 forces in-process execution).
+            chunk_size (int, optional): Messages per worker task.
+
+        Returns:
+            list[tuple]: (ciphertext, key) per message, in input order.
+        """
+        return self._map_batch("encrypt_message", plaintexts, keys, max_workers, chunk_size)
+
+    def decrypt_many(self, ciphertexts, keys, max_workers=None, chunk_size=None):
+        """
+        Decrypt a batch of messages.
+
+        Args:
+            ciphertexts (sequence[str]): Messages to decrypt.
+            keys (str | sequence): One shared key or one key per message.
+            max_workers (int, optional): Worker processes for large batches.
+            chunk_size (int, optional): Messages per worker task.
+
+        Returns:
+            list[str]: Plaintexts in input order.
+        """
+        return self._map_batch("decrypt", ciphertexts, keys, max_workers, chunk_size)
+
+    def _map_batch(self, method, texts, keys, max_workers, chunk_size):
+        """Run ``method`` over (text, key) pairs in-process or on a process pool."""
+        texts = list(texts)
+        if keys is None or isinstance(keys, (str, bytes)):
+            keys = [keys] * len(texts)
+        else:
+            keys = list(keys)
+            if len(keys) != len(texts):
+                raise ValueError("Number of keys must match the number of messages.")
+
+        workers = max_workers or os.cpu_count() or 1
+        if workers == 1 or len(texts) < self.PARALLEL_MIN_ITEMS:
+            return _run_batch(self, method, texts, keys)
+
+        chunk_size = chunk_size or max(1, -(-len(texts) // (workers * 4)))
+        starts = range(0, len(texts), chunk_size)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(_run_batch, repeat(self), repeat(method),
+                              (texts[i:i + chunk_size] for i in starts),
+                              (keys[i:i + chunk_size] for i in starts))
+            return [result for chunk in chunks for result in chunk]
+
     @staticmethod
     def _prepare_text(text):
         """
         Preprocesses input by removing non-alphabetic characters
-        and converting to uppercase.
+        and converting to uppercase (one translate pass, see normalize.py).
 
         Args:
             text (str): Raw input text.
@@ -57,7 +149,7 @@ class CipherBase(ABC):
         Returns:
             str: Sanitized uppercase text.
         """
-        return ''.join(char.upper() for char in text if char.isalpha())
+        return normalize(text)
 
     @staticmethod
     def _is_valid_key(key):
@@ -0,0 +1,237 @@
+"""
+CipherSafe Compressed Vernam Pipeline (compressed_vernam.py)
+------------------------------------------------------------
+Compresses plaintext before byte-mode Vernam encryption so each message
+consumes less one-time pad material. The result is framed with the codec
+and original length so the receiver can reverse both stages. The diary
+front ends use it for Vernam entries when started with ``--compress-pads``.
+
+Note: the frame header and ciphertext length reveal how compressible a
+message was. That is acceptable for diary traffic, but compression
+should be disabled (codec="none") when attackers can inject text into
+messages.
+"""
+
+import base64
+import lzma
+import struct
+import zlib
+
+from src.ciphers.vernam import VernamCipher
+
+
+class CompressedVernamPipeline:
+    """
+    Compress-then-encrypt stage in front of byte-mode Vernam.
+
+    Frame layout: ``magic | codec | original length`` followed by the
+    Vernam ciphertext of the compressed payload.
+    """
+
+    MAGIC = b"CV"
+    HEADER = struct.Struct(">2sBQ")  # magic, codec id, original length
+    CODECS = {"none": 0, "zlib": 1, "lzma": 2}
+
+    def __init__(self, codec="auto", pad_manager=None):
+        """
+        Args:
+            codec (str): "zlib", "lzma", "none", or "auto" to keep whichever
+                output is smallest (never larger than the plaintext).
+            pad_manager (PadFileManager, optional): Take pads from shared
+                "bytes" pad files instead of generating fresh ones.
+        """
+        if codec != "auto" and codec not in self.CODECS:
+            raise ValueError(f"Unknown codec '{codec}'.")
+        self.codec = codec
+        self.pad_manager = pad_manager
+        self.vernam = VernamCipher()
+
+    # ---------------------
+    # Compression Stage
+    # ---------------------
+
+    @staticmethod
+    def _compress(codec, data):
+        if codec == "zlib":
+            return zlib.compress(data, 9)
+        if codec == "lzma":
+            return lzma.compress(data, preset=9 | lzma.PRESET_EXTREME)
+        return data
+
+    @staticmethod
+    def _decompress(codec, data, max_length):
+        """
+        Reverse ``_compress`` without inflating past ``max_length`` bytes.
+
+        One byte beyond the limit is allowed so that an oversized payload
+        shows up in the length check instead of being silently cut off.
+        """
+        if codec == "none":
+            return data
+        decompressor = zlib.decompressobj() if codec == "zlib" else lzma.LZMADecompressor()
+        data = decompressor.decompress(data, max_length + 1)
+        if not decompressor.eof:
+            raise ValueError("Compressed payload is truncated or longer than its header says.")
+        return data
+
+    def compress(self, data):
+        """
+        Apply the configured codec.
+
+        Returns:
+            tuple: (codec name, compressed bytes)
+        """
+        if self.codec != "auto":
+            return self.codec, self._compress(self.codec, data)
+        candidates = [(name, self._compress(name, data)) for name in ("none", "zlib", "lzma")]
+        return min(candidates, key=lambda candidate: len(candidate[1]))
+
+    # ---------------------
+    # Encryption / Decryption
+    # ---------------------
+
+    def _pad_bytes(self, key):
+        """Key material for a key given as bytes, a PadSegment or a pad_ref dict."""
+        if not (isinstance(key, dict) or hasattr(key, "pad_id")):
+            return key
+        if self.pad_manager is None:
+            raise ValueError("Pad segment keys need a pipeline with a pad_manager.")
+        return self.pad_manager.read(key)
+
+    def _take_pad(self, length):
+        """Reserve pad material from a shared bytes pad (or return None)."""
+        if self.pad_manager is None or length == 0:
+            return None
+        return self.pad_manager.allocate_any(length, kind="bytes")
+
+    def encrypt(self, plaintext, pad=None):
+        """
+        Compress and encrypt a message.
+
+        Args:
+            plaintext (str | bytes): Message; text is encoded as UTF-8.
+            pad (bytes-like, optional): Key material. If omitted, a segment
+                of a shared pad file is used when available, otherwise a
+                fresh random pad.
+
+        Returns:
+            tuple: (frame bytes, key, report) where key is the pad bytes or
+            the PadSegment it came from, and report lists the pad savings.
+
+        Raises:
+            ValueError: If ``pad`` is a PadSegment but no pad_manager is set.
+        """
+        data = plaintext.encode('utf-8') if isinstance(plaintext, str) else bytes(plaintext)
+        codec, payload = self.compress(data)
+        key = pad if pad is not None else self._take_pad(len(payload))
+        return self._seal(data, codec, payload, key)
+
+    def _seal(self, data, codec, payload, key):
+        """Encrypt a compressed payload and frame it; see ``encrypt``."""
+        ciphertext, used_pad = self.vernam.encrypt_bytes(payload, self._pad_bytes(key))
+        frame = self.HEADER.pack(self.MAGIC, self.CODECS[codec], len(data)) + ciphertext
+        if key is None:
+            key = used_pad
+
+        report = {
+            "codec": codec,
+            "original_bytes": len(data),
+            "pad_bytes_used": len(payload),
+            "pad_bytes_saved": len(data) - len(payload),
+            "pad_ratio": len(payload) / len(data) if data else 1.0,
+        }
+        return frame, key, report
+
+    def decrypt(self, frame, key):
+        """
+        Decrypt and decompress a frame.
+
+        Args:
+            frame (bytes): Output of ``encrypt``.
+            key (bytes-like | PadSegment | dict): Pad bytes or pad reference.
+
+        Returns:
+            bytes: The original plaintext bytes.
+
+        Raises:
+            ValueError: If the frame is malformed or does not match the pad,
+                or ``key`` is a pad reference but no pad_manager is set.
+        """
+        if len(frame) < self.HEADER.size:
+            raise ValueError("Frame is too short.")
+        magic, codec_id, original_length = self.HEADER.unpack_from(frame)
+        if magic != self.MAGIC:
+            raise ValueError("Not a compressed Vernam frame.")
+        codecs = {value: name for name, value in self.CODECS.items()}
+        if codec_id not in codecs:
+            raise ValueError(f"Unknown codec id {codec_id}.")
+
+        payload = self.vernam.decrypt_bytes(frame[self.HEADER.size:], self._pad_bytes(key))
+        try:
+            data = self._decompress(codecs[codec_id], payload, original_length)
+        except (zlib.error, lzma.LZMAError, ValueError) as exc:
+            raise ValueError("Decryption failed: wrong pad or corrupted frame.") from exc
+        if len(data) != original_length:
+            raise ValueError("Decrypted length does not match the frame header.")
+        return data
+
+    def decrypt_text(self, frame, key):
+        """Decrypt a frame and decode the plaintext as UTF-8."""
+        return self.decrypt(frame, key).decode('utf-8')
+
+    # ---------------------
+    # Diary Entries
+    # ---------------------
+
+    def seal_entry(self, text):
+        """
+        Encrypt a diary entry with material from a shared bytes pad.
+
+        Returns:
+            tuple: (ciphertext, PadSegment, report); the ciphertext is the
+            frame in base64, so the vault can store it as text.
+
+        Raises:
+            ValueError: If no bytes pad has room for the compressed entry.
+        """
+        data = text.encode('utf-8')
+        codec, payload = self.compress(data)
+        segment = self._take_pad(len(payload))
+        if segment is None:
+            raise ValueError(f"No byte pad has {len(payload)} bytes left for this entry.")
+        frame, segment, report = self._seal(data, codec, payload, segment)
+        return base64.b64encode(frame).decode('ascii'), segment, report
+
+    def open_entry(self, ciphertext, pad_ref):
+        """Decrypt a diary entry sealed by ``seal_entry``."""
+        try:
+            frame = base64.b64decode(ciphertext, validate=True)
+        except ValueError as exc:
+            raise ValueError("Entry ciphertext is not a compressed Vernam frame.") from exc
+        return self.decrypt_text(frame, pad_ref)
+
+    def sealed_entry(self, pad_ref):
+        """
+        True if a vault pad reference points into a bytes pad, i.e. the
+        entry was written by ``seal_entry`` rather than letter Vernam.
+        """
+        if self.pad_manager is None or not pad_ref:
+            return False
+        try:
+            return self.pad_manager.pad_info(pad_ref["pad_id"])["kind"] == "bytes"
+        except (KeyError, OSError, ValueError):
+            return False
+
+
+# Demonstration (when run standalone)
+if __name__ == "__main__":
+    pipeline = CompressedVernamPipeline()
+    entry = ("Dear diary, the drop at the old station went as planned. "
+             "MISATO confirmed the package and the package is safe. ") * 4
+
+    frame, key, report = pipeline.encrypt(entry)
+    print("=== CipherSafe Compressed Vernam Demo ===")
+    print(f"Codec:      {report['codec']}")
+    print(f"Pad used:   {report['pad_bytes_used']} of {report['original_bytes']} bytes "
+          f"({report['pad_ratio']:.0%})")
+    print(f"Round trip: {pipeline.decrypt_text(frame, key) == entry}")
@@ -0,0 +1,293 @@
+"""
+CipherSafe Dictionary Attack (dictionary_attack.py)
+---------------------------------------------------
+Audits shared Vigenère keywords by trying every word of a wordlist as
+the key. The wordlist is streamed in batches; each batch is decrypted
+and scored as one NumPy matrix (one row per candidate keyword) against
+English letter frequencies. Batches run on a process pool, the search
+stops as soon as a keyword yields English, and progress is checkpointed
+so an interrupted audit can resume where it left off.
+
+Usage:
+    python -m src.ciphers.dictionary_attack intercept.txt words.txt --checkpoint audit.json
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import numpy as np
+
+from src.ciphers.normalize import normalize, normalize_bytes
+from src.ciphers.vigenere_analysis import ENGLISH_FREQUENCIES
+
+# Mean log-likelihood per letter of English text and of uniform noise
+_LOG_FREQUENCIES = np.log(ENGLISH_FREQUENCIES)
+ENGLISH_SCORE = float((ENGLISH_FREQUENCIES * _LOG_FREQUENCIES).sum())  # ~ -2.89
+RANDOM_SCORE = float(_LOG_FREQUENCIES.mean())                          # ~ -4.14
+
+
+def score_keywords(cipher_indices, keywords):
+    """
+    English-likeness of the plaintext produced by each keyword.
+
+    Args:
+        cipher_indices (np.ndarray): Ciphertext letters as 0-25.
+        keywords (list[str]): Normalized, non-empty candidate keywords.
+
+    Returns:
+        np.ndarray: Mean log-likelihood per letter for each keyword
+        (about -2.9 for English, -4.1 for noise).
+    """
+    letters = "".join(keywords).encode("ascii")
+    flat = np.frombuffer(letters, dtype=np.uint8).astype(np.int16) - 65
+    lengths = np.fromiter((len(k) for k in keywords), dtype=np.int64, count=len(keywords))
+    offsets = np.cumsum(lengths) - lengths
+
+    # Key stream of every keyword, one row each: flat[offset + j % length]
+    positions = np.arange(cipher_indices.size)
+    keys = flat[offsets[:, None] + positions[None, :] % lengths[:, None]]
+    plain = (cipher_indices[None, :] - keys) % 26
+    return _LOG_FREQUENCIES[plain].mean(axis=1)
+
+
+def _score_batch(cipher_indices, keywords, top):
+    """Worker entry point: the ``top`` best (score, keyword) pairs of one batch."""
+    scores = score_keywords(cipher_indices, keywords)
+    best = np.argsort(scores)[::-1][:top]
+    return [(float(scores[i]), keywords[i]) for i in best]
+
+
+class DictionaryAttack:
+    """
+    Wordlist attack on a Vigenère ciphertext.
+
+    Only a sample of the ciphertext is scored per keyword; a few hundred
+    letters separate English from noise reliably.
+    """
+
+    def __init__(self, ciphertext, sample_letters=400, batch_size=2048,
+                 max_workers=None, threshold=None, top=5):
+        """
+        Args:
+            ciphertext (str | bytes): Vigenère ciphertext under audit.
+            sample_letters (int): Leading ciphertext letters scored per keyword.
+            batch_size (int): Keywords per vectorized batch / worker task.
+            max_workers (int, optional): Worker processes (1 runs in-process).
+            threshold (float, optional): Score at which a keyword counts as
+                found and the search stops (default: 90% of the way from
+                noise to English).
+            top (int): Best keywords kept for the report.
+        """
+        if isinstance(ciphertext, str):
+            ciphertext = ciphertext.encode("ascii", "ignore")
+        letters = normalize_bytes(ciphertext)[:sample_letters]
+        if not letters:
+            raise ValueError("Ciphertext contains no letters to attack.")
+        self.cipher_indices = np.frombuffer(letters, dtype=np.uint8).astype(np.int16) - 65
+        self.fingerprint = hashlib.sha256(letters).hexdigest()
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.threshold = (threshold if threshold is not None
+                          else RANDOM_SCORE + 0.9 * (ENGLISH_SCORE - RANDOM_SCORE))
+        self.top = top
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    @staticmethod
+    def _stream_words(source):
+        """Yield normalized keywords from a wordlist path or an iterable."""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, encoding="utf-8", errors="ignore") as f:
+                yield from (normalize(line) for line in f)
+        else:
+            yield from (normalize(word) for word in source)
+
+    def _batches(self, words):
+        """Group words into batches, keeping the count of raw entries consumed."""
+        batch, consumed = [], 0
+        for word in words:
+            consumed += 1
+            if word:
+                batch.append(word)
+            if consumed == self.batch_size:
+                yield batch, consumed
+                batch, consumed = [], 0
+        if consumed:
+            yield batch, consumed
+
+    def _load_checkpoint(self, path):
+        """Return the saved state for this ciphertext, or a fresh one."""
+        if not path or not os.path.exists(path):
+            return {"tested": 0, "best": []}
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("ciphertext") != self.fingerprint:
+            raise ValueError("Checkpoint belongs to a different ciphertext.")
+        return state
+
+    def _save_checkpoint(self, path, tested, best):
+        """Write progress via temp file + fsync + rename (atomic)."""
+        state = {"ciphertext": self.fingerprint, "tested": tested,
+                 "best": sorted(best, reverse=True)}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    # ---------------------
+    # Attack
+    # ---------------------
+
+    def run(self, wordlist, checkpoint_path=None, progress=None, checkpoint_interval=5.0):
+        """
+        Try every keyword of a wordlist until one decrypts to English.
+
+        Args:
+            wordlist (str | iterable[str]): Wordlist file (one word per line)
+                or any iterable of words.
+            checkpoint_path (str, optional): JSON file to resume from and to
+                record progress in.
+            progress (callable, optional): Called as ``progress(tested, rate)``
+                after each batch, with the keys/sec rate of this run.
+            checkpoint_interval (float): Seconds between checkpoint writes.
+
+        Returns:
+            dict: key (None if nothing scored as English), score, found,
+            tested (wordlist entries covered), resumed_from, elapsed, rate
+            and ``top`` (best keywords as (keyword, score), best first).
+        """
+        state = self._load_checkpoint(checkpoint_path)
+        resumed_from = state["tested"]
+        best = [tuple(item) for item in state["best"]]
+        heapq.heapify(best)
+        words = islice(self._stream_words(wordlist), resumed_from, None)
+        batches = self._batches(words)
+
+        # Batches finish out of order; only the contiguous prefix counts as tested
+        tested = resumed_from
+        finished = {}
+        next_id = submitted = 0
+        found = False
+        start = last_save = time.perf_counter()
+
+        def record(batch_id, results, consumed):
+            nonlocal tested, next_id, found
+            for item in results:
+                heapq.heappush(best, item)
+                if len(best) > self.top:
+                    heapq.heappop(best)
+                found = found or item[0] >= self.threshold
+            finished[batch_id] = consumed
+            while next_id in finished:
+                tested += finished.pop(next_id)
+                next_id += 1
+
+        if self.max_workers == 1:
+            for batch, consumed in batches:
+                results = _score_batch(self.cipher_indices, batch, self.top) if batch else []
+                record(submitted, results, consumed)
+                submitted += 1
+                if progress:
+                    progress(tested, (tested - resumed_from) / max(time.perf_counter() - start, 1e-9))
+                if checkpoint_path and time.perf_counter() - last_save >= checkpoint_interval:
+                    self._save_checkpoint(checkpoint_path, tested, best)
+                    last_save = time.perf_counter()
+                if found:
+                    break
+        else:
+            with ProcessPoolExecutor(self.max_workers) as pool:
+                pending = {}
+                exhausted = False
+                while not found:
+                    # Keep a bounded number of batches in flight while streaming
+                    while not exhausted and len(pending) < self.max_workers * 2:
+                        item = next(batches, None)
+                        if item is None:
+                            exhausted = True
+                            break
+                        batch, consumed = item
+                        future = pool.submit(_score_batch, self.cipher_indices, batch, self.top)
+                        pending[future] = (submitted, consumed)
+                        submitted += 1
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_id, consumed = pending.pop(future)
+                        record(batch_id, future.result(), consumed)
+                    if progress:
+                        progress(tested, (tested - resumed_from) / max(time.perf_counter() - start, 1e-9))
+                    if checkpoint_path and time.perf_counter() - last_save >= checkpoint_interval:
+                        self._save_checkpoint(checkpoint_path, tested, best)
+                        last_save = time.perf_counter()
+
+                for future in pending:
+                    future.cancel()
+
+        if checkpoint_path:
+            self._save_checkpoint(checkpoint_path, tested, best)
+
+        elapsed = time.perf_counter() - start
+        ranked = sorted(best, reverse=True)
+        top_score, top_key = ranked[0] if ranked else (None, None)
+        return {
+            "key": top_key if found else None,
+            "score": top_score,
+            "found": found,
+            "tested": tested,
+            "resumed_from": resumed_from,
+            "elapsed": elapsed,
+            "rate": (tested - resumed_from) / elapsed if elapsed > 0 else 0.0,
+            "top": [(keyword, score) for score, keyword in ranked],
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dictionary attack on a Vigenère ciphertext.")
+    parser.add_argument("ciphertext", help="File containing the ciphertext")
+    parser.add_argument("wordlist", help="Wordlist file, one candidate keyword per line")
+    parser.add_argument("--checkpoint", help="Progress file to resume from / write to")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=2048, help="Keywords per batch")
+    args = parser.parse_args(argv)
+
+    with open(args.ciphertext, "rb") as f:
+        ciphertext = f.read()
+    try:
+        attack = DictionaryAttack(ciphertext, batch_size=args.batch_size, max_workers=args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    last_shown = [0.0]
+
+    def show(tested, rate):
+        now = time.perf_counter()
+        if now - last_shown[0] >= 0.5:
+            last_shown[0] = now
+            print(f"\r  {tested:,} keywords tested  ({rate:,.0f} keys/sec)", end="", flush=True)
+
+    report = attack.run(args.wordlist, checkpoint_path=args.checkpoint, progress=show)
+    print()
+    if report["found"]:
+        print(f"Keyword found: {report['key']} (score {report['score']:.3f})")
+    else:
+        print("No keyword in the wordlist decrypts to English.")
+        for keyword, score in report["top"]:
+            print(f"  {keyword:<20} {score:.3f}")
+    print(f"{report['tested']:,} entries covered in {report['elapsed']:.2f}s "
+          f"({report['rate']:,.0f} keys/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+CipherSafe Text Normalization (normalize.py)
+--------------------------------------------
+Shared input normalization for the classical ciphers. Text is reduced
+to uppercase A-Z with precomputed ``bytes.translate`` tables, which run
+in C instead of a per-character Python loop. Characters outside A-Z
+(including accented letters) are dropped.
+
+The format-preserving variant also returns a compact layout of the
+stripped runs (spaces, punctuation, digits), so a cipher's output can be
+re-spaced like the original without scanning it again.
+"""
+
+import re
+
+# a-z -> A-Z, A-Z unchanged; every other byte is deleted
+_UPPER_TABLE = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_NON_LETTERS = bytes(b for b in range(256) if not (65 <= b <= 90 or 97 <= b <= 122))
+
+_STRIPPED_RUN = re.compile(r"([^A-Za-z]+)")
+
+
+def normalize_bytes(data):
+    """
+    Reduce ASCII bytes to uppercase letters in one translate pass.
+
+    Args:
+        data (bytes-like): Raw text bytes.
+
+    Returns:
+        bytes: Uppercase A-Z only.
+    """
+    return bytes(data).translate(_UPPER_TABLE, _NON_LETTERS)
+
+
+def normalize(text):
+    """
+    Reduce text to uppercase A-Z.
+
+    Args:
+        text (str): Raw input text.
+
+    Returns:
+        str: Sanitized uppercase letters.
+    """
+    if not text:
+        return ""
+    return text.encode("ascii", "ignore").translate(_UPPER_TABLE, _NON_LETTERS).decode("ascii")
+
+
+def normalize_with_layout(text):
+    """
+    Normalize text and remember where the stripped characters were.
+
+    Args:
+        text (str): Raw input text.
+
+    Returns:
+        tuple: (letters, layout) where layout is a list of
+        ``(letter_index, stripped_run)`` pairs: each run of removed
+        characters and the number of letters that precede it.
+    """
+    parts = _STRIPPED_RUN.split(text)
+    layout = []
+    letters = 0
+    for i, part in enumerate(parts):
+        if i % 2:
+            layout.append((letters, part))
+        else:
+            letters += len(part)
+    return "".join(parts[0::2]).upper(), layout
+
+
+def restore_layout(letters, layout):
+    """
+    Re-insert stripped runs into a letters-only string.
+
+    Args:
+        letters (str): Cipher output aligned with the normalized text.
+        layout (list): Layout returned by ``normalize_with_layout``.
+
+    Returns:
+        str: ``letters`` with the original spacing and punctuation.
+    """
+    if not layout:
+        return letters
+    pieces = []
+    previous = 0
+    for index, run in layout:
+        pieces.append(letters[previous:index])
+        pieces.append(run)
+        previous = index
+    pieces.append(letters[previous:])
+    return "".join(pieces)
@@ -0,0 +1,119 @@
+"""
+CipherSafe Cipher Registry (registry.py)
+----------------------------------------
+Resolves cipher mode names (as typed in the CLI, sent by the web UI or
+stored in the diary vault) to lazily imported, cached ``CipherBase``
+instances. Front ends dispatch on declared capabilities instead of
+hard-coded cipher names, so new engines plug in by registering here.
+"""
+
+import importlib
+import threading
+from collections import namedtuple
+
+from src.ciphers.cipher_base import CipherBase
+
+# Capability flags declared by registered ciphers
+STREAMING = "streaming"        # chunked encrypt_iter/decrypt_iter APIs
+BYTES = "bytes"                # encrypt_bytes/decrypt_bytes for raw data
+BATCH = "batch"                # encrypt_many/decrypt_many
+KEYGEN = "keygen"              # encrypt_message() can generate its own key
+ONE_TIME_PAD = "one-time-pad"  # keys are single-use and tracked by OTPKeyManager
+
+CipherSpec = namedtuple("CipherSpec", ["name", "label", "target", "aliases", "capabilities"])
+
+
+class CipherRegistry:
+    """Name -> lazily created singleton cipher, plus declared capabilities."""
+
+    def __init__(self):
+        self._specs = {}      # canonical name -> CipherSpec
+        self._aliases = {}    # lowercase alias -> canonical name
+        self._instances = {}  # canonical name -> cipher instance
+        self._lock = threading.Lock()
+
+    def register(self, name, target, label=None, aliases=(), capabilities=()):
+        """
+        Register a cipher without importing it.
+
+        Args:
+            name (str): Canonical mode name (e.g. "vigenere").
+            target (str): "package.module:ClassName" of a CipherBase subclass.
+            label (str, optional): Display name, also stored in the vault.
+            aliases (iterable[str]): Other accepted names (case-insensitive).
+            capabilities (iterable[str]): Capability flags the cipher supports.
+        """
+        spec = CipherSpec(name, label or name, target, tuple(aliases), frozenset(capabilities))
+        with self._lock:
+            self._specs[name] = spec
+            for alias in (name, spec.label, *spec.aliases):
+                self._aliases[alias.lower()] = name
+            self._instances.pop(name, None)
+
+    def resolve(self, name):
+        """
+        Map a mode name, label or alias to its canonical name.
+
+        Raises:
+            ValueError: If no cipher is registered under that name.
+        """
+        canonical = self._aliases.get(str(name).strip().lower())
+        if canonical is None:
+            raise ValueError(f"Unknown cipher mode '{name}'.")
+        return canonical
+
+    def names(self):
+        """Canonical names in registration order."""
+        return list(self._specs)
+
+    def spec(self, name):
+        """Return the CipherSpec of a cipher."""
+        return self._specs[self.resolve(name)]
+
+    def label(self, name):
+        """Display label of a cipher (the vault's ``cipher_type``)."""
+        return self.spec(name).label
+
+    def capabilities(self, name):
+        """Capability flags declared for a cipher."""
+        return self.spec(name).capabilities
+
+    def supports(self, name, capability):
+        """True if the cipher declares the given capability."""
+        return capability in self.capabilities(name)
+
+    def get(self, name):
+        """
+        Return the shared instance of a cipher, importing its module on first use.
+
+        Returns:
+            CipherBase: The cipher singleton.
+        """
+        canonical = self.resolve(name)
+        instance = self._instances.get(canonical)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(canonical)
+            if instance is None:
+                module_name, class_name = self._specs[canonical].target.split(":")
+                cls = getattr(importlib.import_module(module_name), class_name)
+                if not issubclass(cls, CipherBase):
+                    raise TypeError(f"{cls.__name__} does not implement CipherBase.")
+                instance = cls()
+                self._instances[canonical] = instance
+        return instance
+
+    def loaded(self):
+        """Names of ciphers that have been instantiated so far."""
+        return list(self._instances)
+
+
+registry = CipherRegistry()
+registry.register("vigenere", "src.ciphers.vigenere:VigenereCipher", label="Vigenère",
+                  aliases=("vigenère",), capabilities=(BATCH, STREAMING))
+registry.register("vernam", "src.ciphers.vernam:VernamCipher", label="Vernam OTP",
+                  aliases=("otp",), capabilities=(BATCH, BYTES, KEYGEN, ONE_TIME_PAD))
+registry.register("aes-gcm", "src.ciphers.aes_gcm:AESGCMCipher", label="AES-GCM",
+                  aliases=("aes", "aesgcm"), capabilities=(BATCH, BYTES, KEYGEN, STREAMING))
@@ -5,10 +5,19 @@ Implements the One-Time Pad (OTP) cipher — the only mathematically
 unbreakable encryption when properly used.
 """
 
+import mmap
 import secrets
 import string
 
-class VernamCipher:
+import numpy as np
+
+from src.ciphers.cipher_base import CipherBase
+from src.ciphers.normalize import normalize_with_layout, restore_layout
+from src.key_management.key_generator import KeyGenerator
+from src.telemetry.profiling import span
+
+
+class VernamCipher(CipherBase):
     """
     Vernam (One-Time Pad) Cipher Implementation.
 
@@ -21,14 +30,14 @@ class VernamCipher:
 
     def __init__(self):
         self.alphabet = string.ascii_uppercase
-
-    def _prepare_text(self, text):
-        """Sanitizes input: removes non-alphabet chars and converts to uppercase."""
-        return ''.join(char.upper() for char in text if char.isalpha())
+        self.key_gen = KeyGenerator()
 
     def generate_otp(self, length):
         """
-        Generates a truly random OTP key of given length using Python's secrets module.
+        Generates a truly random OTP key of given length.
+
+        Letters come from one bulk ``secrets.token_bytes`` read, with
+        rejection sampling so every letter is equally likely.
 
         Args:
             length (int): Length of plaintext message.
@@ -36,20 +45,26 @@ class VernamCipher:
         Returns:
             str: Random uppercase key of same length.
         """
-        return ''.join(secrets.choice(self.alphabet) for _ in range(length))
+        return self.key_gen.generate_otp_key(length)
 
-    def encrypt(self, plaintext, otp_key=None):
+    @span("cipher", "vernam.encrypt")
+    def encrypt(self, plaintext, otp_key=None, preserve_format=False):
         """
         Encrypt plaintext using Vernam cipher.
 
         Args:
             plaintext (str): Message to encrypt.
             otp_key (str): Optional existing key; otherwise generated.
+            preserve_format (bool): Keep the plaintext's spacing and
+                punctuation in the ciphertext.
 
         Returns:
             tuple: (ciphertext, otp_key)
         """
-        plaintext = self._prepare_text(plaintext)
+        if preserve_format:
+            plaintext, layout = normalize_with_layout(plaintext)
+        else:
+            plaintext, layout = self._prepare_text(plaintext), None
 
         # Generate random key if not provided
         if otp_key is None:
@@ -60,40 +75,193 @@ class VernamCipher:
         if len(otp_key) < len(plaintext):
             raise ValueError("OTP key must be at least as long as the plaintext.")
 
-        ciphertext = []
-        for i in range(len(plaintext)):
-            p = ord(plaintext[i]) - ord('A')
-            k = ord(otp_key[i]) - ord('A')
-            c = (p + k) % 26
-            ciphertext.append(chr(c + ord('A')))
+        ciphertext = self._combine(plaintext.encode('ascii'), otp_key.encode('ascii'), 1)
+        if layout:
+            ciphertext = restore_layout(ciphertext, layout)
+        return ciphertext, otp_key
 
-        return ''.join(ciphertext), otp_key
+    def encrypt_message(self, plaintext, key=None):
+        """Encrypt with the given OTP key, or a fresh one; returns (ciphertext, key)."""
+        return self.encrypt(plaintext, key or None)
 
-    def decrypt(self, ciphertext, otp_key):
+    @span("cipher", "vernam.decrypt")
+    def decrypt(self, ciphertext, otp_key, preserve_format=False):
         """
         Decrypt Vernam cipher (One-Time Pad).
 
         Args:
             ciphertext (str): Encrypted ciphertext.
             otp_key (str): Key used for encryption.
+            preserve_format (bool): Keep the ciphertext's spacing and
+                punctuation in the plaintext.
 
         Returns:
             str: The decrypted plaintext message.
         """
-        ciphertext = self._prepare_text(ciphertext)
+        if preserve_format:
+            ciphertext, layout = normalize_with_layout(ciphertext)
+        else:
+            ciphertext, layout = self._prepare_text(ciphertext), None
         otp_key = self._prepare_text(otp_key)
 
         if len(otp_key) < len(ciphertext):
             raise ValueError("OTP key must be at least as long as the ciphertext.")
 
-        plaintext = []
-        for i in range(len(ciphertext)):
-            c = ord(ciphertext[i]) - ord('A')
-            k = ord(otp_key[i]) - ord('A')
-            p = (c - k + 26) % 26
-            plaintext.append(chr(p + ord('A')))
+        plaintext = self._combine(ciphertext.encode('ascii'), otp_key.encode('ascii'), -1)
+        return restore_layout(plaintext, layout) if layout else plaintext
+
+    @span("cipher", "vernam.encrypt_bytes")
+    def encrypt_bytes(self, data, pad=None):
+        """
+        Byte-mode Vernam: XOR arbitrary bytes with pad bytes.
+
+        Args:
+            data (bytes): Message bytes.
+            pad (bytes-like, optional): Key material; random if omitted.
+
+        Returns:
+            tuple: (ciphertext bytes, pad bytes actually used)
+        """
+        if pad is None:
+            pad = secrets.token_bytes(len(data))
+        pad = bytes(pad[:len(data)])
+        if len(pad) < len(data):
+            raise ValueError("OTP pad must be at least as long as the data.")
+        return self._xor(data, pad), pad
+
+    @span("cipher", "vernam.decrypt_bytes")
+    def decrypt_bytes(self, ciphertext, pad):
+        """
+        Reverse ``encrypt_bytes`` (XOR is its own inverse).
+
+        Returns:
+            bytes: The original message bytes.
+        """
+        pad = bytes(pad[:len(ciphertext)])
+        if len(pad) < len(ciphertext):
+            raise ValueError("OTP pad must be at least as long as the ciphertext.")
+        return self._xor(ciphertext, pad)
+
+    def encrypt_bytes_iter(self, chunks, pad):
+        """
+        Byte-mode Vernam over a stream of chunks.
+
+        Args:
+            chunks (iterable[bytes]): Message bytes in pieces of any size.
+            pad (bytes-like): Key material covering the whole stream, e.g.
+                ``PadFileManager.read(segment)``; sliced without copying it.
+
+        Yields:
+            bytes: One ciphertext chunk per input chunk.
 
-        return ''.join(plaintext)
+        Raises:
+            ValueError: If the stream outruns the pad.
+        """
+        pad = memoryview(pad)
+        position = 0
+        for chunk in chunks:
+            window = pad[position:position + len(chunk)]
+            if len(window) < len(chunk):
+                raise ValueError("OTP pad ran out before the end of the stream.")
+            position += len(chunk)
+            yield self._xor(bytes(chunk), bytes(window))
+
+    # XOR is its own inverse
+    decrypt_bytes_iter = encrypt_bytes_iter
+
+    @staticmethod
+    def _xor(data, pad):
+        """XOR two equal-length byte strings using big-integer arithmetic."""
+        if not data:
+            return b''
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(pad, 'big')).to_bytes(len(data), 'big')
+
+    @staticmethod
+    def _combine(text, key, sign):
+        """
+        Add (sign=1) or subtract (sign=-1) key letters from text letters mod 26.
+
+        Works on whole numpy arrays, so the cost per message is a handful of
+        vector operations rather than a Python loop over characters.
+
+        Args:
+            text (bytes): Uppercase ASCII letters.
+            key (bytes): Uppercase ASCII letters, at least as long as text.
+
+        Returns:
+            str: Resulting uppercase letters.
+        """
+        shift = 65 - sign * 65  # removes the 'A' offsets of both operands
+        t = np.frombuffer(text, dtype=np.uint8).astype(np.int16)
+        k = np.frombuffer(key[:len(text)], dtype=np.uint8).astype(np.int16)
+        return (65 + (t + sign * k - shift) % 26).astype(np.uint8).tobytes().decode('ascii')
+
+    @staticmethod
+    def _window(source, offset, length):
+        """Slice [offset, offset + length) of a str or bytes-like source as bytes."""
+        window = source[offset:offset + length]
+        if isinstance(window, str):
+            window = window.encode('ascii')
+        return bytes(window)
+
+    def decrypt_range(self, ciphertext, otp_key, offset, length):
+        """
+        Decrypt only one window of a long ciphertext.
+
+        Only ``length`` characters of ciphertext and key are touched, so the
+        cost is proportional to the window, not to the message. Both inputs
+        are indexed by the same offset (the key position aligned with
+        ciphertext position 0 is the start of ``otp_key``).
+
+        Args:
+            ciphertext (str | bytes | memoryview | mmap): Letters-only ciphertext.
+            otp_key (str | bytes | memoryview | mmap): Matching key material,
+                e.g. ``PadFileManager.read(segment)``.
+            offset (int): First ciphertext position to decrypt.
+            length (int): Number of characters to decrypt.
+
+        Returns:
+            str: The plaintext of the requested window.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("Offset and length must be non-negative.")
+        text = self._window(ciphertext, offset, length)
+        key = self._window(otp_key, offset, length)
+        if len(key) < len(text):
+            raise ValueError("OTP key must cover the requested range.")
+        return self._combine(text, key, -1)
+
+    def decrypt_file_range(self, ciphertext_path, key_path, offset, length, key_offset=0):
+        """
+        Decrypt a window of a ciphertext file using a key or pad file.
+
+        Both files are memory-mapped, so only the pages backing the window
+        are read from disk.
+
+        Args:
+            ciphertext_path (str): File containing letters-only ciphertext.
+            key_path (str): Pad file containing the key material.
+            offset (int): First ciphertext position to decrypt.
+            length (int): Number of characters to decrypt.
+            key_offset (int): Pad position aligned with ciphertext position 0
+                (the offset of the message's pad segment).
+
+        Returns:
+            str: The plaintext of the requested window.
+        """
+        if offset < 0 or length < 0 or key_offset < 0:
+            raise ValueError("Offsets and length must be non-negative.")
+        if length == 0:
+            return ""
+        with open(ciphertext_path, 'rb') as cf, open(key_path, 'rb') as kf, \
+                mmap.mmap(cf.fileno(), 0, access=mmap.ACCESS_READ) as ciphertext, \
+                mmap.mmap(kf.fileno(), 0, access=mmap.ACCESS_READ) as pad:
+            text = ciphertext[offset:offset + length]
+            start = key_offset + offset
+            key = pad[start:start + len(text)]
+        if len(key) < len(text):
+            raise ValueError("OTP key must cover the requested range.")
+        return self._combine(text, key, -1)
 
 
 class OTPKeyManager:
@@ -5,7 +5,16 @@ Implements classical polyalphabetic substitution cipher
 for routine communications between agents.
 """
 
-class VigenereCipher:
+from src.ciphers.cipher_base import CipherBase
+from src.ciphers.normalize import normalize_with_layout, restore_layout
+from src.telemetry.profiling import span
+
+# _SHIFT_TABLES[k] maps each uppercase letter to the letter k places later
+_LETTERS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_SHIFT_TABLES = [bytes.maketrans(_LETTERS, _LETTERS[k:] + _LETTERS[:k]) for k in range(26)]
+
+
+class VigenereCipher(CipherBase):
     """
     Implements Vigenère cipher encryption and decryption.
 
@@ -16,32 +25,36 @@ class VigenereCipher:
     def __init__(self):
         self.alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
-    def _prepare_text(self, text):
-        """Cleans and uppercases text, filtering non-alphabet chars."""
-        return ''.join(char.upper() for char in text if char.isalpha())
-
-    def _generate_key(self, text, keyword):
+    def _shift(self, text, keyword, sign):
         """
-        Extend or repeat the keyword to match the text length.
-
-        Args:
-            text (str): The input text (plaintext or ciphertext)
-            keyword (str): The shared key used for encryption/decryption
+        Shift normalized text by the repeating keyword (sign=1 encrypts,
+        sign=-1 decrypts).
 
-        Returns:
-            str: Key repeated or truncated to match `text` length.
+        Every column of letters that shares a key letter is shifted with
+        one precomputed translate table, so the work per message is one
+        C-level pass per keyword letter instead of a Python loop per letter.
         """
-        keyword = keyword.upper()
-        key = []
-        key_index = 0
+        data = text.encode('ascii')
+        out = bytearray(len(data))
+        period = len(keyword)
+        for i, k in enumerate(keyword.encode('ascii')[:len(data)]):
+            out[i::period] = data[i::period].translate(_SHIFT_TABLES[(sign * (k - 65)) % 26])
+        return out.decode('ascii')
+
+    def _apply(self, text, keyword, sign, preserve_format):
+        """Normalize ``text``, shift it, and optionally restore its layout."""
+        keyword = self._prepare_text(keyword)
+        if not keyword:
+            action = "Encryption" if sign > 0 else "Decryption"
+            raise ValueError(f"{action} keyword cannot be empty.")
 
-        for char in text:
-            if char.isalpha():
-                key.append(keyword[key_index % len(keyword)])
-                key_index += 1
-        return ''.join(key)
+        if not preserve_format:
+            return self._shift(self._prepare_text(text), keyword, sign)
+        letters, layout = normalize_with_layout(text)
+        return restore_layout(self._shift(letters, keyword, sign), layout)
 
-    def encrypt(self, plaintext, keyword):
+    @span("cipher", "vigenere.encrypt")
+    def encrypt(self, plaintext, keyword, preserve_format=False):
         """
         Encrypts plaintext using the Vigenère cipher formula:
 
@@ -50,27 +63,16 @@ class VigenereCipher:
         Args:
             plaintext (str): The message to encrypt
             keyword (str): The shared key for encryption
+            preserve_format (bool): Keep the plaintext's spacing and
+                punctuation in the ciphertext
 
         Returns:
             str: The resulting ciphertext
         """
-        plaintext = self._prepare_text(plaintext)
-        keyword = self._prepare_text(keyword)
-        if not keyword:
-            raise ValueError("Encryption keyword cannot be empty.")
-
-        key = self._generate_key(plaintext, keyword)
-        ciphertext = []
+        return self._apply(plaintext, keyword, 1, preserve_format)
 
-        for i in range(len(plaintext)):
-            p = ord(plaintext[i]) - ord('A')
-            k = ord(key[i]) - ord('A')
-            c = (p + k) % 26
-            ciphertext.append(chr(c + ord('A')))
-
-        return ''.join(ciphertext)
-
-    def decrypt(self, ciphertext, keyword):
+    @span("cipher", "vigenere.decrypt")
+    def decrypt(self, ciphertext, keyword, preserve_format=False):
         """
         Decrypts ciphertext using the Vigenère cipher formula:
 
@@ -79,25 +81,55 @@ class VigenereCipher:
         Args:
             ciphertext (str): The encrypted message
             keyword (str): The shared key used for encryption
+            preserve_format (bool): Keep the ciphertext's spacing and
+                punctuation in the plaintext
 
         Returns:
             str: The decrypted plaintext
         """
-        ciphertext = self._prepare_text(ciphertext)
+        return self._apply(ciphertext, keyword, -1, preserve_format)
+
+    def _stream(self, chunks, keyword, sign):
+        """Shift the letters of a byte stream, carrying the key position across chunks."""
         keyword = self._prepare_text(keyword)
         if not keyword:
-            raise ValueError("Decryption keyword cannot be empty.")
+            action = "Encryption" if sign > 0 else "Decryption"
+            raise ValueError(f"{action} keyword cannot be empty.")
+
+        position = 0
+        for chunk in chunks:
+            # latin-1 maps every byte to one character, so other bytes pass through intact
+            letters, layout = normalize_with_layout(bytes(chunk).decode('latin-1'))
+            start = position % len(keyword)
+            shifted = self._shift(letters, keyword[start:] + keyword[:start], sign)
+            position += len(letters)
+            yield restore_layout(shifted, layout).encode('latin-1')
+
+    def encrypt_iter(self, chunks, keyword):
+        """
+        Encrypt a stream of byte chunks lazily.
+
+        Letters are uppercased and shifted; every other byte is passed
+        through, so the output matches ``encrypt(..., preserve_format=True)``
+        on the whole text.
+
+        Args:
+            chunks (iterable[bytes]): Plaintext in pieces of any size.
+            keyword (str): The shared key for encryption
 
-        key = self._generate_key(ciphertext, keyword)
-        plaintext = []
+        Yields:
+            bytes: One ciphertext chunk per input chunk.
+        """
+        return self._stream(chunks, keyword, 1)
 
-        for i in range(len(ciphertext)):
-            c = ord(ciphertext[i]) - ord('A')
-            k = ord(key[i]) - ord('A')
-            p = (c - k + 26) % 26
-            plaintext.append(chr(p + ord('A')))
+    def decrypt_iter(self, chunks, keyword):
+        """
+        Decrypt a stream produced by ``encrypt_iter``.
 
-        return ''.join(plaintext)
+        Yields:
+            bytes: One plaintext chunk per input chunk.
+        """
+        return self._stream(chunks, keyword, -1)
 
 
 # Demonstration when run as a standalone script
@@ -114,3 +146,6 @@ if __name__ == "__main__":
 
     decrypted = cipher.decrypt(encrypted, keyword)
     print(f"Decrypted: {decrypted}")
+
+    formatted = cipher.encrypt(plaintext, keyword, preserve_format=True)
+    print(f"Formatted: {formatted} -> {cipher.decrypt(formatted, keyword, preserve_format=True)}")
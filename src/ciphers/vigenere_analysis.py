@@ -0,0 +1,260 @@
+"""
+CipherSafe Vigenère Cryptanalysis (vigenere_analysis.py)
+--------------------------------------------------------
+Breaks ``VigenereCipher`` ciphertexts without the keyword, the way HQ
+audits an intercepted channel. Key length is estimated with the index of
+coincidence and Kasiski examination; each key letter is then recovered by
+chi-square scoring of its column against English letter frequencies.
+All statistics are NumPy histograms, and candidate key lengths are
+scored in parallel worker processes for large intercepts.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from src.ciphers.normalize import normalize_bytes
+from src.telemetry.profiling import span
+
+# Relative letter frequencies of English text, A-Z
+ENGLISH_FREQUENCIES = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015,
+    0.06094, 0.06966, 0.00153, 0.00772, 0.04025, 0.02406, 0.06749,
+    0.07507, 0.01929, 0.00095, 0.05987, 0.06327, 0.09056, 0.02758,
+    0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+ENGLISH_IOC = float((ENGLISH_FREQUENCIES ** 2).sum())  # ~0.0655
+RANDOM_IOC = 1 / 26
+
+# _SHIFTED[s, j]: expected frequency of ciphertext letter j under key shift s
+_SHIFTED = np.stack([np.roll(ENGLISH_FREQUENCIES, s) for s in range(26)])
+
+
+class VigenereAnalyzer:
+    """
+    Key recovery for the Vigenère cipher.
+
+    - The index of coincidence (IoC) of every column is close to English
+      (~0.066) when the guessed period matches the key length, and close
+      to uniform (~0.038) otherwise.
+    - Kasiski examination measures how often the distances between
+      repeated trigrams are multiples of each candidate period.
+    - For the chosen period each column is a Caesar cipher; the shift with
+      the lowest chi-square against English frequencies is the key letter.
+    """
+
+    # Letters x periods above which candidate periods go to worker processes
+    PARALLEL_MIN_WORK = 8_000_000
+    # Share of the way from uniform to English IoC a period must reach
+    IOC_THRESHOLD = 0.6
+    # Leading letters searched for repeated trigrams (Kasiski)
+    KASISKI_LETTERS = 100_000
+
+    def __init__(self, max_key_length=20, max_workers=None):
+        """
+        Args:
+            max_key_length (int): Longest key length considered.
+            max_workers (int, optional): Processes used for large intercepts.
+        """
+        if max_key_length < 1:
+            raise ValueError("max_key_length must be positive.")
+        self.max_key_length = max_key_length
+        self.max_workers = max_workers
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    @staticmethod
+    def _to_indices(ciphertext):
+        """Letters of a ciphertext (str or bytes) as a uint8 array of 0-25."""
+        if isinstance(ciphertext, str):
+            ciphertext = ciphertext.encode("ascii", "ignore")
+        letters = normalize_bytes(ciphertext)
+        return np.frombuffer(letters, dtype=np.uint8) - 65
+
+    @staticmethod
+    def _column_counts(indices, period):
+        """Letter histogram of every column: (period, 26) int array."""
+        # Rows of ``period`` letters; column c's letters are offset into bins c*26..c*26+25
+        full = indices.size - indices.size % period
+        offsets = np.arange(0, 26 * period, 26, dtype=np.int32)
+        codes = indices[:full].reshape(-1, period).astype(np.int32) + offsets
+        counts = np.bincount(codes.ravel(), minlength=period * 26)
+        tail = indices[full:].astype(np.int32) + offsets[:indices.size - full]
+        counts += np.bincount(tail, minlength=period * 26)
+        return counts.reshape(period, 26)
+
+    @staticmethod
+    def _ioc(counts):
+        """Mean index of coincidence of per-column histograms."""
+        totals = counts.sum(axis=1)
+        valid = totals > 1
+        if not valid.any():
+            return 0.0
+        pairs = (counts * (counts - 1)).sum(axis=1)
+        return float((pairs[valid] / (totals[valid] * (totals[valid] - 1))).mean())
+
+    @staticmethod
+    def _primitive_key(key):
+        """Shortest keyword whose repetition yields ``key`` (ABCABC -> ABC)."""
+        for size in range(1, len(key)):
+            if len(key) % size == 0 and key[:size] * (len(key) // size) == key:
+                return key[:size]
+        return key
+
+    # ---------------------
+    # Statistics
+    # ---------------------
+
+    def index_of_coincidence(self, ciphertext, period=1):
+        """
+        Mean column IoC of a ciphertext for one assumed key length.
+
+        Returns:
+            float: ~0.066 for English columns, ~0.038 for uniform letters.
+        """
+        return self._ioc(self._column_counts(self._to_indices(ciphertext), period))
+
+    def kasiski(self, ciphertext):
+        """
+        Kasiski examination over repeated trigrams.
+
+        Returns:
+            dict: {period: share of repeat distances divisible by period}
+            for periods 2..max_key_length.
+        """
+        return self._kasiski(self._to_indices(ciphertext))
+
+    def _kasiski(self, indices):
+        """Kasiski shares for ciphertext letters already converted to 0-25."""
+        indices = indices[:self.KASISKI_LETTERS].astype(np.int32)
+        periods = np.arange(2, self.max_key_length + 1)
+        if indices.size < 6 or periods.size == 0:
+            return {int(p): 0.0 for p in periods}
+
+        trigrams = indices[:-2] * 676 + indices[1:-1] * 26 + indices[2:]
+        order = np.argsort(trigrams, kind="stable")
+        same = trigrams[order[1:]] == trigrams[order[:-1]]
+        distances = (order[1:] - order[:-1])[same]
+        if distances.size == 0:
+            return {int(p): 0.0 for p in periods}
+
+        shares = (distances[:, None] % periods[None, :] == 0).mean(axis=0)
+        return {int(p): float(s) for p, s in zip(periods, shares)}
+
+    def score_period(self, indices, period):
+        """
+        Recover the best key for one assumed period.
+
+        Args:
+            indices (np.ndarray): Ciphertext letters as 0-25.
+            period (int): Assumed key length.
+
+        Returns:
+            dict: period, ioc, key and chi_square (plaintext fit to English,
+            lower is better).
+        """
+        counts = self._column_counts(indices, period)
+        totals = counts.sum(axis=1, keepdims=True)
+
+        # chi[c, s] = sum_j (O_cj - E_csj)^2 / E_csj for every column c and shift s
+        expected = totals[:, None, :] * _SHIFTED[None, :, :]
+        expected = np.where(expected > 0, expected, 1e-9)
+        chi = ((counts[:, None, :] - expected) ** 2 / expected).sum(axis=2)
+        shifts = chi.argmin(axis=1)
+
+        # Plaintext histogram = every column rotated back by its shift
+        rows = np.arange(26)[None, :]
+        plain = counts[np.arange(period)[:, None], (rows + shifts[:, None]) % 26].sum(axis=0)
+        expected_plain = max(plain.sum(), 1) * ENGLISH_FREQUENCIES
+
+        return {
+            "period": period,
+            "ioc": self._ioc(counts),
+            "key": "".join(chr(65 + int(s)) for s in shifts),
+            "chi_square": float(((plain - expected_plain) ** 2 / expected_plain).sum()),
+        }
+
+    def score_periods(self, ciphertext):
+        """
+        Score every candidate key length, in parallel for large intercepts.
+
+        Returns:
+            list[dict]: ``score_period`` results for periods 1..max_key_length.
+        """
+        return self._score_periods(self._to_indices(ciphertext))
+
+    def _score_periods(self, indices):
+        """``score_periods`` for ciphertext letters already converted to 0-25."""
+        periods = range(1, min(self.max_key_length, max(indices.size // 2, 1)) + 1)
+        if indices.size * len(periods) < self.PARALLEL_MIN_WORK or self.max_workers == 1:
+            return [self.score_period(indices, period) for period in periods]
+        with ProcessPoolExecutor(self.max_workers) as pool:
+            return list(pool.map(self.score_period, repeat(indices), periods))
+
+    # ---------------------
+    # Reports
+    # ---------------------
+
+    @span("cipher", "vigenere.analyze")
+    def analyze(self, ciphertext):
+        """
+        Estimate the key length and recover the keyword.
+
+        The shortest period whose column IoC looks like English wins, since
+        multiples of the true key length score just as well. If no period
+        gets there (very short intercepts), the best chi-square fit is used.
+
+        Args:
+            ciphertext (str | bytes): Intercepted Vigenère ciphertext.
+
+        Returns:
+            dict: key, key_length, ioc, chi_square, the per-period
+            ``candidates`` (best fit first) and the ``kasiski`` shares.
+
+        Raises:
+            ValueError: If the ciphertext contains no letters.
+        """
+        indices = self._to_indices(ciphertext)
+        if indices.size == 0:
+            raise ValueError("Ciphertext contains no letters to analyze.")
+        scores = self._score_periods(indices)
+
+        threshold = RANDOM_IOC + self.IOC_THRESHOLD * (ENGLISH_IOC - RANDOM_IOC)
+        ranked = sorted(scores, key=lambda s: s["chi_square"])
+        chosen = next((score for score in scores if score["ioc"] >= threshold), ranked[0])
+        key = self._primitive_key(chosen["key"])
+
+        return {
+            "key": key,
+            "key_length": len(key),
+            "ioc": chosen["ioc"],
+            "chi_square": chosen["chi_square"],
+            "candidates": ranked,
+            "kasiski": self._kasiski(indices),
+        }
+
+
+# ---------------------
+# Standalone Demo
+# ---------------------
+if __name__ == "__main__":
+    import random
+    import time
+    from src.ciphers.vigenere import VigenereCipher
+
+    words = ("agent zoe reports that the courier will cross river at dawn "
+             "headquarters must confirm extraction route before midnight and "
+             "every message after this one moves to a one time pad").split()
+    rng = random.Random(47)
+    text = " ".join(rng.choice(words) for _ in range(250_000))
+    ciphertext = VigenereCipher().encrypt(text, "STEALTH")
+
+    print("=== CipherSafe Vigenère Cryptanalysis Demo ===")
+    start = time.perf_counter()
+    report = VigenereAnalyzer().analyze(ciphertext)
+    elapsed = time.perf_counter() - start
+    print(f"Ciphertext: {len(ciphertext):,} letters")
+    print(f"Recovered key: {report['key']} (IoC {report['ioc']:.4f}) in {elapsed:.3f}s")
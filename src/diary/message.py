@@ -15,7 +15,8 @@ class Message:
     Used by DiaryVault for storage and retrieval operations.
     """
 
-    def __init__(self, sender, receiver, cipher_type, ciphertext, plaintext=None, key_used=None):
+    def __init__(self, sender, receiver, cipher_type, ciphertext, plaintext=None, key_used=None,
+                 pad_ref=None):
         """
         Initialize a message entry.
 
@@ -26,6 +27,8 @@ class Message:
             ciphertext (str): Encrypted message text
             plaintext (str): Decrypted version of message (optional)
             key_used (str): Encryption key or reference (optional)
+            pad_ref (dict): Pad segment {pad_id, offset, length} used as
+                the OTP key instead of storing the key itself (optional)
         """
         self.id = str(uuid.uuid4())
         self.sender = sender
@@ -34,6 +37,7 @@ class Message:
         self.ciphertext = ciphertext
         self.plaintext = plaintext
         self.key_used = key_used
+        self.pad_ref = dict(pad_ref) if pad_ref else None
         self.timestamp = datetime.utcnow().isoformat() + "Z"
         self.status = "decrypted" if plaintext else "encrypted"
 
@@ -49,6 +53,7 @@ class Message:
             "ciphertext": self.ciphertext,
             "plaintext": self.plaintext,
             "key_used": self.key_used,
+            "pad_ref": self.pad_ref,
             "timestamp": self.timestamp,
             "status": self.status,
         }
@@ -70,7 +75,8 @@ class Message:
             data["cipher_type"],
             data["ciphertext"],
             data.get("plaintext"),
-            data.get("key_used")
+            data.get("key_used"),
+            data.get("pad_ref")
         )
         msg.id = data.get("id", str(uuid.uuid4()))
         msg.timestamp = data.get("timestamp", datetime.utcnow().isoformat() + "Z")
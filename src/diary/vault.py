@@ -3,43 +3,120 @@ CipherSafe Diary Vault (vault.py)
 ---------------------------------
 Stores and retrieves encrypted and decrypted messages.
 Acts as the local “agent’s diary,” logging every communication.
+
+Entries are rows in a local SQLite database, so logging or decrypting a
+message writes one row however large the diary grows. One vault may be
+shared by many threads (the web app) and processes (gunicorn workers);
+SQLite serializes their writes. A diary in the earlier JSON format
+(``diary_vault.json``) is migrated on first use.
 """
 
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 
 from src.diary.message import Message
+from src.telemetry.metrics import timed_storage
+from src.telemetry.profiling import span
 
 
 class DiaryVault:
     """
     Manages message storage, retrieval, and updates.
-    Handles maintaining encrypted-to-decrypted message pairs in local JSON.
-    """
-
-    def __init__(self, vault_path="data/diary_vault.json"):
-        self.vault_path = vault_path
-        os.makedirs(os.path.dirname(vault_path), exist_ok=True)
-        self._initialize_vault()
+    Handles maintaining encrypted-to-decrypted message pairs in local SQLite.
 
-    def _initialize_vault(self):
-        """Ensure JSON vault file exists."""
-        if not os.path.exists(self.vault_path):
-            with open(self.vault_path, 'w') as f:
-                json.dump({"version": "1.0", "messages": []}, f, indent=2)
-
-    def _load_vault(self):
-        """Load vault JSON data."""
-        with open(self.vault_path, 'r') as f:
-            return json.load(f)
+    Entries are returned as new dicts on every call; changing one does
+    not change the vault.
+    """
 
-    def _save_vault(self, data):
-        """Rewrite vault content safely."""
-        with open(self.vault_path, 'w') as f:
-            json.dump(data, f, indent=2)
+    FIELDS = ("id", "sender", "receiver", "cipher_type", "ciphertext", "plaintext",
+              "key_used", "pad_ref", "timestamp", "status", "updated")
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            seq         INTEGER PRIMARY KEY,
+            id          TEXT NOT NULL UNIQUE,
+            sender      TEXT,
+            receiver    TEXT,
+            cipher_type TEXT,
+            ciphertext  TEXT,
+            plaintext   TEXT,
+            key_used    TEXT,
+            pad_ref     TEXT,
+            timestamp   TEXT,
+            status      TEXT NOT NULL,
+            updated     TEXT
+        );
+        CREATE INDEX IF NOT EXISTS messages_status ON messages (status);
+    """
 
-    def add_entry(self, sender, receiver, cipher_type, ciphertext, plaintext=None, key_used=None):
+    def __init__(self, vault_path="data/diary_vault.db"):
+        """
+        Args:
+            vault_path (str): Vault database; a ``.json`` path names the
+                legacy file and stores the database beside it as ``.db``.
+        """
+        base = os.path.splitext(vault_path)[0]
+        self.vault_path = base + ".db"
+        self.legacy_file = base + ".json"
+        os.makedirs(os.path.dirname(vault_path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.vault_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate_json_file()
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    def _row(self, message):
+        """Column values for a message dict, in ``FIELDS`` order."""
+        row = [message.get(field) for field in self.FIELDS]
+        pad_ref = message.get("pad_ref")
+        row[self.FIELDS.index("pad_ref")] = json.dumps(pad_ref) if pad_ref else None
+        row[self.FIELDS.index("status")] = message.get("status") or "encrypted"
+        return row
+
+    def _entry(self, row):
+        """Build a fresh entry dict from a database row."""
+        entry = dict(zip(self.FIELDS, row))
+        entry["pad_ref"] = json.loads(entry["pad_ref"]) if entry["pad_ref"] else None
+        if entry["updated"] is None:
+            del entry["updated"]
+        return entry
+
+    def _select(self, where="", params=()):
+        """Entries matching a WHERE clause, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM messages {where} ORDER BY seq", params).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def _insert(self, rows):
+        placeholders = ", ".join("?" * len(self.FIELDS))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO messages ({', '.join(self.FIELDS)}) VALUES ({placeholders})",
+                rows)
+
+    def _migrate_json_file(self):
+        """Import entries from a legacy JSON vault, then rename it to *.migrated."""
+        if not os.path.exists(self.legacy_file):
+            return
+        with open(self.legacy_file, 'r') as f:
+            messages = json.load(f).get("messages", [])
+        self._insert([self._row(message) for message in messages])
+        os.replace(self.legacy_file, self.legacy_file + ".migrated")
+
+    # ---------------------
+    # Public API
+    # ---------------------
+
+    def add_entry(self, sender, receiver, cipher_type, ciphertext, plaintext=None, key_used=None,
+                  pad_ref=None):
         """
         Add new encrypted or decrypted message to vault.
 
@@ -50,45 +127,85 @@ class DiaryVault:
             ciphertext (str): Encrypted message text.
             plaintext (str, optional): Decrypted text.
             key_used (str, optional): Encryption key used.
+            pad_ref (dict, optional): Pad segment {pad_id, offset, length}
+                holding the OTP key, recorded instead of key_used.
         """
-        vault = self._load_vault()
-        message = Message(sender, receiver, cipher_type, ciphertext, plaintext, key_used)
-        vault["messages"].append(message.to_dict())
-        self._save_vault(vault)
+        message = Message(sender, receiver, cipher_type, ciphertext, plaintext, key_used, pad_ref)
+        self.add_messages([message])
         return message.id
 
+    @span("vault", "add")
+    @timed_storage("vault", "save")
+    def add_messages(self, messages):
+        """
+        Append several ``Message`` objects in a single transaction.
+
+        Returns:
+            list[str]: Ids of the stored messages.
+        """
+        if messages:
+            self._insert([self._row(message.to_dict()) for message in messages])
+        return [message.id for message in messages]
+
+    @timed_storage("vault", "load")
     def list_all(self):
         """Return all stored diary entries."""
-        return self._load_vault()["messages"]
+        return self._select()
 
     def list_encrypted_only(self):
         """Return only encrypted (undecrypted) messages."""
-        return [m for m in self._load_vault()["messages"] if m["status"] == "encrypted"]
+        return self._select("WHERE status = ?", ("encrypted",))
 
-    def update_entry(self, message_id, plaintext):
+    def update_entry(self, message_id, plaintext, expect_status=None):
         """
         Update existing message with decrypted content.
 
         Args:
             message_id (str): UUID of stored message.
             plaintext (str): Decrypted text to store.
+            expect_status (str, optional): Only update a message whose
+                status is still this value (checked in the same statement
+                as the update, so concurrent callers cannot both succeed).
+
+        Returns:
+            bool: True if the message was updated.
+        """
+        return message_id in self.update_entries({message_id: plaintext}, expect_status)
+
+    @span("vault", "update")
+    @timed_storage("vault", "save")
+    def update_entries(self, updates, expect_status=None):
         """
-        vault = self._load_vault()
-        for msg in vault["messages"]:
-            if msg["id"] == message_id:
-                msg["plaintext"] = plaintext
-                msg["status"] = "decrypted"
-                msg["updated"] = datetime.utcnow().isoformat() + "Z"
-                break
-        self._save_vault(vault)
-        return True
+        Store decrypted content for several messages in a single transaction.
+
+        Args:
+            updates (dict): {message id: plaintext}.
+            expect_status (str, optional): See ``update_entry``.
+
+        Returns:
+            set: Ids of the messages that were updated.
+        """
+        updated = set()
+        now = datetime.utcnow().isoformat() + "Z"
+        with self._lock, self._conn:
+            for message_id, plaintext in updates.items():
+                cursor = self._conn.execute(
+                    "UPDATE messages SET plaintext = ?, status = 'decrypted', updated = ? "
+                    "WHERE id = ? AND (? IS NULL OR status = ?)",
+                    (plaintext, now, message_id, expect_status, expect_status))
+                if cursor.rowcount:
+                    updated.add(message_id)
+        return updated
 
     def get_entry(self, message_id):
         """Retrieve a specific message by ID."""
-        for msg in self._load_vault()["messages"]:
-            if msg["id"] == message_id:
-                return msg
-        return None
+        entries = self._select("WHERE id = ?", (message_id,))
+        return entries[0] if entries else None
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 # ---------------------
@@ -12,9 +12,35 @@ import string
 class KeyGenerator:
     """Generates secure, random cryptographic keys."""
 
+    # Bytes >= 234 (26 * 9) are dropped so ``b % 26`` stays unbiased
+    _LETTER_TABLE = bytes(ord('A') + b % 26 for b in range(256))
+    _REJECT_BYTES = bytes(range(26 * 9, 256))
+    # generate_many gives up after this many rejected candidates per key
+    # requested (and at least MIN_REJECTED), i.e. when the key space left
+    # over by ``exclude`` is (nearly) used up
+    REJECTED_PER_KEY = 20
+    MIN_REJECTED = 10_000
+
     def __init__(self):
         self.alphabet = string.ascii_uppercase
 
+    def _random_letters(self, count):
+        """
+        Draw uniformly random uppercase letters from one bulk CSPRNG read.
+
+        Args:
+            count (int): Number of letters needed.
+
+        Returns:
+            str: ``count`` random letters A-Z.
+        """
+        letters = b''
+        while len(letters) < count:
+            needed = count - len(letters)
+            raw = secrets.token_bytes(needed + needed // 8 + 16)
+            letters += raw.translate(None, self._REJECT_BYTES)
+        return letters[:count].translate(self._LETTER_TABLE).decode('ascii')
+
     def generate_vigenere_key(self, length=6):
         """
         Generate random uppercase keyword for Vigenère cipher.
@@ -25,7 +51,7 @@ class KeyGenerator:
         Returns:
             str: Secure random uppercase keyword.
         """
-        return ''.join(secrets.choice(self.alphabet) for _ in range(length))
+        return self._random_letters(length)
 
     def generate_otp_key(self, length):
         """
@@ -37,7 +63,53 @@ class KeyGenerator:
         Returns:
             str: Truly random key of specified length.
         """
-        return ''.join(secrets.choice(self.alphabet) for _ in range(length))
+        return self._random_letters(length)
+
+    def generate_many(self, key_type, count, length=None, exclude=None):
+        """
+        Generate many distinct keys from a single large CSPRNG read.
+
+        Args:
+            key_type (str): "vigenere" or "otp".
+            count (int): Number of keys to produce.
+            length (int, optional): Key length (Vigenère defaults to 6;
+                required for OTP).
+            exclude (callable, optional): Predicate returning True for key
+                values that must not be issued (e.g. already stored keys).
+
+        Returns:
+            list[str]: ``count`` unique keys.
+
+        Raises:
+            ValueError: If too few unused keys of that length remain.
+        """
+        if length is None:
+            if key_type.lower() != "vigenere":
+                raise ValueError("OTP keys need an explicit length.")
+            length = 6
+        if length <= 0 or count < 0:
+            raise ValueError("Key length must be positive and count non-negative.")
+        if count > len(self.alphabet) ** min(length, 14):
+            raise ValueError("Not enough distinct keys of that length.")
+
+        keys = []
+        seen = set()
+        budget = max(self.MIN_REJECTED, count * self.REJECTED_PER_KEY)
+        while len(keys) < count:
+            missing = count - len(keys)
+            block = self._random_letters(missing * length)
+            for i in range(0, len(block), length):
+                key = block[i:i + length]
+                if key in seen or (exclude is not None and exclude(key)):
+                    budget -= 1
+                    if budget < 0:
+                        raise ValueError(
+                            f"Could not find {count} unused keys of length {length} "
+                            f"(only {len(keys)} found); the key space is nearly exhausted.")
+                    continue
+                seen.add(key)
+                keys.append(key)
+        return keys
 
 
 if __name__ == "__main__":
@@ -45,3 +117,4 @@ if __name__ == "__main__":
     print("=== CipherSafe Key Generator Demo ===")
     print(f"Vigenère Key (6): {gen.generate_vigenere_key()}")
     print(f"OTP Key (20): {gen.generate_otp_key(20)}")
+    print(f"Vigenère Batch (5): {gen.generate_many('vigenere', 5)}")
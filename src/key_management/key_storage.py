@@ -2,58 +2,279 @@
 CipherSafe Key Storage Module (key_storage.py)
 ----------------------------------------------
 Handles saving and loading of encryption keys (Vigenère and OTP).
-Stored keys are organized in JSON format to maintain persistency
-and integrity between sessions.
+Keys are kept in a local SQLite database so each save is a single
+appended row, and an in-memory digest index answers ``key_exists``
+in constant time. A unique index on the value digest lets the database
+itself refuse a value stored twice, even across worker processes. Key
+files from the earlier JSON format (``shared_keys.json`` /
+``otp_keys.json``) are migrated on first use.
 """
 
+import hashlib
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
 
+from src.telemetry.metrics import timed_storage
+from src.telemetry.profiling import span
+
 class KeyStorage:
     """Manages loading and saving of encryption keys."""
 
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS keys (
+            cipher_type TEXT NOT NULL,
+            key_id      TEXT NOT NULL,
+            key_value   TEXT NOT NULL,
+            digest      BLOB NOT NULL,
+            timestamp   TEXT NOT NULL,
+            PRIMARY KEY (cipher_type, key_id)
+        );
+        DROP INDEX IF EXISTS keys_digest;
+        CREATE UNIQUE INDEX IF NOT EXISTS keys_value ON keys (cipher_type, digest);
+    """
+    # Stores written before values were unique keep each value's first id
+    DEDUPE = """
+        DELETE FROM keys WHERE rowid NOT IN
+            (SELECT MIN(rowid) FROM keys GROUP BY cipher_type, digest)
+    """
+
     def __init__(self, storage_path="data/keys/"):
         self.storage_path = storage_path
+        self.db_file = os.path.join(storage_path, "keys.db")
         self.vigenere_file = os.path.join(storage_path, "shared_keys.json")
         self.otp_file = os.path.join(storage_path, "otp_keys.json")
         os.makedirs(storage_path, exist_ok=True)
-        self._initialize_files()
 
-    def _initialize_files(self):
-        """Create empty files if they don’t exist."""
-        for file in [self.vigenere_file, self.otp_file]:
+        self._lock = threading.RLock()
+        self._index = {}  # cipher type -> {digest: key_id}
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            self._conn.executescript(self.SCHEMA)
+        except sqlite3.IntegrityError:
+            with self._conn:
+                self._conn.execute(self.DEDUPE)
+            self._conn.executescript(self.SCHEMA)
+        self._migrate_json_files()
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    @staticmethod
+    def _normalize_type(cipher_type):
+        """Map a cipher name onto its storage bucket."""
+        return "vigenere" if cipher_type.lower() == "vigenere" else "otp"
+
+    @staticmethod
+    def _digest(key_value):
+        """Fixed-size fingerprint of a key value used by the lookup index."""
+        return hashlib.blake2b(key_value.encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def _timestamp():
+        return datetime.utcnow().isoformat() + "Z"
+
+    def _get_index(self, cipher_type):
+        """Return (building on first use) the digest index for a bucket."""
+        index = self._index.get(cipher_type)
+        if index is None:
+            rows = self._conn.execute(
+                "SELECT digest, key_id FROM keys WHERE cipher_type = ?", (cipher_type,))
+            index = {bytes(digest): key_id for digest, key_id in rows}
+            self._index[cipher_type] = index
+        return index
+
+    def _owner(self, cipher_type, digest):
+        """Key id a digest is stored under in the database, or None."""
+        row = self._conn.execute(
+            "SELECT key_id FROM keys WHERE cipher_type = ? AND digest = ?",
+            (cipher_type, digest)).fetchone()
+        return None if row is None else row[0]
+
+    def _migrate_json_files(self):
+        """
+        Import keys from legacy JSON files, then rename them to *.migrated.
+
+        Legacy files could hold one value under several ids; only the
+        first of those ids is kept.
+        """
+        for cipher_type, file in (("vigenere", self.vigenere_file), ("otp", self.otp_file)):
             if not os.path.exists(file):
-                with open(file, 'w') as f:
-                    json.dump({"version": "1.0", "keys": {}}, f, indent=2)
+                continue
+            with open(file, 'r') as f:
+                keys = json.load(f).get("keys", {})
+            rows = [
+                (cipher_type, key_id, entry["key_value"], self._digest(entry["key_value"]),
+                 entry.get("timestamp", self._timestamp()))
+                for key_id, entry in keys.items()
+            ]
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO keys VALUES (?, ?, ?, ?, ?)", rows)
+            os.replace(file, file + ".migrated")
+
+    # ---------------------
+    # Public API
+    # ---------------------
 
+    @timed_storage("keys", "load")
     def load_keys(self, cipher_type):
         """Load saved keys depending on cipher type."""
-        file = self.vigenere_file if cipher_type.lower() == "vigenere" else self.otp_file
-        with open(file, 'r') as f:
-            return json.load(f).get("keys", {})
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key_id, key_value, timestamp FROM keys WHERE cipher_type = ?",
+                (self._normalize_type(cipher_type),)).fetchall()
+        return {key_id: {"key_value": value, "timestamp": ts} for key_id, value, ts in rows}
 
+    @timed_storage("keys", "save")
     def save_key(self, cipher_type, key_id, key_value):
-        """Save new key entry with timestamp."""
-        file = self.vigenere_file if cipher_type.lower() == "vigenere" else self.otp_file
-        if os.path.exists(file):
-            with open(file, 'r') as f:
-                data = json.load(f)
-        else:
-            data = {"version": "1.0", "keys": {}}
+        """
+        Save a key entry with timestamp, replacing the id's previous value.
 
-        data["keys"][key_id] = {
-            "key_value": key_value,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
-        }
+        Raises:
+            ValueError: If the value is already stored under another id.
+        """
+        cipher_type = self._normalize_type(cipher_type)
+        digest = self._digest(key_value)
+        with self._lock:
+            index = self._get_index(cipher_type)
+            previous = self._conn.execute(
+                "SELECT digest FROM keys WHERE cipher_type = ? AND key_id = ?",
+                (cipher_type, key_id)).fetchone()
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO keys VALUES (?, ?, ?, ?, ?) ON CONFLICT (cipher_type, key_id) "
+                        "DO UPDATE SET key_value = excluded.key_value, digest = excluded.digest, "
+                        "timestamp = excluded.timestamp",
+                        (cipher_type, key_id, key_value, digest, self._timestamp()))
+            except sqlite3.IntegrityError:
+                owner = self._owner(cipher_type, digest)
+                raise ValueError(f"Duplicate key value for '{key_id}' (stored as '{owner}').") from None
+            if previous is not None and bytes(previous[0]) != digest:
+                index.pop(bytes(previous[0]), None)
+            index[digest] = key_id
 
-        with open(file, 'w') as f:
-            json.dump(data, f, indent=2)
+    @timed_storage("keys", "save_many")
+    def save_many(self, cipher_type, keys):
+        """
+        Save a batch of keys in a single transaction.
 
+        Values repeated within the batch are caught before anything is
+        written; clashes with stored ids or values are refused by the
+        database's unique indexes. Either way nothing is saved.
+
+        Args:
+            cipher_type (str): "vigenere" or "otp".
+            keys (dict | iterable): Mapping or (key_id, key_value) pairs.
+
+        Returns:
+            int: Number of keys saved.
+        """
+        cipher_type = self._normalize_type(cipher_type)
+        items = keys.items() if isinstance(keys, dict) else keys
+        timestamp = self._timestamp()
+
+        with self._lock:
+            index = self._get_index(cipher_type)
+            batch = {}
+            rows = []
+            for key_id, key_value in items:
+                digest = self._digest(key_value)
+                if digest in batch:
+                    raise ValueError(f"Duplicate key value for '{key_id}'.")
+                batch[digest] = key_id
+                rows.append((cipher_type, key_id, key_value, digest, timestamp))
+
+            try:
+                with self._conn:
+                    self._conn.executemany("INSERT INTO keys VALUES (?, ?, ?, ?, ?)", rows)
+            except sqlite3.IntegrityError as exc:
+                clash = "value" if "digest" in str(exc) else "id"
+                raise ValueError(f"Batch repeats a stored key {clash}: {exc}") from exc
+            index.update(batch)
+        return len(rows)
+
+    @timed_storage("keys", "claim")
+    def claim_key(self, cipher_type, key_id, key_value):
+        """
+        Save a key only if its value has never been stored.
+
+        The unique indexes make the check and the insert one SQL
+        statement, so two threads or worker processes can never both claim
+        the same value.
+
+        Returns:
+            bool: True if the key was saved, False if the value (or the
+            id) was already taken.
+        """
+        cipher_type = self._normalize_type(cipher_type)
+        digest = self._digest(key_value)
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO keys VALUES (?, ?, ?, ?, ?)",
+                    (cipher_type, key_id, key_value, digest, self._timestamp()))
+            if cursor.rowcount != 1:
+                return False
+            self._get_index(cipher_type)[digest] = key_id
+        return True
+
+    @timed_storage("keys", "release")
+    def release_keys(self, cipher_type, key_ids):
+        """
+        Forget claimed keys that were never handed out, so nothing refers
+        to them (e.g. when logging the messages they sealed failed).
+
+        Args:
+            cipher_type (str): "vigenere" or "otp".
+            key_ids (iterable[str]): Ids the keys were claimed under.
+        """
+        cipher_type = self._normalize_type(cipher_type)
+        key_ids = list(key_ids)
+        with self._lock:
+            index = self._get_index(cipher_type)
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM keys WHERE cipher_type = ? AND key_id = ?",
+                    [(cipher_type, key_id) for key_id in key_ids])
+            released = set(key_ids)
+            for digest in [d for d, key_id in index.items() if key_id in released]:
+                del index[digest]
+
+    @span("keys", "lookup")
     def key_exists(self, cipher_type, key_value):
-        """Check if key already exists in storage."""
-        keys = self.load_keys(cipher_type)
-        return any(entry["key_value"] == key_value for entry in keys.values())
+        """Check if key already exists in storage (including other processes' saves)."""
+        return self.find_key_id(cipher_type, key_value) is not None
+
+    @span("keys", "lookup")
+    def find_key_id(self, cipher_type, key_value):
+        """
+        Look up the id a key value was stored under.
+
+        Returns:
+            str | None: The key id, or None if the value is unknown.
+        """
+        cipher_type = self._normalize_type(cipher_type)
+        digest = self._digest(key_value)
+        with self._lock:
+            key_id = self._get_index(cipher_type).get(digest)
+            if key_id is None:
+                # Another worker process may have saved it since the index was built
+                key_id = self._owner(cipher_type, digest)
+                if key_id is not None:
+                    self._index[cipher_type][digest] = key_id
+            return key_id
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 if __name__ == "__main__":
@@ -66,3 +287,4 @@ if __name__ == "__main__":
 
     print("Vigenère Keys:", store.load_keys("vigenere"))
     print("OTP Keys:", store.load_keys("otp"))
+    print("STEALTH stored?", store.key_exists("vigenere", "STEALTH"))
@@ -5,15 +5,32 @@ Tracks one-time pad key usage, preventing reuse.
 Integrates with key storage to ensure OTP compliance.
 """
 
+import threading
+import uuid
+
 from src.key_management.key_generator import KeyGenerator
+from src.telemetry.profiling import span
 
 class OTPKeyManager:
     """Manager for Vernam (One-Time Pad) key operations."""
 
-    def __init__(self):
+    def __init__(self, pad_manager=None, key_storage=None):
+        """
+        Args:
+            pad_manager (PadFileManager, optional): Source of shared pad
+                material; when set, keys are taken sequentially from pad
+                files instead of being generated per message.
+            key_storage (KeyStorage, optional): Persistent registry of used
+                keys, replacing the in-memory set; single use then holds
+                across restarts and across every process sharing the store.
+        """
         self.key_gen = KeyGenerator()
         self.used_keys = set()
+        self.pad_manager = pad_manager
+        self.key_storage = key_storage
+        self._lock = threading.Lock()
 
+    @span("keys", "otp_generate")
     def get_new_key(self, length):
         """
         Generate a unique random OTP key that hasn’t been used before.
@@ -29,10 +46,60 @@ class OTPKeyManager:
             if key not in self.used_keys:
                 return key
 
-    def mark_key_used(self, key):
-        """Mark a key as permanently used."""
-        self.used_keys.add(key)
+    @span("keys", "otp_reserve")
+    def reserve_pad_key(self, length):
+        """
+        Take the next unused slice of a shared letters pad.
+
+        Args:
+            length (int): Required key length.
+
+        Returns:
+            tuple: (PadSegment, key) or (None, None) if no pad has room.
+        """
+        if self.pad_manager is None:
+            return None, None
+        segment = self.pad_manager.allocate_any(length)
+        if segment is None:
+            return None, None
+        return segment, self.pad_manager.read_key(segment)
+
+    @span("keys", "otp_pad_key")
+    def pad_key(self, segment):
+        """
+        Look up the key material a message's pad reference points to.
+
+        Args:
+            segment (dict | PadSegment): Stored (pad_id, offset, length).
+
+        Returns:
+            str: Key string read from the pad.
+        """
+        if self.pad_manager is None:
+            raise ValueError("No pad manager configured for pad-referenced keys.")
+        return self.pad_manager.read_key(segment)
+
+    @span("keys", "otp_mark_used")
+    def mark_key_used(self, key, key_id=None):
+        """
+        Mark a key as permanently used.
+
+        Args:
+            key (str): Key to retire.
+            key_id (str, optional): Id to record the key under in key
+                storage (e.g. the vault message it encrypted).
+
+        Returns:
+            bool: True if the key had not been used before.
+        """
+        if self.key_storage is not None:
+            return self.key_storage.claim_key("otp", key_id or str(uuid.uuid4()), key)
+        with self._lock:
+            fresh = key not in self.used_keys
+            self.used_keys.add(key)
+        return fresh
 
+    @span("keys", "otp_check")
     def is_key_used(self, key):
         """
         Check whether a key has already been used.
@@ -43,6 +110,8 @@ class OTPKeyManager:
         Returns:
             bool: True if key has been used, False otherwise.
         """
+        if self.key_storage is not None:
+            return self.key_storage.key_exists("otp", key)
         return key in self.used_keys
 
     def clear_all_keys(self):
@@ -0,0 +1,277 @@
+"""
+CipherSafe Pad File Manager (pad_manager.py)
+--------------------------------------------
+Implements classic one-time pad practice: agents share one large pad
+file up front and consume it sequentially. Pads are memory-mapped, so
+handing out key material never reads the whole file, and the consumed
+cursor is persisted atomically before any slice is released so a
+crash can never cause pad reuse. Messages reference pad material as
+(pad id, offset, length) instead of storing key strings.
+"""
+
+import json
+import mmap
+import os
+import secrets
+import threading
+from collections import namedtuple
+
+from src.key_management.key_generator import KeyGenerator
+from src.telemetry.metrics import timed_storage
+from src.telemetry.profiling import span
+
+try:
+    import fcntl  # POSIX only; serializes cursor updates across processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+PadSegment = namedtuple("PadSegment", ["pad_id", "offset", "length"])
+
+
+class PadFileManager:
+    """Creates, maps and sequentially consumes shared one-time pad files."""
+
+    KINDS = ("letters", "bytes")
+
+    def __init__(self, pad_dir="data/pads/"):
+        self.pad_dir = pad_dir
+        os.makedirs(pad_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = {}  # pad id -> (file, mmap)
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    @staticmethod
+    def _check_id(pad_id):
+        """Pad ids name files inside the pad directory: no separators, no '..'."""
+        if (not isinstance(pad_id, str) or not pad_id or ".." in pad_id
+                or any(sep in pad_id for sep in ("/", "\\", "\0", os.sep))):
+            raise ValueError(f"Invalid pad id {pad_id!r}.")
+        return pad_id
+
+    def _pad_path(self, pad_id):
+        return os.path.join(self.pad_dir, f"{self._check_id(pad_id)}.pad")
+
+    def _state_path(self, pad_id):
+        return os.path.join(self.pad_dir, f"{self._check_id(pad_id)}.json")
+
+    def _load_state(self, pad_id):
+        with open(self._state_path(pad_id), 'r') as f:
+            return json.load(f)
+
+    def _save_state(self, pad_id, state):
+        """Write the pad state via temp file + fsync + rename (atomic)."""
+        path = self._state_path(pad_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _advance(self, pad_id, length, kind=None):
+        """
+        Move a pad's cursor past ``length`` bytes under the pad's lock.
+
+        The room (and kind) check and the durable cursor update happen
+        while the lock is held, so concurrent callers (threads or
+        processes) never receive overlapping ranges.
+
+        Returns:
+            PadSegment | None: The reserved range, or None if the pad is of
+            another kind or has too little material left.
+        """
+        with self._lock, open(self._state_path(pad_id) + ".lock", 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            state = self._load_state(pad_id)
+            offset = state["offset"]
+            if (kind is not None and state["kind"] != kind) or offset + length > state["size"]:
+                return None
+            state["offset"] = offset + length
+            self._save_state(pad_id, state)
+        return PadSegment(pad_id, offset, length)
+
+    def _map(self, pad_id):
+        """Return the read-only memory map of a pad, opening it once."""
+        mapped = self._maps.get(pad_id)
+        if mapped is None:
+            f = open(self._pad_path(pad_id), 'rb')
+            mapped = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[pad_id] = mapped
+        return mapped[1]
+
+    # ---------------------
+    # Pad Lifecycle
+    # ---------------------
+
+    def create_pad(self, pad_id, size, kind="letters", chunk_size=1 << 20):
+        """
+        Generate a new pad file of random material.
+
+        Args:
+            pad_id (str): Identifier shared with the receiving agent.
+            size (int): Pad length in bytes (may be many GB).
+            kind (str): "letters" (A-Z, for classic Vernam) or "bytes".
+            chunk_size (int): Bytes generated and written per step.
+
+        Returns:
+            str: Path of the created pad file.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown pad kind '{kind}'.")
+        if size <= 0:
+            raise ValueError("Pad size must be positive.")
+        if os.path.exists(self._state_path(pad_id)):
+            raise ValueError(f"Pad '{pad_id}' already exists.")
+
+        generator = KeyGenerator()
+        with open(self._pad_path(pad_id), 'wb') as f:
+            written = 0
+            while written < size:
+                n = min(chunk_size, size - written)
+                if kind == "letters":
+                    f.write(generator.generate_otp_key(n).encode('ascii'))
+                else:
+                    f.write(secrets.token_bytes(n))
+                written += n
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._save_state(pad_id, {"version": "1.0", "kind": kind, "size": size, "offset": 0})
+        return self._pad_path(pad_id)
+
+    def list_pads(self):
+        """Return the ids of all pads in the pad directory."""
+        return sorted(name[:-4] for name in os.listdir(self.pad_dir) if name.endswith(".pad"))
+
+    def pad_info(self, pad_id):
+        """Return the persisted state (kind, size, consumed offset) of a pad."""
+        return self._load_state(pad_id)
+
+    def remaining(self, pad_id):
+        """Number of unconsumed bytes left in a pad."""
+        state = self._load_state(pad_id)
+        return state["size"] - state["offset"]
+
+    # ---------------------
+    # Consumption
+    # ---------------------
+
+    @timed_storage("pads", "allocate")
+    def allocate(self, pad_id, length):
+        """
+        Reserve the next ``length`` unused bytes of a pad.
+
+        The advanced cursor is durably written before the segment is
+        returned, and concurrent callers (threads or processes) never
+        receive overlapping ranges.
+
+        Returns:
+            PadSegment: (pad_id, offset, length) of the reserved material.
+        """
+        if length <= 0:
+            raise ValueError("Segment length must be positive.")
+        segment = self._advance(pad_id, length)
+        if segment is None:
+            raise ValueError(f"Pad '{pad_id}' has only {self.remaining(pad_id)} bytes left.")
+        return segment
+
+    @timed_storage("pads", "allocate")
+    def allocate_any(self, length, kind="letters"):
+        """
+        Reserve ``length`` bytes from whichever pad of ``kind`` has room.
+
+        Unlike ``find_pad`` followed by ``allocate``, each pad is checked
+        and advanced under one hold of its lock, so another worker
+        draining a pad in between cannot make the reservation fail.
+
+        Returns:
+            PadSegment | None: The reserved material, or None if no pad
+            of that kind has ``length`` bytes left.
+        """
+        if length <= 0:
+            raise ValueError("Segment length must be positive.")
+        for pad_id in self.list_pads():
+            segment = self._advance(pad_id, length, kind)
+            if segment is not None:
+                return segment
+        return None
+
+    @span("pads", "read")
+    def read(self, segment):
+        """
+        Copy the pad material behind a segment out of the memory map.
+
+        Only the segment's pages are read. The result does not refer to the
+        map, so ``close`` can unmap the pad while callers still hold it.
+
+        Args:
+            segment (PadSegment | dict | tuple): Pad reference.
+
+        Returns:
+            bytes: The segment's pad material.
+        """
+        if isinstance(segment, dict):
+            segment = PadSegment(**segment)
+        pad_id, offset, length = segment
+        with self._lock:
+            pad = self._map(pad_id)
+            if offset < 0 or offset + length > len(pad):
+                raise ValueError("Segment lies outside the pad.")
+            return pad[offset:offset + length]
+
+    def is_allocated(self, segment):
+        """
+        Check that a segment lies entirely in already-consumed pad material.
+
+        Material beyond the cursor has never been handed out, so a
+        reference to it cannot come from a legitimate message.
+
+        Returns:
+            bool: True for a positive-length range below the cursor.
+        """
+        pad_id, offset, length = segment
+        try:
+            state = self._load_state(pad_id)
+        except (OSError, ValueError):
+            return False
+        return offset >= 0 and length > 0 and offset + length <= state["offset"]
+
+    def read_key(self, segment):
+        """Pad material of a letters pad as a Vernam key string."""
+        return self.read(segment).decode('ascii')
+
+    def find_pad(self, length, kind="letters"):
+        """
+        Pick a pad of the given kind with at least ``length`` bytes left.
+
+        Returns:
+            str | None: A pad id, or None if no pad has room.
+        """
+        for pad_id in self.list_pads():
+            state = self._load_state(pad_id)
+            if state["kind"] == kind and state["size"] - state["offset"] >= length:
+                return pad_id
+        return None
+
+    def close(self):
+        """Unmap and close every open pad."""
+        with self._lock:
+            for f, pad in self._maps.values():
+                pad.close()
+                f.close()
+            self._maps.clear()
+
+
+if __name__ == "__main__":
+    manager = PadFileManager()
+    print("=== CipherSafe Pad File Demo ===")
+    if "DEMO" not in manager.list_pads():
+        manager.create_pad("DEMO", 1 << 20)
+    segment = manager.allocate("DEMO", 24)
+    print(f"Segment: {segment}")
+    print(f"Key:     {manager.read_key(segment)}")
+    print(f"Left:    {manager.remaining('DEMO')} bytes")
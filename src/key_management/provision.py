@@ -0,0 +1,66 @@
+"""
+CipherSafe Key Provisioning (provision.py)
+------------------------------------------
+Generates and stores keys for a mission in bulk: one CSPRNG read for
+the whole batch, one duplicate check, and one storage transaction.
+
+Usage:
+    python -m src.key_management.provision otp 1000 --length 64
+"""
+
+import argparse
+from datetime import datetime
+
+from src.key_management.key_generator import KeyGenerator
+from src.key_management.key_storage import KeyStorage
+
+
+def provision_keys(storage, cipher_type, count, length=None, prefix=None, generator=None):
+    """
+    Generate ``count`` new keys that are not already stored, and save them.
+
+    Args:
+        storage (KeyStorage): Destination key store.
+        cipher_type (str): "vigenere" or "otp".
+        count (int): Number of keys to provision.
+        length (int, optional): Key length (required for OTP).
+        prefix (str, optional): Key id prefix (defaults to the cipher type).
+        generator (KeyGenerator, optional): Key source.
+
+    Returns:
+        dict: Mapping of new key ids to key values.
+    """
+    generator = generator or KeyGenerator()
+    values = generator.generate_many(
+        cipher_type, count, length,
+        exclude=lambda key: storage.key_exists(cipher_type, key))
+
+    prefix = prefix or cipher_type.upper()
+    batch = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    width = len(str(max(count - 1, 0)))
+    keys = {f"{prefix}_{batch}_{i:0{width}d}": value for i, value in enumerate(values)}
+    storage.save_many(cipher_type, keys)
+    return keys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision CipherSafe keys in bulk.")
+    parser.add_argument("cipher_type", choices=["vigenere", "otp"], help="Key type to generate")
+    parser.add_argument("count", type=int, help="Number of keys to provision")
+    parser.add_argument("--length", type=int, help="Key length (default 6 for Vigenère)")
+    parser.add_argument("--prefix", help="Key id prefix")
+    parser.add_argument("--storage", default="data/keys/", help="Key storage directory")
+    args = parser.parse_args(argv)
+
+    storage = KeyStorage(storage_path=args.storage)
+    try:
+        keys = provision_keys(storage, args.cipher_type, args.count, args.length, args.prefix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    finally:
+        storage.close()
+    print(f"Provisioned {len(keys)} {args.cipher_type} keys into {storage.db_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+CipherSafe Cover Image Cache (image_cache.py)
+---------------------------------------------
+Keeps decoded pixel arrays of frequently used cover images in memory so
+repeated embeds, extractions and capacity checks skip PNG decoding.
+Entries are validated against the file's modification time and size,
+and the cache is bounded by total array bytes (least recently used
+entries are evicted first).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+
+class PixelCache:
+    """Thread-safe LRU cache of decoded RGB pixel arrays keyed by file path."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Upper bound on the summed size of cached arrays.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # path -> (mtime_ns, size, pixels)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path):
+        """File identity used to detect changes on disk."""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _lookup(self, key, signature):
+        """Return the cached array for key if still valid (lock must be held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[:2] != signature:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def _evict(self, key):
+        """Drop one entry (lock must be held)."""
+        _, _, pixels = self._entries.pop(key)
+        self.current_bytes -= pixels.nbytes
+
+    def peek_shape(self, path):
+        """
+        Return the cached (height, width, channels) of an image without decoding.
+
+        Returns:
+            tuple | None: Array shape, or None if the image is not cached.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            pixels = self._lookup(key, self._signature(path))
+            if pixels is None:
+                return None
+            self.hits += 1
+            return pixels.shape
+
+    def get(self, path):
+        """
+        Load an image as a read-only (H, W, 3) uint8 array, decoding on a miss.
+
+        Args:
+            path (str): Image file path.
+
+        Returns:
+            np.ndarray: Read-only RGB pixel array. Copy before modifying.
+        """
+        key = os.path.abspath(path)
+        signature = self._signature(path)
+        with self._lock:
+            pixels = self._lookup(key, signature)
+            if pixels is not None:
+                self.hits += 1
+                return pixels
+            self.misses += 1
+
+        with Image.open(path) as image:
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            pixels = np.asarray(image, dtype=np.uint8)
+        pixels.flags.writeable = False
+
+        if pixels.nbytes <= self.max_bytes:
+            with self._lock:
+                if key in self._entries:
+                    self._evict(key)
+                self._entries[key] = (*signature, pixels)
+                self.current_bytes += pixels.nbytes
+                while self.current_bytes > self.max_bytes:
+                    self._evict(next(iter(self._entries)))
+        return pixels
+
+    def invalidate(self, path=None):
+        """Forget one cached image, or everything when path is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+            elif os.path.abspath(path) in self._entries:
+                self._evict(os.path.abspath(path))
+
+
+# Shared by every LSBSteganography instance unless one is given its own
+default_cache = PixelCache()
@@ -6,8 +6,47 @@ extracting encrypted text within PNG images. Suitable for combining
 with Vernam Cipher (OTP) to achieve covert communication.
 """
 
+import os
+import struct
+import zlib
+from io import BytesIO
+
+import numpy as np
 from PIL import Image
-import binascii
+
+from src.steganography.image_cache import default_cache
+
+MAX_INFLATED_SIZE = 16 * 1024 * 1024  # largest payload a ZLIB frame may expand to
+# What decoding an untrusted image can raise: unreadable data, malformed
+# headers, or pixel counts past PIL's decompression-bomb limit
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def inflate(data, max_length=MAX_INFLATED_SIZE):
+    """
+    Decompress zlib data without letting it expand past ``max_length``.
+
+    Args:
+        data (bytes): A complete zlib stream.
+        max_length (int): Most bytes the payload may inflate to.
+
+    Returns:
+        bytes: The decompressed payload.
+
+    Raises:
+        ValueError: If the data is corrupt, truncated or inflates too far.
+    """
+    inflater = zlib.decompressobj()
+    try:
+        result = inflater.decompress(data, max_length)
+    except zlib.error as exc:
+        raise ValueError(f"Corrupt compressed payload: {exc}") from None
+    if inflater.unconsumed_tail:
+        raise ValueError(f"Compressed payload inflates past {max_length} bytes.")
+    if not inflater.eof:
+        raise ValueError("Compressed payload is truncated.")
+    return result
+
 
 class LSBSteganography:
     """
@@ -18,94 +57,213 @@ class LSBSteganography:
 
     Limitations:
     - Avoid lossy formats (e.g. JPEG) — compression destroys data.
-    - Image must have enough pixels to store all bits (8 bits per char).
+    - Image must have enough pixels to store the header plus 8 bits
+      per payload byte.
+
+    Every operation accepts either a filesystem path or in-memory image
+    data (``bytes`` or a binary file-like object such as ``BytesIO``).
+    Images read from paths go through a ``PixelCache``, so covers that are
+    reused do not get re-decoded.
+
+    Payloads are framed as ``magic | flags | length`` followed by the raw
+    bytes, so any binary data (or UTF-8 text) can be hidden and the
+    decoder reads exactly as many pixels as the payload needs. Compressed
+    payloads are inflated to at most ``max_inflated`` bytes.
     """
 
-    def __init__(self):
-        pass
+    MAGIC = b"CS"
+    HEADER = struct.Struct(">2sBI")  # magic, flags, payload length
+    FLAG_ZLIB = 0x01
+    LEGACY_DELIMITER = b"#####"  # terminator used by pre-header images
+
+    def __init__(self, cache=None, max_inflated=MAX_INFLATED_SIZE):
+        """
+        Args:
+            cache (PixelCache, optional): Decoded image cache for path
+                sources (defaults to the process-wide shared cache).
+            max_inflated (int): Largest size a compressed payload may
+                expand to when decoded.
+        """
+        self.cache = default_cache if cache is None else cache
+        self.max_inflated = max_inflated
 
     # ---------------------
     # Internal Utilities
     # ---------------------
 
     @staticmethod
-    def _text_to_bits(text):
-        """Convert string message to binary representation."""
-        return ''.join(format(ord(c), '08b') for c in text)
+    def _bytes_to_bits(data):
+        """Convert bytes into a flat uint8 array of 0/1 bits (MSB first)."""
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+    @staticmethod
+    def _bits_to_bytes(bits):
+        """Pack a 0/1 bit array back into bytes."""
+        return np.packbits(bits).tobytes()
+
+    def _frame_payload(self, secret, compress=False):
+        """
+        Serialize a message into the framed payload written to the image.
+
+        Args:
+            secret (str | bytes): Data to hide; text is encoded as UTF-8.
+            compress (bool): Deflate the payload with zlib before framing.
+
+        Returns:
+            bytes: Header followed by the (optionally compressed) payload.
+        """
+        data = secret.encode('utf-8') if isinstance(secret, str) else bytes(secret)
+        flags = 0
+        if compress:
+            data = zlib.compress(data, 9)
+            flags |= self.FLAG_ZLIB
+        return self.HEADER.pack(self.MAGIC, flags, len(data)) + data
+
+    @staticmethod
+    def _as_source(source):
+        """Wrap raw image bytes in a BytesIO; paths and file objects pass through."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return BytesIO(source)
+        return source
+
+    def _load_pixels(self, source):
+        """
+        Decode an image from a path, raw bytes, or a binary file-like object.
+
+        Returns:
+            np.ndarray: (H, W, 3) uint8 RGB array; treat as read-only.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            return self.cache.get(source)
+        image = Image.open(self._as_source(source))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return np.asarray(image, dtype=np.uint8)
+
+    def _embed(self, cover, secret, compress=False):
+        """
+        Write the framed payload bits into the LSBs of every RGB channel at once.
+
+        Args:
+            cover (np.ndarray): RGB cover pixels (left unmodified).
+            secret (str | bytes): Data to hide.
+            compress (bool): Deflate the payload before embedding.
+
+        Returns:
+            PIL.Image.Image: New image carrying the hidden message.
+        """
+        bits = self._bytes_to_bits(self._frame_payload(secret, compress))
+
+        pixels = np.array(cover, dtype=np.uint8)
+        flat = pixels.reshape(-1)
+        if bits.size > flat.size:
+            raise ValueError("Message too long for selected image capacity.")
+
+        flat[:bits.size] = (flat[:bits.size] & 0xFE) | bits
+        return Image.fromarray(pixels, 'RGB')
+
+    def _extract(self, pixels):
+        """
+        Read the hidden payload from an image's LSB stream.
+
+        Returns:
+            bytes | None: The payload, or None if no message is found.
+        """
+        flat = pixels.reshape(-1)
+        header_bits = self.HEADER.size * 8
+        if flat.size >= header_bits:
+            magic, flags, length = self.HEADER.unpack(
+                self._bits_to_bytes(flat[:header_bits] & 1))
+            end = header_bits + length * 8
+            if magic == self.MAGIC and end <= flat.size:
+                data = self._bits_to_bytes(flat[header_bits:end] & 1)
+                if flags & self.FLAG_ZLIB:
+                    try:
+                        data = inflate(data, self.max_inflated)
+                    except ValueError:
+                        return None
+                return data
+
+        # Images written before payload framing end with a text delimiter
+        data = self._bits_to_bytes(flat & 1)
+        end = data.find(self.LEGACY_DELIMITER)
+        return None if end == -1 else data[:end]
 
     @staticmethod
-    def _bits_to_text(bits):
-        """Convert binary string back to plaintext message."""
-        chars = [bits[i:i+8] for i in range(0, len(bits), 8)]
-        return ''.join(chr(int(b, 2)) for b in chars if len(b) == 8)
+    def _payload_result(payload, raw):
+        """Shape an extracted payload into the public decode return value."""
+        if payload is None:
+            return None if raw else "No hidden message found."
+        return payload if raw else payload.decode('utf-8', errors='replace')
 
     # ---------------------
     # Encoding
     # ---------------------
 
-    def encode(self, input_image_path, output_image_path, secret_text):
+    def encode(self, input_image_path, output_image_path, secret_text, compress=False):
         """
         Embed a secret message inside an image using LSB method.
 
         Args:
             input_image_path (str): Path to base (cover) image.
             output_image_path (str): Path to save stego image.
-            secret_text (str): Data to hide (usually Vernam ciphertext).
+            secret_text (str | bytes): Data to hide (usually Vernam ciphertext).
+            compress (bool): Deflate the payload with zlib first.
 
         Returns:
             str: Confirmation message on success.
         """
-        image = Image.open(input_image_path)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        encoded = image.copy()
-        width, height = image.size
-        binary_data = self._text_to_bits(secret_text + "#####")  # delimiter for stop
-        binary_index = 0
-
-        for y in range(height):
-            for x in range(width):
-                pixel = list(image.getpixel((x, y)))
-                for channel in range(3):
-                    if binary_index < len(binary_data):
-                        pixel[channel] = (pixel[channel] & ~1) | int(binary_data[binary_index])
-                        binary_index += 1
-                encoded.putpixel((x, y), tuple(pixel))
-                if binary_index >= len(binary_data):
-                    encoded.save(output_image_path, 'PNG')
-                    return f"Message successfully encoded into {output_image_path}"
-
-        raise ValueError("Message too long for selected image capacity.")
+        encoded = self._embed(self._load_pixels(input_image_path), secret_text, compress)
+        encoded.save(output_image_path, 'PNG')
+        self.cache.invalidate(output_image_path)
+        return f"Message successfully encoded into {output_image_path}"
+
+    def encode_bytes(self, cover_image, secret_text, compress=False):
+        """
+        Embed a secret message without touching the filesystem.
+
+        Args:
+            cover_image (bytes | file-like): Encoded cover image data.
+            secret_text (str | bytes): Data to hide (usually Vernam ciphertext).
+            compress (bool): Deflate the payload with zlib first.
+
+        Returns:
+            bytes: PNG-encoded stego image.
+        """
+        encoded = self._embed(self._load_pixels(cover_image), secret_text, compress)
+        output = BytesIO()
+        encoded.save(output, 'PNG')
+        return output.getvalue()
 
     # ---------------------
     # Decoding
     # ---------------------
 
-    def decode(self, stego_image_path):
+    def decode(self, stego_image_path, raw=False):
         """
         Extract hidden message from a stego image.
 
         Args:
             stego_image_path (str): Path of image containing hidden data.
+            raw (bool): Return the payload bytes instead of UTF-8 text.
 
         Returns:
-            str: The decoded plaintext (hidden message).
+            str | bytes: The decoded hidden message.
         """
-        image = Image.open(stego_image_path)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        binary_data = ""
-        width, height = image.size
-
-        for y in range(height):
-            for x in range(width):
-                pixel = list(image.getpixel((x, y)))
-                for channel in range(3):
-                    binary_data += str(pixel[channel] & 1)
-                    if binary_data.endswith("0010001100100010001000110010001100100011"):  # binary("#####")
-                        text = self._bits_to_text(binary_data)
-                        return text.split("#####")[0]
-        return "No hidden message found."
+        return self._payload_result(self._extract(self._load_pixels(stego_image_path)), raw)
+
+    def decode_bytes(self, stego_image, raw=False):
+        """
+        Extract a hidden message from in-memory image data.
+
+        Args:
+            stego_image (bytes | file-like): Encoded stego image data.
+            raw (bool): Return the payload bytes instead of UTF-8 text.
+
+        Returns:
+            str | bytes: The decoded hidden message.
+        """
+        return self._payload_result(self._extract(self._load_pixels(stego_image)), raw)
 
     # ---------------------
     # Capacity Check
@@ -113,19 +271,26 @@ class LSBSteganography:
 
     def estimate_capacity(self, image_path):
         """
-        Estimate max number of characters that can be safely hidden in an image.
+        Estimate max number of payload bytes that can be safely hidden in an image.
 
         Args:
-            image_path (str): Path to input image.
+            image_path (str | bytes | file-like): Input image.
 
         Returns:
-            int: Max characters storable without overflow.
+            int: Max uncompressed payload bytes storable without overflow.
         """
-        image = Image.open(image_path)
-        width, height = image.size
+        shape = None
+        if isinstance(image_path, (str, os.PathLike)):
+            shape = self.cache.peek_shape(image_path)
+        if shape is not None:
+            height, width = shape[:2]
+        else:
+            # Image.open only parses the header; pixel data is never decoded
+            with Image.open(self._as_source(image_path)) as image:
+                width, height = image.size
         total_pixels = width * height
         max_bits = total_pixels * 3  # 3 channels, 1 bit per channel
-        return max_bits // 8  # 8 bits = 1 char
+        return max(max_bits // 8 - self.HEADER.size, 0)  # 8 bits = 1 byte
 
 
 # ---------------------
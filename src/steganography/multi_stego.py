@@ -0,0 +1,216 @@
+"""
+CipherSafe Multi-Image Steganography (multi_stego.py)
+-----------------------------------------------------
+Splits payloads that are too large for a single cover image into
+sequenced, checksummed fragments spread across a set of covers.
+Fragments are embedded and extracted concurrently, and can be
+reassembled from the stego images in any order.
+"""
+
+import os
+import secrets
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from src.steganography.lsb_stego import LSBSteganography, inflate
+
+
+class MultiImageSteganography:
+    """
+    Distributes one message over several LSB stego images.
+
+    Each image carries one fragment framed as
+    ``message id | index | total | flags | crc32`` followed by its slice of
+    the payload. Fragment sizes are proportional to each cover's capacity,
+    so every cover is used at roughly the same embedding rate.
+    """
+
+    FRAGMENT = struct.Struct(">8sHHBI")  # message id, index, total, flags, crc32
+    FLAG_ZLIB = 0x01
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers (int, optional): Threads used to embed/extract images
+                (defaults to the CPU count).
+        """
+        self.stego = LSBSteganography()
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    # ---------------------
+    # Fragmenting
+    # ---------------------
+
+    @staticmethod
+    def _read_cover(cover):
+        """Read a file-like cover once so sizing and embedding see the same bytes."""
+        if hasattr(cover, 'read'):
+            return cover.read()
+        return cover
+
+    def _fragment_capacity(self, cover):
+        """Payload bytes a single cover can hold after the fragment header."""
+        return max(self.stego.estimate_capacity(cover) - self.FRAGMENT.size, 0)
+
+    def split_payload(self, secret, capacities, compress=False):
+        """
+        Split a message into framed fragments sized to the given capacities.
+
+        Args:
+            secret (str | bytes): Data to hide; text is encoded as UTF-8.
+            capacities (list[int]): Payload bytes available in each cover.
+            compress (bool): Deflate the whole message before splitting.
+
+        Returns:
+            list[bytes]: One framed fragment per cover, in cover order.
+        """
+        data = secret.encode('utf-8') if isinstance(secret, str) else bytes(secret)
+        flags = 0
+        if compress:
+            data = zlib.compress(data, 9)
+            flags |= self.FLAG_ZLIB
+
+        total_capacity = sum(capacities)
+        if len(data) > total_capacity:
+            raise ValueError("Message too long for selected image capacity.")
+
+        # Proportional share per cover; the last cover absorbs rounding
+        sizes = [len(data) * cap // total_capacity if total_capacity else 0 for cap in capacities]
+        remainder = len(data) - sum(sizes)
+        for i, cap in enumerate(capacities):
+            extra = min(remainder, cap - sizes[i])
+            sizes[i] += extra
+            remainder -= extra
+
+        message_id = secrets.token_bytes(8)
+        total = len(capacities)
+        fragments = []
+        offset = 0
+        for index, size in enumerate(sizes):
+            chunk = data[offset:offset + size]
+            offset += size
+            header = self.FRAGMENT.pack(message_id, index, total, flags, zlib.crc32(chunk))
+            fragments.append(header + chunk)
+        return fragments
+
+    def join_fragments(self, fragments):
+        """
+        Reassemble framed fragments (in any order) into the original message.
+
+        Args:
+            fragments (list[bytes]): Fragments extracted from stego images.
+
+        Returns:
+            bytes: The original payload.
+
+        Raises:
+            ValueError: If a fragment is malformed, mismatched or missing,
+                or the payload inflates past the stego decoder's limit.
+        """
+        parts = {}
+        message_id = total = flags = None
+        for fragment in fragments:
+            if fragment is None or len(fragment) < self.FRAGMENT.size:
+                raise ValueError("Image does not contain a message fragment.")
+            frag_id, index, frag_total, frag_flags, crc = self.FRAGMENT.unpack_from(fragment)
+            chunk = fragment[self.FRAGMENT.size:]
+            if zlib.crc32(chunk) != crc:
+                raise ValueError(f"Fragment {index} failed checksum verification.")
+            if message_id is None:
+                message_id, total, flags = frag_id, frag_total, frag_flags
+            elif frag_id != message_id:
+                raise ValueError("Fragments belong to different messages.")
+            elif (frag_total, frag_flags) != (total, flags):
+                raise ValueError(f"Fragment {index} disagrees on the message layout.")
+            if index >= total:
+                raise ValueError(f"Fragment index {index} is outside a {total}-part message.")
+            if parts.get(index, chunk) != chunk:
+                raise ValueError(f"Fragment {index} appears twice with different data.")
+            parts[index] = chunk
+
+        missing = sorted(set(range(total or 0)) - parts.keys())
+        if not total or missing:
+            raise ValueError(f"Missing message fragments: {missing}")
+
+        data = b''.join(parts[i] for i in range(total))
+        if flags & self.FLAG_ZLIB:
+            data = inflate(data, self.stego.max_inflated)
+        return data
+
+    # ---------------------
+    # Encoding / Decoding
+    # ---------------------
+
+    def encode(self, cover_paths, output_paths, secret_text, compress=False):
+        """
+        Embed a message across several cover images saved to disk.
+
+        Args:
+            cover_paths (list[str]): Cover images, one per fragment.
+            output_paths (list[str]): Where to save each stego image.
+            secret_text (str | bytes): Data to hide.
+            compress (bool): Deflate the payload before splitting.
+
+        Returns:
+            list[str]: The written stego image paths.
+        """
+        if len(cover_paths) != len(output_paths):
+            raise ValueError("Each cover image needs exactly one output path.")
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            capacities = list(pool.map(self._fragment_capacity, cover_paths))
+            fragments = self.split_payload(secret_text, capacities, compress)
+            list(pool.map(self.stego.encode, cover_paths, output_paths, fragments))
+        return list(output_paths)
+
+    def encode_bytes(self, cover_images, secret_text, compress=False):
+        """
+        Embed a message across several in-memory cover images.
+
+        Args:
+            cover_images (list): Encoded cover image data as bytes or binary
+                file-like objects; each file is read once from its current position.
+            secret_text (str | bytes): Data to hide.
+            compress (bool): Deflate the payload before splitting.
+
+        Returns:
+            list[bytes]: PNG-encoded stego images, in cover order.
+        """
+        covers = [self._read_cover(cover) for cover in cover_images]
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            capacities = list(pool.map(self._fragment_capacity, covers))
+            fragments = self.split_payload(secret_text, capacities, compress)
+            return list(pool.map(self.stego.encode_bytes, covers, fragments))
+
+    def decode(self, stego_images, raw=False):
+        """
+        Extract and reassemble a message from its stego images.
+
+        Args:
+            stego_images (list): Paths, bytes or file-like objects, in any order.
+            raw (bool): Return the payload bytes instead of UTF-8 text.
+
+        Returns:
+            str | bytes: The reassembled hidden message.
+        """
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            fragments = list(pool.map(lambda image: self.stego.decode(image, raw=True), stego_images))
+        data = self.join_fragments(fragments)
+        return data if raw else data.decode('utf-8', errors='replace')
+
+
+# ---------------------
+# Standalone Demo
+# ---------------------
+if __name__ == "__main__":
+    multi = MultiImageSteganography()
+
+    print("=== CipherSafe Multi-Image Steganography Demo ===")
+    covers = ["assets/images/city_skyline.png", "assets/images/neon_street.png"]
+    outputs = ["assets/stego_output/part_1.png", "assets/stego_output/part_2.png"]
+    message = "OPERATION BLACK DAWN SUCCESS " * 100
+
+    os.makedirs("assets/stego_output", exist_ok=True)
+    print(multi.encode(covers, outputs, message))
+    print(multi.decode(reversed(outputs)) == message)
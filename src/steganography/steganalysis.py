@@ -0,0 +1,286 @@
+"""
+CipherSafe Steganalysis Module (steganalysis.py)
+------------------------------------------------
+Measures how detectable LSB embedding is in an image, the way INZA's
+detection systems would. Implements the chi-square attack (Westfeld &
+Pfitzmann) and RS analysis (Fridrich et al.) with NumPy, and scores
+whole directories of covers or stego images in parallel.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+
+class Steganalyzer:
+    """
+    Statistical LSB detectors for screening covers and checking embeddings.
+
+    - The chi-square attack tests whether pairs of values (2k, 2k+1) have
+      been equalized, which sequential LSB replacement does. It is run over
+      growing prefixes of the pixel stream, so it also estimates how much
+      of the image carries a payload.
+    - RS analysis compares regular/singular pixel groups under positive
+      and negative LSB flipping to estimate the embedding rate, and also
+      catches payloads scattered across the image.
+    """
+
+    IMAGE_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff')
+    RS_MASK = np.array([0, 1, 1, 0], dtype=bool)
+    # Logistic calibration of the RS rate: clean covers estimate within a
+    # few percent of zero, so a rate of RS_THRESHOLD maps to probability 0.5
+    RS_THRESHOLD = 0.05
+    RS_SCALE = 0.015
+
+    def __init__(self, segments=20, max_workers=None):
+        """
+        Args:
+            segments (int): Prefix steps used by the chi-square attack.
+            max_workers (int, optional): Processes used to scan directories.
+        """
+        self.segments = segments
+        self.max_workers = max_workers
+
+    # ---------------------
+    # Internal Utilities
+    # ---------------------
+
+    @staticmethod
+    def _load_pixels(image_path):
+        """Load an image as an (H, W, 3) uint8 array."""
+        image = Image.open(image_path)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return np.asarray(image, dtype=np.uint8)
+
+    @staticmethod
+    def _chi2_sf(stat, dof):
+        """
+        Upper tail of the chi-square distribution (Wilson–Hilferty approximation).
+
+        Returns:
+            float: P(X >= stat) for X ~ chi2(dof).
+        """
+        if dof <= 0:
+            return 0.0
+        z = ((stat / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+        return 0.5 * math.erfc(z / math.sqrt(2))
+
+    # ---------------------
+    # Chi-Square Attack
+    # ---------------------
+
+    def chi_square_curve(self, pixels):
+        """
+        Embedding probability for each growing prefix of the pixel stream.
+
+        Args:
+            pixels (np.ndarray): Image array of any shape (uint8).
+
+        Returns:
+            np.ndarray: Probability per prefix (1/segments, 2/segments, ... 1).
+        """
+        flat = np.asarray(pixels, dtype=np.uint8).reshape(-1)
+        segments = max(1, min(self.segments, flat.size))
+        block = np.arange(flat.size) * segments // flat.size
+
+        # Per-block histograms in one bincount, then cumulative over prefixes
+        hist = np.bincount(block * 256 + flat, minlength=segments * 256)
+        hist = hist.reshape(segments, 256).cumsum(axis=0)
+
+        even = hist[:, 0::2].astype(np.float64)
+        odd = hist[:, 1::2].astype(np.float64)
+        expected = (even + odd) / 2
+        valid = expected > 4  # chi-square needs reasonably populated bins
+        terms = np.where(valid, (even - expected) ** 2 / np.where(valid, expected, 1), 0)
+        stats = terms.sum(axis=1)
+        dofs = valid.sum(axis=1) - 1
+
+        return np.array([self._chi2_sf(s, d) for s, d in zip(stats, dofs)])
+
+    def chi_square_attack(self, pixels):
+        """
+        Run the chi-square attack on an image array.
+
+        Returns:
+            tuple: (probability, estimated_fraction) where probability is
+            measured on the first prefix and estimated_fraction is the
+            share of the pixel stream that looks embedded.
+        """
+        curve = self.chi_square_curve(pixels)
+        embedded = np.nonzero(curve > 0.5)[0]
+        fraction = (embedded[-1] + 1) / curve.size if embedded.size else 0.0
+        return float(curve[0]), float(fraction)
+
+    # ---------------------
+    # RS Analysis
+    # ---------------------
+
+    @classmethod
+    def _rs_counts(cls, groups):
+        """
+        Relative counts of regular and singular groups under F1 and F-1 flipping.
+
+        Returns:
+            tuple: (R_m, S_m, R_-m, S_-m) as fractions of all groups.
+        """
+        def smoothness(g):
+            return np.abs(np.diff(g, axis=1)).sum(axis=1)
+
+        base = smoothness(groups)
+        positive = groups.copy()
+        positive[:, cls.RS_MASK] ^= 1
+        negative = groups.copy()
+        negative[:, cls.RS_MASK] = ((negative[:, cls.RS_MASK] + 1) ^ 1) - 1
+
+        f_pos = smoothness(positive)
+        f_neg = smoothness(negative)
+        n = max(len(groups), 1)
+        return ((f_pos > base).sum() / n, (f_pos < base).sum() / n,
+                (f_neg > base).sum() / n, (f_neg < base).sum() / n)
+
+    def rs_analysis(self, pixels):
+        """
+        Estimate the LSB embedding rate with RS analysis.
+
+        Args:
+            pixels (np.ndarray): (H, W, 3) image array.
+
+        Returns:
+            float: Estimated fraction of channel values carrying payload (0-1).
+        """
+        pixels = np.asarray(pixels, dtype=np.int16)
+        width = pixels.shape[1] - pixels.shape[1] % 4
+        if width == 0:
+            return 0.0
+
+        rates = []
+        for channel in range(pixels.shape[2]):
+            groups = pixels[:, :width, channel].reshape(-1, 4)
+            r_m, s_m, r_neg, s_neg = self._rs_counts(groups)
+            r_m1, s_m1, r_neg1, s_neg1 = self._rs_counts(groups ^ 1)
+
+            d0, d1 = r_m - s_m, r_m1 - s_m1
+            dn0, dn1 = r_neg - s_neg, r_neg1 - s_neg1
+            a = 2 * (d1 + d0)
+            b = dn0 - dn1 - d1 - 3 * d0
+            c = d0 - dn0
+
+            if abs(a) < 1e-12:
+                roots = [-c / b] if abs(b) > 1e-12 else []
+            else:
+                disc = b * b - 4 * a * c
+                if disc < 0:
+                    roots = []
+                else:
+                    root = math.sqrt(disc)
+                    roots = [(-b + root) / (2 * a), (-b - root) / (2 * a)]
+
+            if not roots:
+                rates.append(0.0)
+                continue
+            z = min(roots, key=abs)
+            rates.append(z / (z - 0.5) if z != 0.5 else 1.0)
+
+        return float(np.clip(np.mean(rates), 0.0, 1.0))
+
+    @classmethod
+    def rs_probability(cls, rate):
+        """
+        Map an RS embedding-rate estimate onto a detection probability.
+
+        Args:
+            rate (float): Output of ``rs_analysis`` (0-1).
+
+        Returns:
+            float: Probability that the image carries LSB payload.
+        """
+        return 1.0 / (1.0 + math.exp(-(rate - cls.RS_THRESHOLD) / cls.RS_SCALE))
+
+    # ---------------------
+    # Reports
+    # ---------------------
+
+    def analyze_pixels(self, pixels):
+        """
+        Score an image array with both detectors.
+
+        Returns:
+            dict: chi_square (probability) and estimated_fraction from the
+            chi-square attack; rs_rate (an embedding-rate estimate) and its
+            calibrated rs_probability; and detection_probability, the
+            larger of the two detector probabilities.
+        """
+        chi_probability, fraction = self.chi_square_attack(pixels)
+        rs_rate = self.rs_analysis(pixels)
+        rs_probability = self.rs_probability(rs_rate)
+        return {
+            "chi_square": chi_probability,
+            "estimated_fraction": fraction,
+            "rs_rate": rs_rate,
+            "rs_probability": rs_probability,
+            "detection_probability": max(chi_probability, rs_probability),
+        }
+
+    def analyze(self, image_path):
+        """
+        Score a single image file.
+
+        Returns:
+            dict: Detection report including the image path.
+        """
+        report = self.analyze_pixels(self._load_pixels(image_path))
+        report["path"] = image_path
+        return report
+
+    def analyze_many(self, image_paths):
+        """
+        Score many image files in parallel worker processes.
+
+        Returns:
+            list[dict]: Detection reports in input order.
+        """
+        image_paths = list(image_paths)
+        if len(image_paths) <= 1:
+            return [self.analyze(path) for path in image_paths]
+        with ProcessPoolExecutor(self.max_workers) as pool:
+            return list(pool.map(self.analyze, image_paths))
+
+    def scan_directory(self, directory):
+        """
+        Score every lossless image in a directory tree.
+
+        Args:
+            directory (str): Folder to walk recursively.
+
+        Returns:
+            list[dict]: Detection reports sorted by detection probability,
+            most suspicious first.
+        """
+        paths = []
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(self.IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        reports = self.analyze_many(paths)
+        return sorted(reports, key=lambda r: r["detection_probability"], reverse=True)
+
+
+# ---------------------
+# Standalone Demo
+# ---------------------
+if __name__ == "__main__":
+    import sys
+
+    analyzer = Steganalyzer()
+    target = sys.argv[1] if len(sys.argv) > 1 else "assets/images"
+
+    print("=== CipherSafe Steganalysis Scan ===")
+    for report in analyzer.scan_directory(target):
+        print(f"{report['detection_probability']:.3f}  "
+              f"chi2={report['chi_square']:.3f}  rs={report['rs_rate']:.3f} "
+              f"(p={report['rs_probability']:.3f})  "
+              f"{report['path']}")
@@ -0,0 +1,426 @@
+"""
+CipherSafe Metrics (metrics.py)
+-------------------------------
+Lightweight counters and histograms exposed in the Prometheus text
+format. Recording a value is a bisect and two increments under a lock,
+so instrumentation can stay on the hot path.
+
+Under a pre-fork server (gunicorn) every worker has its own metrics.
+When ``CIPHERSAFE_METRICS_DIR`` is set, each process periodically (and
+once more at exit) writes a snapshot of its values to
+``<dir>/<pid>-<token>.json``, and ``/metrics`` on any worker sums the
+snapshots of all workers (including ones that have exited, so counters
+never go backwards). The random token keeps a recycled worker whose pid
+the OS reused from overwriting its predecessor's totals. A scrape folds
+the snapshots of workers that have exited into one ``retired.json`` and
+deletes them, so the directory does not grow with every worker restart.
+"""
+
+import atexit
+import bisect
+import contextlib
+import functools
+import json
+import math
+import os
+import secrets
+import threading
+import time
+
+from src.telemetry.profiling import span
+
+try:
+    import fcntl  # POSIX only; serializes snapshot compaction across processes
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Upper bounds (seconds) for latency histograms: 100 µs .. 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds (bytes) for payload-size histograms: 64 B .. 64 MiB
+SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(11))
+# Totals of exited workers, folded together by the scraping process
+RETIRED_SNAPSHOT = "retired.json"
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """Common bookkeeping for labelled metrics."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values tuple -> state
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([str(labels[name]) for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}.")
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def snapshot(self):
+        """Current values as JSON-friendly [labels, state] pairs."""
+        with self._lock:
+            return [[list(key), list(state) if isinstance(state, list) else state]
+                    for key, state in self._values.items()]
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    @staticmethod
+    def merge(total, state):
+        return (total or 0) + state
+
+    def render(self, values):
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{self._label_text(key)} {value}"
+
+
+class Histogram(Metric):
+    """Bucketed distribution with a running sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [count per bucket..., +Inf bucket, sum]
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def time(self, **labels):
+        """Context manager / decorator observing elapsed seconds."""
+        return _Timer(self, labels)
+
+    @staticmethod
+    def merge(total, state):
+        if total is None:
+            return list(state)
+        return [a + b for a, b in zip(total, state)]
+
+    def render(self, values):
+        for key, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                yield f"{self.name}_bucket{self._label_text(key, [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(key)} {state[-1]}"
+            yield f"{self.name}_count{self._label_text(key)} {cumulative}"
+
+
+class _Timer:
+    """Times a block or a function call into a histogram."""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.histogram.observe(time.perf_counter() - start, **self.labels)
+        return wrapper
+
+
+class MetricsRegistry:
+    """Holds metrics, renders them, and shares them across processes."""
+
+    def __init__(self, multiprocess_dir=None, flush_interval=1.0):
+        """
+        Args:
+            multiprocess_dir (str, optional): Shared snapshot directory;
+                defaults to ``$CIPHERSAFE_METRICS_DIR`` (unset = single process).
+            flush_interval (float): Minimum seconds between snapshot writes.
+        """
+        self.metrics = {}
+        self.multiprocess_dir = multiprocess_dir or os.environ.get("CIPHERSAFE_METRICS_DIR")
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        self._snapshot_name = None  # (pid, file name), renewed after a fork
+        if self.multiprocess_dir:
+            atexit.register(self._flush_at_exit)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self.metrics[metric.name] = metric
+        return metric
+
+    # ---------------------
+    # Multi-Process Snapshots
+    # ---------------------
+
+    def _own_snapshot(self):
+        """This process's snapshot file name: pid plus a per-process token."""
+        pid = os.getpid()
+        if self._snapshot_name is None or self._snapshot_name[0] != pid:
+            self._snapshot_name = (pid, f"{pid}-{secrets.token_hex(4)}.json")
+        return self._snapshot_name[1]
+
+    def _snapshot_path(self):
+        return os.path.join(self.multiprocess_dir, self._own_snapshot())
+
+    def flush(self, force=False):
+        """
+        Write this process's values to its snapshot file.
+
+        Called after each request; writes at most once per
+        ``flush_interval`` unless forced.
+        """
+        if not self.multiprocess_dir:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            self._last_flush = now
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            data = {name: metric.snapshot() for name, metric in self.metrics.items()}
+            path = self._snapshot_path()
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        finally:
+            self._flush_lock.release()
+
+    @staticmethod
+    def _snapshot_pid(entry):
+        """The pid a ``<pid>-<token>.json`` snapshot (or its temp file) belongs to, if any."""
+        try:
+            return int(entry.split("-", 1)[0])
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _process_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True  # exists, but owned by another user
+        return True
+
+    @staticmethod
+    def _fold(totals, source):
+        """Add a snapshot's values into ``totals`` ({name: {labels: state}})."""
+        for name, entries in source.items():
+            values = totals.setdefault(name, {})
+            for labels, state in entries:
+                merge = Histogram.merge if isinstance(state, list) else Counter.merge
+                key = tuple(labels)
+                values[key] = merge(values.get(key), state)
+
+    def _load_retired(self):
+        """Read ``retired.json``: ({name: {labels: state}}, names already folded into it)."""
+        totals = {}
+        try:
+            with open(os.path.join(self.multiprocess_dir, RETIRED_SNAPSHOT)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return totals, []
+        self._fold(totals, data["metrics"])
+        return totals, data["folded"]
+
+    def _retire_dead_snapshots(self):
+        """
+        Fold the snapshots of exited workers into ``retired.json`` and delete them.
+
+        Must run under the directory lock. The folded file names are written
+        along with the totals, so snapshots left behind by a crash between the
+        write and the deletes are removed next time instead of counted twice.
+        """
+        directory = self.multiprocess_dir
+        totals, already_folded = self._load_retired()
+        for entry in already_folded:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(directory, entry))
+
+        folded, leftovers = [], []
+        for entry in os.listdir(directory):
+            pid = self._snapshot_pid(entry)
+            if pid is None or self._process_alive(pid):
+                continue
+            if not entry.endswith(".json"):
+                leftovers.append(entry)  # temp file of an interrupted flush
+                continue
+            try:
+                with open(os.path.join(directory, entry)) as f:
+                    self._fold(totals, json.load(f))
+            except (OSError, ValueError):
+                continue  # from an older layout; still skipped when reading
+            folded.append(entry)
+
+        if folded:
+            data = {"metrics": {name: [[list(key), state] for key, state in values.items()]
+                                for name, values in totals.items()},
+                    "folded": folded}
+            path = os.path.join(directory, RETIRED_SNAPSHOT)
+            with open(f"{path}.tmp", "w") as f:
+                json.dump(data, f)
+            os.replace(f"{path}.tmp", path)
+        for entry in folded + leftovers:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(directory, entry))
+
+    def _read_snapshots(self):
+        """Snapshots of every other process (live, exited and retired)."""
+        own = self._own_snapshot()
+        sources = []
+        for entry in os.listdir(self.multiprocess_dir):
+            if not entry.endswith(".json") or entry == own:
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, entry)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # snapshot being replaced or from an older layout
+            sources.append(data["metrics"] if entry == RETIRED_SNAPSHOT else data)
+        return sources
+
+    def _flush_at_exit(self):
+        """Write what accumulated since the last periodic flush."""
+        # A removed directory means nobody scrapes it any more; don't recreate it
+        if os.path.isdir(self.multiprocess_dir):
+            self.flush(force=True)
+
+    def _collect(self):
+        """Merge live values of this process with other processes' snapshots."""
+        sources = [{name: metric.snapshot() for name, metric in self.metrics.items()}]
+        if self.multiprocess_dir and os.path.isdir(self.multiprocess_dir):
+            # Scrapers take turns so a snapshot is never folded (or read) twice
+            with open(os.path.join(self.multiprocess_dir, ".lock"), "w") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    self._retire_dead_snapshots()
+                sources.extend(self._read_snapshots())
+
+        merged = {name: {} for name in self.metrics}
+        for source in sources:
+            for name, entries in source.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for labels, state in entries:
+                    key = tuple(labels)
+                    merged[name][key] = metric.merge(merged[name].get(key), state)
+        return merged
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            str: Exposition text.
+        """
+        merged = self._collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(merged[name]))
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------
+# CipherSafe Metrics
+# ---------------------
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    "ciphersafe_http_requests_total", "HTTP requests served.", ("route", "method", "status"))
+HTTP_LATENCY = metrics.histogram(
+    "ciphersafe_http_request_duration_seconds", "Time to produce a response (first byte).",
+    ("route", "method"))
+PAYLOAD_BYTES = metrics.histogram(
+    "ciphersafe_http_payload_bytes", "Request body sizes.", ("route",), buckets=SIZE_BUCKETS)
+CIPHER_SECONDS = metrics.histogram(
+    "ciphersafe_cipher_duration_seconds", "Time spent inside cipher engines.",
+    ("mode", "operation"))
+STORAGE_SECONDS = metrics.histogram(
+    "ciphersafe_storage_duration_seconds", "Vault, key store and pad file I/O time.",
+    ("store", "operation"))
+
+
+def timed_storage(store, operation):
+    """Decorator recording a storage call in ``STORAGE_SECONDS`` (and as a profiling span)."""
+    timer = STORAGE_SECONDS.time(store=store, operation=operation)
+    return lambda fn: span(store, operation)(timer(fn))
+
+
+def timed_iter(iterator, histogram, **labels):
+    """
+    Wrap a lazy cipher stream, observing the total time spent producing it.
+
+    Only the time inside the wrapped iterator counts, not time the
+    consumer spends between chunks (e.g. waiting on the network).
+    """
+    elapsed = 0.0
+    iterator = iter(iterator)
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            yield item
+    finally:
+        histogram.observe(elapsed, **labels)
@@ -0,0 +1,349 @@
+"""
+CipherSafe Profiling (profiling.py)
+-----------------------------------
+Opt-in profiling for the terminal front ends (``--profile``).
+
+While the process-wide ``profiler`` is running, each menu operation is
+wrapped in cProfile and/or tracemalloc, and functions decorated with
+``span`` in the cipher, vault and key layers are timed. Time spent
+waiting at ``input()`` prompts is measured separately and kept out of
+the CPU profile, so what remains of an operation is cipher work, storage
+and rendering. ``finish()`` writes one aggregated report at exit.
+
+Disabled profiling costs nothing on the hot path: ``span`` returns the
+function itself and only records it, ``start()`` then swaps timing
+wrappers onto the owning classes (``stop()`` puts the originals back),
+and ``operation()`` returns a shared no-op context manager.
+"""
+
+import atexit
+import builtins
+import cProfile
+import functools
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# Rows shown in each section of the report
+TOP_FUNCTIONS = 20
+TOP_ALLOCATIONS = 10
+
+_NOOP = nullcontext()
+# (function, span name) of everything decorated with ``span``
+_SPANS = []
+
+
+def _snapshot():
+    """Allocation snapshot without the profiler's own bookkeeping."""
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+
+
+class Profiler:
+    """Aggregates operation, span, cProfile and tracemalloc data."""
+
+    def __init__(self):
+        self.active = False
+        self.cpu = False
+        self.memory = False
+        self.operations = {}  # name -> [calls, seconds, waiting, in spans, peak bytes]
+        self.spans = {}       # name -> [calls, seconds, max seconds]
+        self.allocations = {}  # "file:line" -> [bytes, blocks] allocated during operations
+        self._profile = None
+        self._input = None
+        self._patched = []  # (owner, attribute, original function)
+        self._tracing = False  # tracemalloc was started by us
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self, cpu=True, memory=True):
+        """
+        Start profiling this process.
+
+        Args:
+            cpu (bool): Collect a cProfile profile of every operation.
+            memory (bool): Trace allocations with tracemalloc.
+        """
+        if self.active:
+            return
+        self.cpu, self.memory = cpu, memory
+        if cpu:
+            self._profile = cProfile.Profile()
+        self._tracing = memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+        self._input = builtins.input
+        builtins.input = self._timed_input
+        for fn, label in _SPANS:
+            owner = _owner(fn)
+            if owner is not None and vars(owner).get(fn.__name__) is fn:
+                setattr(owner, fn.__name__, self._wrap(fn, label))
+                self._patched.append((owner, fn.__name__, fn))
+        self.active = True
+
+    def stop(self):
+        """Stop profiling; collected data is kept for ``report``."""
+        if not self.active:
+            return
+        self.active = False
+        builtins.input = self._input
+        for owner, attribute, fn in self._patched:
+            setattr(owner, attribute, fn)
+        self._patched = []
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    # ---------------------
+    # Recording
+    # ---------------------
+
+    def operation(self, name):
+        """Context manager profiling one front-end operation (a menu action)."""
+        return _Operation(self, name) if self.active else _NOOP
+
+    def span(self, name):
+        """Context manager timing one span; see the ``span`` decorator."""
+        return _Span(self, name) if self.active else _NOOP
+
+    def _wrap(self, fn, label):
+        """``fn`` timed as span ``label``."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(self, label):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def _record_span(self, name, elapsed, top_level):
+        with self._lock:
+            state = self.spans.setdefault(name, [0, 0.0, 0.0])
+            state[0] += 1
+            state[1] += elapsed
+            state[2] = max(state[2], elapsed)
+        current = getattr(self._local, "operation", None)
+        if top_level and current is not None:
+            current[3] += elapsed
+
+    def _timed_input(self, *args):
+        """``input()`` replacement: prompt time is waiting, not work."""
+        current = getattr(self._local, "operation", None)
+        if self._profile is not None and current is not None:
+            self._profile.disable()
+        start = time.perf_counter()
+        try:
+            return self._input(*args)
+        finally:
+            if current is not None:
+                current[2] += time.perf_counter() - start
+                if self._profile is not None:
+                    self._profile.enable()
+
+    # ---------------------
+    # Report
+    # ---------------------
+
+    def report(self):
+        """
+        Render the aggregated profile.
+
+        Returns:
+            str: Operations, spans, top functions and allocations.
+        """
+        out = io.StringIO()
+        out.write("=" * 72 + "\nCIPHERSAFE PROFILE\n" + "=" * 72 + "\n")
+
+        out.write("\nOperations (seconds; 'other' is rendering and untraced code)\n")
+        out.write(f"  {'operation':<22}{'calls':>6}{'total':>10}{'prompts':>10}"
+                  f"{'spans':>10}{'other':>10}{'peak KB':>10}\n")
+        for name, (calls, total, waiting, spans, peak) in self.operations.items():
+            other = max(total - waiting - spans, 0.0)
+            peak_text = f"{peak / 1024:,.0f}" if self.memory else "-"
+            out.write(f"  {name:<22}{calls:>6}{total:>10.3f}{waiting:>10.3f}"
+                      f"{spans:>10.3f}{other:>10.3f}{peak_text:>10}\n")
+
+        out.write("\nSpans (milliseconds; nested spans are included in their parents)\n")
+        out.write(f"  {'span':<30}{'calls':>8}{'total':>12}{'mean':>10}{'max':>10}\n")
+        for name, (calls, total, worst) in sorted(self.spans.items(), key=lambda i: -i[1][1]):
+            out.write(f"  {name:<30}{calls:>8}{total * 1000:>12.2f}"
+                      f"{total / calls * 1000:>10.3f}{worst * 1000:>10.3f}\n")
+
+        if self._profile is not None:
+            out.write("\nTop functions (cProfile, by cumulative time, prompts excluded)\n")
+            try:
+                stats = pstats.Stats(self._profile, stream=out)
+            except TypeError:  # no operation ran, so nothing was profiled
+                out.write("  (no profiled operations)\n")
+            else:
+                stats.strip_dirs().sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+        if self.memory:
+            out.write(f"\nMemory kept by operations (tracemalloc, top {TOP_ALLOCATIONS} lines)\n")
+            ranked = sorted(self.allocations.items(), key=lambda i: -i[1][0])[:TOP_ALLOCATIONS]
+            for where, (size, count) in ranked:
+                out.write(f"  {size / 1024:>10,.1f} KB {count:>8} blocks  {where}\n")
+            if not ranked:
+                out.write("  (none)\n")
+        return out.getvalue()
+
+    def finish(self, output=None):
+        """
+        Stop profiling and write the report (meant for ``atexit``).
+
+        Args:
+            output (str, optional): File for the report (stderr if None);
+                the raw cProfile data goes next to it as ``<output>.prof``.
+        """
+        if not (self.active or self.operations):
+            return
+        self.stop()
+        text = self.report()
+        if output is None:
+            sys.stderr.write(text)
+            return
+        with open(output, "w") as f:
+            f.write(text)
+        if self._profile is not None:
+            try:
+                self._profile.dump_stats(output + ".prof")
+            except TypeError:
+                pass
+        sys.stderr.write(f"Profile written to {output}\n")
+
+
+class _Operation:
+    """Times, CPU-profiles and memory-traces one operation."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        self.state = [0, 0.0, 0.0, 0.0, 0]
+        profiler._local.operation = self.state
+        if profiler.memory:
+            self.snapshot = _snapshot()
+            tracemalloc.reset_peak()
+            self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        if profiler._profile is not None:
+            profiler._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        profiler = self.profiler
+        if profiler._profile is not None:
+            profiler._profile.disable()
+        elapsed = time.perf_counter() - self.start
+        peak = tracemalloc.get_traced_memory()[1] - self.base if profiler.memory else 0
+        profiler._local.operation = None
+        grown = []
+        if profiler.memory:
+            grown = [stat for stat in _snapshot().compare_to(self.snapshot, "lineno")
+                     if stat.size_diff > 0]
+            self.snapshot = None
+        with profiler._lock:
+            for stat in grown:
+                frame = stat.traceback[0]
+                totals = profiler.allocations.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                totals[0] += stat.size_diff
+                totals[1] += max(stat.count_diff, 0)
+            state = profiler.operations.setdefault(self.name, [0, 0.0, 0.0, 0.0, 0])
+            state[0] += 1
+            state[1] += elapsed
+            state[2] += self.state[2]
+            state[3] += self.state[3]
+            state[4] = max(state[4], peak)
+        return False
+
+
+class _Span:
+    """Times one span; only outermost spans count towards the operation."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        local = self.profiler._local
+        self.depth = getattr(local, "depth", 0)
+        local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.profiler._local.depth = self.depth
+        self.profiler._record_span(self.name, elapsed, self.depth == 0)
+        return False
+
+
+# ---------------------
+# Process-Wide Profiler
+# ---------------------
+profiler = Profiler()
+
+
+def _owner(fn):
+    """Class (or module) a function is defined on, or None for nested functions."""
+    path = fn.__qualname__.split(".")[:-1]
+    if "<locals>" in path:
+        return None
+    owner = sys.modules.get(fn.__module__)
+    for part in path:
+        owner = getattr(owner, part, None)
+    return owner
+
+
+def span(layer, name=None):
+    """
+    Decorator timing a method as the span ``<layer>.<name>`` while profiling.
+
+    The function is returned unchanged (and wrapped only once
+    ``profiler.start()`` runs), unless profiling is already on.
+
+    Args:
+        layer (str): "cipher", "vault", "keys", ...
+        name (str, optional): Span name; defaults to the function name.
+    """
+    def decorate(fn):
+        label = f"{layer}.{name or fn.__name__}"
+        _SPANS.append((fn, label))
+        # Modules imported mid-run (the registry loads ciphers lazily)
+        return profiler._wrap(fn, label) if profiler.active else fn
+    return decorate
+
+
+def add_profile_arguments(parser):
+    """Add ``--profile`` / ``--profile-output`` to an argparse parser."""
+    parser.add_argument("--profile", nargs="?", const="all", choices=["all", "cpu", "memory"],
+                        help="Profile each operation (cProfile and/or tracemalloc) and "
+                             "print a report at exit.")
+    parser.add_argument("--profile-output", metavar="PATH",
+                        help="Write the profile report to PATH instead of stderr.")
+
+
+def start_from_args(args):
+    """Start the profiler if ``--profile`` was given, reporting at exit."""
+    if not args.profile:
+        return
+    profiler.start(cpu=args.profile in ("all", "cpu"), memory=args.profile in ("all", "memory"))
+    atexit.register(profiler.finish, args.profile_output)
+
+
+if __name__ == "__main__":
+    @span("demo", "work")
+    def work(n):
+        return sum(i * i for i in range(n))
+
+    profiler.start()
+    for _ in range(3):
+        with profiler.operation("demo"):
+            work(200_000)
+    profiler.finish()
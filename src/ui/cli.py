@@ -6,22 +6,31 @@ Manages main menu navigation, encryption/decryption, story progression,
 and diary vault interaction.
 """
 
+import argparse
 import sys
-from ciphers.vigenere import VigenereCipher
-from ciphers.vernam import VernamCipher
+from ciphers.compressed_vernam import CompressedVernamPipeline
+from ciphers.registry import registry, KEYGEN, ONE_TIME_PAD
 from key_management.otp_manager import OTPKeyManager
+from key_management.pad_manager import PadFileManager
 from diary.vault import DiaryVault
 from story.narrative import NarrativeController
 from ui.menu import Menu
+# The cipher, vault and key layers record spans into the src.-prefixed module
+from src.telemetry.profiling import profiler, add_profile_arguments, start_from_args
 
 
 class CipherSafeCLI:
     """Main command-line interface for CipherSafe system."""
 
-    def __init__(self):
-        self.vigenere = VigenereCipher()
-        self.vernam = VernamCipher()
-        self.otp_manager = OTPKeyManager()
+    def __init__(self, compress_pads=False):
+        """
+        Args:
+            compress_pads (bool): Compress Vernam messages before encryption
+                so they use less material from a shared byte pad.
+        """
+        self.compress_pads = compress_pads
+        self.otp_manager = OTPKeyManager(pad_manager=PadFileManager())
+        self.entry_pipeline = CompressedVernamPipeline(pad_manager=self.otp_manager.pad_manager)
         self.vault = DiaryVault()
         self.story = NarrativeController()
 
@@ -32,26 +41,68 @@ class CipherSafeCLI:
     def encrypt_message(self):
         print("\n=== ENCRYPT MESSAGE ===")
         message = input("Enter message to encrypt: ").upper()
-        mode = input("Select cipher [1=Vigenère, 2=Vernam OTP]: ").strip()
+        names = registry.names()
+        options = ", ".join(f"{i}={registry.label(n)}" for i, n in enumerate(names, start=1))
+        mode = input(f"Select cipher [{options}]: ").strip()
 
-        if mode == "1":
-            keyword = input("Enter shared keyword for Vigenère: ").upper()
-            ciphertext = self.vigenere.encrypt(message, keyword)
-            print(f"\nCiphertext: {ciphertext}")
-            self.vault.add_entry("ZOE", "MISATO", "Vigenère", ciphertext, message, keyword)
-            print("Message added to vault.")
+        if not (mode.isdigit() and 1 <= int(mode) <= len(names)):
+            print("Invalid mode selected.")
+            input("\nPress Enter to continue...")
+            return
+
+        name = names[int(mode) - 1]
+        cipher = registry.get(name)
+        label = registry.label(name)
+
+        if registry.supports(name, ONE_TIME_PAD):
+            if self.compress_pads:
+                try:
+                    ciphertext, segment, report = self.entry_pipeline.seal_entry(message)
+                except ValueError as exc:
+                    print(f"\n{exc} Sending it uncompressed.")
+                else:
+                    print(f"\nCompressed ({report['codec']}): {report['pad_bytes_used']} of "
+                          f"{report['original_bytes']} pad bytes used, from pad {segment.pad_id}.")
+                    print(f"Ciphertext: {ciphertext}")
+                    self.vault.add_entry("ZOE", "MISATO", label, ciphertext, message,
+                                         pad_ref=segment._asdict())
+                    print("Message added to vault.")
+                    input("\nPress Enter to continue...")
+                    return
+
+            segment, otp_key = self.otp_manager.reserve_pad_key(len(message))
+            if segment is not None:
+                ciphertext, _ = cipher.encrypt_message(message, otp_key)
+                print(f"\nKey taken from pad {segment.pad_id} at offset {segment.offset}.")
+                print(f"Ciphertext: {ciphertext}")
+                self.vault.add_entry("ZOE", "MISATO", label, ciphertext, message,
+                                     pad_ref=segment._asdict())
+                print("Message added to vault.")
+                input("\nPress Enter to continue...")
+                return
 
-        elif mode == "2":
             otp_key = self.otp_manager.get_new_key(len(message))
-            ciphertext, otp_generated = self.vernam.encrypt(message, otp_key)
+            ciphertext, otp_generated = cipher.encrypt_message(message, otp_key)
             print(f"\nGenerated OTP Key: {otp_generated}")
             print(f"Ciphertext: {ciphertext}")
             self.otp_manager.mark_key_used(otp_generated)
-            self.vault.add_entry("ZOE", "MISATO", "Vernam OTP", ciphertext, message, otp_generated)
+            self.vault.add_entry("ZOE", "MISATO", label, ciphertext, message, otp_generated)
+            print("Message added to vault.")
+
+        elif registry.supports(name, KEYGEN):
+            ciphertext, key = cipher.encrypt_message(message)
+            print(f"\nGenerated {label} key: {key}")
+            print(f"Ciphertext: {ciphertext}")
+            self.vault.add_entry("ZOE", "MISATO", label, ciphertext, message, key)
             print("Message added to vault.")
 
         else:
-            print("Invalid mode selected.")
+            keyword = input(f"Enter shared keyword for {label}: ").upper()
+            ciphertext, _ = cipher.encrypt_message(message, keyword)
+            print(f"\nCiphertext: {ciphertext}")
+            self.vault.add_entry("ZOE", "MISATO", label, ciphertext, message, keyword)
+            print("Message added to vault.")
+
         input("\nPress Enter to continue...")
 
     def decrypt_message(self):
@@ -72,26 +123,74 @@ class CipherSafeCLI:
             print("Invalid selection.")
             return
 
-        if msg['cipher_type'] == "Vigenère":
-            keyword = input("Enter keyword for Vigenère: ").upper()
-            plaintext = self.vigenere.decrypt(msg['ciphertext'], keyword)
+        try:
+            name = registry.resolve(msg['cipher_type'])
+        except ValueError:
+            print("Unsupported cipher.")
+            return
+        cipher = registry.get(name)
+
+        if registry.supports(name, ONE_TIME_PAD) and self.entry_pipeline.sealed_entry(msg.get('pad_ref')):
+            plaintext = self.entry_pipeline.open_entry(msg['ciphertext'], msg['pad_ref'])
+
+        elif registry.supports(name, ONE_TIME_PAD) and msg.get('pad_ref'):
+            plaintext = cipher.decrypt(msg['ciphertext'], self.otp_manager.pad_key(msg['pad_ref']))
 
-        elif msg['cipher_type'] == "Vernam OTP":
+        elif registry.supports(name, ONE_TIME_PAD):
             otp_key = input("Enter OTP key: ").upper()
             if self.otp_manager.is_key_used(otp_key):
                 print("OTP key has already been used; cannot decrypt again!")
                 return
-            plaintext = self.vernam.decrypt(msg['ciphertext'], otp_key)
+            plaintext = cipher.decrypt(msg['ciphertext'], otp_key)
             self.otp_manager.mark_key_used(otp_key)
 
         else:
-            print("Unsupported cipher.")
-            return
+            key = input(f"Enter key for {msg['cipher_type']}: ").strip()
+            try:
+                plaintext = cipher.decrypt(msg['ciphertext'], key)
+            except ValueError as exc:
+                print(f"Decryption failed: {exc}")
+                return
 
         print(f"\nDecrypted Message: {plaintext}")
         self.vault.update_entry(msg['id'], plaintext)
         input("Press Enter to continue...")
 
+    def analyze_intercept(self):
+        print("\n=== ANALYZE INTERCEPT ===")
+        # Imported here so NumPy only loads when the analyzer is used
+        from ciphers.vigenere_analysis import VigenereAnalyzer
+
+        ciphertext = input("Paste Vigenère ciphertext (blank to pick from vault): ").strip()
+        if not ciphertext:
+            label = registry.label("vigenere")
+            entries = [m for m in self.vault.list_all() if m['cipher_type'] == label]
+            if not entries:
+                print("No Vigenère intercepts in the vault.")
+                input("Press Enter to return.")
+                return
+            for i, msg in enumerate(entries, start=1):
+                print(f"{i}. From {msg['sender']} at {msg['timestamp']}")
+            try:
+                ciphertext = entries[int(input("Select intercept: ")) - 1]['ciphertext']
+            except (ValueError, IndexError):
+                print("Invalid selection.")
+                return
+
+        try:
+            report = VigenereAnalyzer().analyze(ciphertext)
+        except ValueError as exc:
+            print(f"Analysis failed: {exc}")
+            return
+
+        kasiski = sorted(report['kasiski'].items(), key=lambda item: item[1], reverse=True)[:3]
+        print(f"\nEstimated key length: {report['key_length']} (IoC {report['ioc']:.4f})")
+        print("Kasiski periods: " + ", ".join(f"{p} ({share:.0%})" for p, share in kasiski))
+        print(f"Recovered key: {report['key']}")
+        plaintext = registry.get("vigenere").decrypt(ciphertext, report['key'])
+        print(f"Plaintext preview: {plaintext[:200]}")
+        input("\nPress Enter to continue...")
+
     # ---------------------------
     # Storyline / Diary
     # ---------------------------
@@ -126,6 +225,7 @@ class CipherSafeCLI:
             "Decrypt Received Message",
             "View Diary Vault",
             "Continue Story",
+            "Analyze Intercept",
             "Exit System"
         ])
 
@@ -133,18 +233,32 @@ class CipherSafeCLI:
             choice = main_menu.get_choice()
 
             if choice == 1:
-                self.encrypt_message()
+                with profiler.operation("encrypt"):
+                    self.encrypt_message()
             elif choice == 2:
-                self.decrypt_message()
+                with profiler.operation("decrypt"):
+                    self.decrypt_message()
             elif choice == 3:
-                self.view_vault()
+                with profiler.operation("view"):
+                    self.view_vault()
             elif choice == 4:
-                self.continue_story()
+                with profiler.operation("story"):
+                    self.continue_story()
             elif choice == 5:
+                with profiler.operation("analyze"):
+                    self.analyze_intercept()
+            elif choice == 6:
                 print("Exiting CipherSafe terminal... stay encrypted, Agent.")
                 sys.exit(0)
 
 
 if __name__ == "__main__":
-    app = CipherSafeCLI()
+    parser = argparse.ArgumentParser(description="CipherSafe main terminal.")
+    parser.add_argument("--compress-pads", action="store_true",
+                        help="Compress Vernam messages first so they use less pad "
+                             "(needs a byte pad: pads-create NAME SIZE --kind bytes).")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args)
+    app = CipherSafeCLI(compress_pads=args.compress_pads)
     app.run()
@@ -0,0 +1,401 @@
+"""
+CipherSafe Scripting Commands (commands.py)
+-------------------------------------------
+Non-interactive subcommands for shell pipelines. Input is read from a
+file or stdin and output written to a file or stdout as it is produced,
+so inputs of any size stream through in constant memory.
+
+Output is machine-readable: message batches are NDJSON (one result per
+input, the same objects the web app's ``/encrypt/batch`` returns), and
+commands whose stdout carries raw bytes print their metadata as one JSON
+line on stderr instead. The exit status is 1 if any item failed.
+
+Usage:
+    python main.py encrypt -m vigenere -k LEMON < messages.txt > sealed.ndjson
+    python main.py decrypt --ndjson -m vigenere < sealed.ndjson
+    python main.py encrypt --raw -m aes-gcm -i report.pdf -o report.bin
+    python main.py stego-embed --cover cover.png -o stego.png < secret.txt
+    python main.py stego-extract stego.png
+    python main.py vault-export --status encrypted
+    python main.py keys-provision otp 1000 --length 64
+    python main.py pads-create UPLOADS 512M --kind bytes
+    python main.py pads-list
+"""
+
+import argparse
+import json
+import os
+import stat
+import sys
+from contextlib import contextmanager
+from itertools import islice
+
+from src.key_management.provision import provision_keys
+from src.telemetry.profiling import profiler, add_profile_arguments, start_from_args
+from src.web.errors import JobError
+from src.web.jobs import open_decrypt_stream, open_encrypt_stream, parse_item, run_chunk
+from src.web.services import WebServices, services, use_services
+
+COMMANDS = ("encrypt", "decrypt", "stego-embed", "stego-extract", "vault-export", "keys-provision",
+            "pads-create", "pads-list")
+# Messages handed to the cipher layer at a time (also the output flush interval)
+BATCH_CHUNK = 256
+# Bytes read per step in --raw mode
+STREAM_CHUNK = 64 * 1024
+# Stream headers (as the web app sends them) -> --raw metadata (key, type)
+HEADER_FIELDS = {"X-Cipher-Key": ("key", str), "X-Pad-Id": ("pad_id", str),
+                 "X-Pad-Offset": ("pad_offset", int), "X-Pad-Length": ("pad_length", int),
+                 "X-Message-Id": ("id", str)}
+
+
+# ---------------------
+# I/O Helpers
+# ---------------------
+
+@contextmanager
+def _opened(path, mode, standard):
+    """``path`` opened in ``mode``, or the standard stream for None / "-" (left open)."""
+    if path in (None, "-"):
+        yield standard.buffer if "b" in mode else standard
+        return
+    with open(path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as stream:
+        yield stream
+
+
+def _input(path, binary=False):
+    return _opened(path, "rb" if binary else "r", sys.stdin)
+
+
+def _output(path, binary=False):
+    return _opened(path, "wb" if binary else "w", sys.stdout)
+
+
+def _emit(stream, record):
+    stream.write(json.dumps(record) + "\n")
+
+
+def _metadata_stream(output_path):
+    """Where metadata goes: stdout, unless stdout carries the data."""
+    return sys.stderr if output_path in (None, "-") else sys.stdout
+
+
+def _read_chunks(source):
+    while True:
+        chunk = source.read(STREAM_CHUNK)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _byte_size(text):
+    """argparse type for sizes such as ``4096``, ``64K``, ``512M`` or ``2G``."""
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper()
+    scale = units.get(text[-1:], 1)
+    try:
+        size = int(text[:-1] if scale > 1 else text) * scale
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {text!r}") from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError("size must be positive")
+    return size
+
+
+def _file_size(source):
+    """Size of a regular input file, or None for pipes and terminals."""
+    try:
+        info = os.fstat(source.fileno())
+    except (AttributeError, OSError, ValueError):
+        return None
+    return info.st_size if stat.S_ISREG(info.st_mode) else None
+
+
+# ---------------------
+# encrypt / decrypt
+# ---------------------
+
+def _items(source, args):
+    """
+    Yield (index, item) pairs from text lines or NDJSON lines.
+
+    Blank lines are skipped; indices stay the input line numbers (from 0).
+    """
+    for index, line in enumerate(source):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if not args.ndjson:
+            yield index, {"text": line, "mode": args.mode, "key": args.key}
+            continue
+        item = parse_item(line)
+        if isinstance(item, dict):
+            # decrypt accepts encrypt's own output lines
+            if "text" not in item and "cipher" in item:
+                item["text"] = item["cipher"]
+            item.setdefault("mode", args.mode)
+            item.setdefault("key", args.key)
+        yield index, item
+
+
+def run_messages(args, operation):
+    """Process line-delimited messages in chunks, streaming NDJSON results."""
+    failed = False
+    with _input(args.input) as source, _output(args.output) as output:
+        items = _items(source, args)
+        while True:
+            chunk = list(islice(items, BATCH_CHUNK))
+            if not chunk:
+                break
+            for result in run_chunk(operation, chunk):
+                failed = failed or "error" in result
+                _emit(output, result)
+            output.flush()
+    return 1 if failed else 0
+
+
+def run_stream(args, operation):
+    """Encrypt or decrypt one byte stream (``--raw``), like ``/encrypt/file``."""
+    written = 0
+    try:
+        with _input(args.input, binary=True) as source, _output(args.output, binary=True) as output:
+            chunks = _read_chunks(source)
+            if operation == "encrypt":
+                stream, headers = open_encrypt_stream(args.mode, chunks, key=args.key,
+                                                      length=_file_size(source))
+            else:
+                pad_ref = {"pad_id": args.pad_id, "offset": args.pad_offset,
+                           "length": args.pad_length or _file_size(source)}
+                stream, headers = open_decrypt_stream(args.mode, chunks, key=args.key, pad_ref=pad_ref)
+            for piece in stream:
+                output.write(piece)
+                written += len(piece)
+            output.flush()
+    except ValueError as exc:
+        status = exc.status if isinstance(exc, JobError) else 400
+        message = str(exc)
+        if status == 411:
+            message = "One-time pad streams need a regular input file (-i); a pipe's length is unknown"
+        _emit(sys.stderr, {"error": message, "status": status})
+        return 1
+
+    record = {"mode": args.mode, "bytes": written}
+    for name, value in headers.items():
+        field, cast = HEADER_FIELDS[name]
+        record[field] = cast(value)
+    _emit(_metadata_stream(args.output), record)
+    return 0
+
+
+def cmd_encrypt(args):
+    return (run_stream if args.raw else run_messages)(args, "encrypt")
+
+
+def cmd_decrypt(args):
+    return (run_stream if args.raw else run_messages)(args, "decrypt")
+
+
+# ---------------------
+# Steganography
+# ---------------------
+
+def cmd_stego_embed(args):
+    """Hide stdin (or ``--input``) in a cover image."""
+    # Imported here so PIL and NumPy only load for the stego commands
+    from src.steganography.lsb_stego import LSBSteganography
+
+    with _input(args.input, binary=True) as source:
+        payload = source.read()
+
+    stego = LSBSteganography()
+    try:
+        with open(args.cover, "rb") as cover:
+            image = stego.encode_bytes(cover, payload, compress=args.compress)
+    except (ValueError, OSError) as exc:
+        _emit(sys.stderr, {"error": str(exc)})
+        return 1
+
+    with _output(args.output, binary=True) as output:
+        output.write(image)
+        output.flush()
+    _emit(_metadata_stream(args.output), {"cover": args.cover, "output": args.output or "-",
+                                          "payload_bytes": len(payload), "image_bytes": len(image)})
+    return 0
+
+
+def cmd_stego_extract(args):
+    """Write the payload hidden in an image to stdout (or ``--output``)."""
+    from src.steganography.lsb_stego import LSBSteganography
+
+    stego = LSBSteganography()
+    try:
+        if args.image == "-":
+            payload = stego.decode_bytes(sys.stdin.buffer.read(), raw=True)
+        else:
+            payload = stego.decode(args.image, raw=True)
+    except (ValueError, OSError) as exc:
+        _emit(sys.stderr, {"error": str(exc)})
+        return 1
+    if payload is None:
+        _emit(sys.stderr, {"error": "No hidden message found."})
+        return 1
+
+    with _output(args.output, binary=not args.json) as output:
+        if args.json:
+            _emit(output, {"message": payload.decode("utf-8", errors="replace"), "bytes": len(payload)})
+        else:
+            output.write(payload)
+        output.flush()
+    return 0
+
+
+# ---------------------
+# Vault / Keys
+# ---------------------
+
+def cmd_vault_export(args):
+    """Stream vault entries as NDJSON."""
+    with _output(args.output) as output:
+        for entry in services().vault.list_all():
+            if args.status and entry.get("status") != args.status:
+                continue
+            if not args.include_keys:
+                entry = {k: v for k, v in entry.items() if k not in ("key_used", "pad_ref")}
+            _emit(output, entry)
+        output.flush()
+    return 0
+
+
+def cmd_keys_provision(args):
+    """Provision keys in bulk; prints a summary, or every key with ``--emit-keys``."""
+    storage = services().keys
+    try:
+        keys = provision_keys(storage, args.cipher_type, args.count, args.length, args.prefix)
+    except ValueError as exc:
+        _emit(sys.stderr, {"error": str(exc)})
+        return 1
+
+    if args.emit_keys:
+        for key_id, value in keys.items():
+            _emit(sys.stdout, {"key_id": key_id, "key": value})
+    else:
+        _emit(sys.stdout, {"cipher_type": args.cipher_type, "count": len(keys),
+                           "storage": storage.db_file})
+    return 0
+
+
+def cmd_pads_create(args):
+    """Generate a shared one-time pad file in the data directory's pads/."""
+    pads = services().pads
+    try:
+        path = pads.create_pad(args.pad_id, args.size, kind=args.kind)
+    except ValueError as exc:
+        _emit(sys.stderr, {"error": str(exc)})
+        return 1
+    _emit(sys.stdout, {"pad_id": args.pad_id, "kind": args.kind, "size": args.size, "path": path})
+    return 0
+
+
+def cmd_pads_list(args):
+    """Print every pad with its kind, size and unconsumed bytes."""
+    pads = services().pads
+    for pad_id in pads.list_pads():
+        info = pads.pad_info(pad_id)
+        _emit(sys.stdout, {"pad_id": pad_id, "kind": info["kind"], "size": info["size"],
+                           "remaining": info["size"] - info["offset"]})
+    return 0
+
+
+# ---------------------
+# Entry Point
+# ---------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="ciphersafe", description="Scriptable CipherSafe commands (NDJSON in and out).")
+    parser.add_argument("--data-dir", default=os.environ.get("CIPHERSAFE_DATA_DIR", "data/"),
+                        help="Vault, key store and pad directory (default: $CIPHERSAFE_DATA_DIR or data/).")
+    add_profile_arguments(parser)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, handler, action in (("encrypt", cmd_encrypt, "Encrypt"), ("decrypt", cmd_decrypt, "Decrypt")):
+        sub = commands.add_parser(name, help=f"{action} one message per input line, or a byte stream.")
+        sub.add_argument("-m", "--mode", default="vigenere", help="Cipher mode (default: vigenere).")
+        sub.add_argument("-k", "--key", default="", help="Key; generated per message where supported.")
+        sub.add_argument("-i", "--input", help="Input file (default: stdin).")
+        sub.add_argument("-o", "--output", help="Output file (default: stdout).")
+        form = sub.add_mutually_exclusive_group()
+        form.add_argument("--ndjson", action="store_true",
+                          help='Input lines are JSON items: {"text", "mode", "key"}.')
+        form.add_argument("--raw", action="store_true",
+                          help="Treat the whole input as one byte stream (file encryption).")
+        if name == "decrypt":
+            sub.add_argument("--pad-id", help="--raw Vernam: pad the stream was sealed with.")
+            sub.add_argument("--pad-offset", type=int, help="--raw Vernam: offset in the pad.")
+            sub.add_argument("--pad-length", type=int,
+                             help="--raw Vernam: segment length (default: input file size).")
+        sub.set_defaults(handler=handler)
+
+    sub = commands.add_parser("stego-embed", help="Hide stdin (or a file) in a cover image.")
+    sub.add_argument("--cover", required=True, help="Cover image (PNG/BMP).")
+    sub.add_argument("-i", "--input", help="Payload file (default: stdin).")
+    sub.add_argument("-o", "--output", help="Stego PNG (default: stdout).")
+    sub.add_argument("--compress", action="store_true", help="Deflate the payload first.")
+    sub.set_defaults(handler=cmd_stego_embed)
+
+    sub = commands.add_parser("stego-extract", help="Write the payload hidden in an image.")
+    sub.add_argument("image", help="Stego image, or - for stdin.")
+    sub.add_argument("-o", "--output", help="Payload file (default: stdout).")
+    sub.add_argument("--json", action="store_true", help="Print {\"message\", \"bytes\"} instead of raw bytes.")
+    sub.set_defaults(handler=cmd_stego_extract)
+
+    sub = commands.add_parser("vault-export", help="Stream diary vault entries as NDJSON.")
+    sub.add_argument("--status", choices=["encrypted", "decrypted"], help="Only entries with this status.")
+    sub.add_argument("--include-keys", action="store_true", help="Include key_used and pad_ref fields.")
+    sub.add_argument("-o", "--output", help="Output file (default: stdout).")
+    sub.set_defaults(handler=cmd_vault_export)
+
+    sub = commands.add_parser("keys-provision", help="Generate and store keys in bulk.")
+    sub.add_argument("cipher_type", choices=["vigenere", "otp"], help="Key type to generate.")
+    sub.add_argument("count", type=int, help="Number of keys to provision.")
+    sub.add_argument("--length", type=int, help="Key length (default 6 for Vigenère).")
+    sub.add_argument("--prefix", help="Key id prefix.")
+    sub.add_argument("--emit-keys", action="store_true", help="Print every key as NDJSON.")
+    sub.set_defaults(handler=cmd_keys_provision)
+
+    sub = commands.add_parser("pads-create", help="Generate a shared one-time pad file.")
+    sub.add_argument("pad_id", help="Pad name shared with the receiving agent.")
+    sub.add_argument("size", type=_byte_size, help="Pad size in bytes; K, M and G suffixes allowed.")
+    sub.add_argument("--kind", choices=["letters", "bytes"], default="letters",
+                     help="letters (A-Z) for messages, bytes for --raw / file Vernam (default: letters).")
+    sub.set_defaults(handler=cmd_pads_create)
+
+    sub = commands.add_parser("pads-list", help="List pads and the material left in each.")
+    sub.set_defaults(handler=cmd_pads_list)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run one subcommand.
+
+    Returns:
+        int: Exit status (0 success, 1 if any item or the command failed).
+    """
+    args = build_parser().parse_args(argv)
+    start_from_args(args)
+    # Same vault, key store and pads as the web app on this data directory
+    previous = use_services(WebServices(data_dir=args.data_dir))
+    try:
+        with profiler.operation(args.command):
+            return args.handler(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    finally:
+        use_services(previous).close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
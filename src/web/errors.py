@@ -0,0 +1,13 @@
+"""
+CipherSafe Web Errors (errors.py)
+---------------------------------
+The error type web request handling raises for requests it cannot serve.
+"""
+
+
+class JobError(ValueError):
+    """A request that cannot be served, with the HTTP status to report."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
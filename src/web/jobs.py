@@ -0,0 +1,256 @@
+"""
+CipherSafe Web Jobs (jobs.py)
+-----------------------------
+Framework-neutral request handling shared by the Flask app (``webapp.py``)
+and the ASGI app (``asgi_app.py``). Every function here is synchronous
+and may block on cipher work or pad I/O; the Flask app calls them on its
+request thread, the ASGI app from its worker pools.
+
+One-time-pad modes go through the process-wide ``services()``, which
+registers every issued pad and lets each pad decrypt its message once.
+Errors are raised as ``JobError`` (a ``ValueError``) carrying the HTTP
+status the web layer should answer with.
+"""
+
+import json
+
+from src.ciphers.registry import registry, KEYGEN, ONE_TIME_PAD, STREAMING
+from src.telemetry.metrics import timed_iter, CIPHER_SECONDS
+from src.web.errors import JobError
+from src.web.services import services
+
+
+def resolve_mode(name):
+    """Canonical registry name of a requested mode, or JobError."""
+    try:
+        return registry.resolve(name)
+    except ValueError:
+        raise JobError('Invalid mode') from None
+
+
+def _well_formed(text, key):
+    """Client-supplied text and key are strings (JSON may carry anything)."""
+    return isinstance(text, str) and isinstance(key, str)
+
+
+# ---------------------
+# Single Messages
+# ---------------------
+
+def encrypt_text(mode, text, key):
+    """
+    Encrypt one message.
+
+    Returns:
+        dict: ``{'cipher': ..., 'key': ...}``, plus the vault message
+        ``id`` for one-time-pad modes.
+    """
+    if not _well_formed(text, key):
+        raise JobError('Text and key must be strings')
+    mode = resolve_mode(mode)
+    # One-time pads are never accepted from the client; always issue a fresh one
+    if registry.supports(mode, ONE_TIME_PAD):
+        output = services().seal_one_time(mode, [text])[0]
+        if isinstance(output, ValueError):
+            raise _job_error(output)
+        return {'cipher': output[0], 'key': output[1], 'id': output[2]}
+    try:
+        with CIPHER_SECONDS.time(mode=mode, operation='encrypt'):
+            result, key = registry.get(mode).encrypt_message(text, key)
+    except ValueError as exc:
+        raise JobError(str(exc)) from None
+    return {'cipher': result, 'key': key}
+
+
+def decrypt_text(mode, text, key):
+    """
+    Decrypt one message.
+
+    Returns:
+        dict: ``{'plain': ...}``
+    """
+    if not _well_formed(text, key):
+        raise JobError('Text and key must be strings')
+    mode = resolve_mode(mode)
+    if registry.supports(mode, ONE_TIME_PAD):
+        output = services().open_one_time(mode, [(text, key)])[0]
+        if isinstance(output, ValueError):
+            raise _job_error(output)
+        return {'plain': output}
+    try:
+        with CIPHER_SECONDS.time(mode=mode, operation='decrypt'):
+            result = registry.get(mode).decrypt(text, key)
+    except ValueError as exc:
+        raise JobError(str(exc)) from None
+    return {'plain': result}
+
+
+def _job_error(exc):
+    return exc if isinstance(exc, JobError) else JobError(str(exc))
+
+
+# ---------------------
+# Batches
+# ---------------------
+
+def parse_item(line):
+    """One NDJSON line as a request item; malformed lines become None."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def parse_items(body):
+    """
+    Request items of a JSON array (or ``{"items": [...]}``) body.
+
+    Raises:
+        JobError: If the body is not such a document.
+    """
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        data = data.get('items')
+    if not isinstance(data, list):
+        raise JobError('Expected a JSON array or an NDJSON body')
+    return data
+
+
+def run_chunk(operation, chunk):
+    """
+    Process (index, item) pairs, batching items that share a cipher mode.
+
+    Returns:
+        list[dict]: One result per item, in input order.
+    """
+    results = {}
+    groups = {}
+    for index, item in chunk:
+        if not isinstance(item, dict):
+            results[index] = {'index': index, 'error': 'Malformed item'}
+            continue
+        try:
+            mode = registry.resolve(item.get('mode', 'vigenere'))
+        except ValueError:
+            results[index] = {'index': index, 'error': 'Invalid mode'}
+            continue
+        text, key = item.get('text', ''), item.get('key', '')
+        if not _well_formed(text, key):
+            results[index] = {'index': index, 'error': 'Malformed item'}
+            continue
+        # One-time pads are never accepted from the client; always issue a fresh one
+        if operation == 'encrypt' and registry.supports(mode, ONE_TIME_PAD):
+            key = None
+        groups.setdefault(mode, []).append((index, text, key))
+
+    for mode, entries in groups.items():
+        indices, texts, keys = zip(*entries)
+        if registry.supports(mode, ONE_TIME_PAD):
+            if operation == 'encrypt':
+                outputs = services().seal_one_time(mode, texts)
+            else:
+                outputs = services().open_one_time(mode, list(zip(texts, keys)))
+        else:
+            outputs = _run_group(registry.get(mode), mode, operation, texts, keys)
+
+        for index, output in zip(indices, outputs):
+            if isinstance(output, ValueError):
+                results[index] = {'index': index, 'error': str(output)}
+            elif operation == 'encrypt':
+                results[index] = {'index': index, 'cipher': output[0], 'key': output[1]}
+                if len(output) > 2:
+                    results[index]['id'] = output[2]
+            else:
+                results[index] = {'index': index, 'plain': output}
+
+    return [results[index] for index, _ in chunk]
+
+
+def _run_group(cipher, mode, operation, texts, keys):
+    """Batch-process one mode's items; failing items become their ValueError."""
+    batch = cipher.encrypt_many if operation == 'encrypt' else cipher.decrypt_many
+    try:
+        with CIPHER_SECONDS.time(mode=mode, operation=operation):
+            return batch(texts, keys, max_workers=1)
+    except ValueError:
+        # Isolate the failing items instead of failing the whole group
+        outputs = []
+        for text, key in zip(texts, keys):
+            try:
+                outputs.append(batch([text], [key], max_workers=1)[0])
+            except ValueError as exc:
+                outputs.append(exc)
+        return outputs
+
+
+# ---------------------
+# File Streams
+# ---------------------
+
+def open_encrypt_stream(mode, chunks, key='', length=None):
+    """
+    Start encrypting an upload.
+
+    One-time-pad modes consume a shared byte pad; the segment is issued
+    and registered by ``services().issue_segment``.
+
+    Args:
+        mode (str): Requested cipher mode.
+        chunks (iterable[bytes]): Upload body, read lazily.
+        key (str): Client key (``X-Cipher-Key``); generated if empty and
+            the mode supports it.
+        length (int, optional): Upload size; required for one-time pads.
+
+    Returns:
+        tuple: (ciphertext chunk iterator, response headers)
+    """
+    name = resolve_mode(mode)
+    cipher = registry.get(name)
+    headers = {}
+
+    if registry.supports(name, ONE_TIME_PAD):
+        if not length:
+            raise JobError('Content-Length is required for one-time pad uploads', 411)
+        segment, message_id = services().issue_segment(name, length)
+        stream = cipher.encrypt_bytes_iter(chunks, services().pads.read(segment))
+        headers.update({'X-Pad-Id': segment.pad_id, 'X-Pad-Offset': str(segment.offset),
+                        'X-Pad-Length': str(segment.length), 'X-Message-Id': message_id})
+    elif registry.supports(name, STREAMING):
+        if not key and registry.supports(name, KEYGEN):
+            key = cipher.generate_key()
+            headers['X-Cipher-Key'] = key
+        stream = cipher.encrypt_iter(chunks, key)
+    else:
+        raise JobError('Mode does not support file encryption')
+
+    # Cipher time of a file stream includes pulling upload chunks off the socket
+    return timed_iter(stream, CIPHER_SECONDS, mode=name, operation='encrypt'), headers
+
+
+def open_decrypt_stream(mode, chunks, key='', pad_ref=None):
+    """
+    Start decrypting an upload produced by ``open_encrypt_stream``.
+
+    Args:
+        pad_ref (dict, optional): ``pad_id``, ``offset`` and ``length``
+            query parameters for one-time-pad modes; must name a segment
+            ``open_encrypt_stream`` issued.
+
+    Returns:
+        tuple: (plaintext chunk iterator, response headers)
+    """
+    name = resolve_mode(mode)
+    cipher = registry.get(name)
+
+    if registry.supports(name, ONE_TIME_PAD):
+        # Only segments this service issued, never arbitrary pad ranges or files
+        stream = cipher.decrypt_bytes_iter(chunks, services().open_segment(pad_ref or {}))
+    elif registry.supports(name, STREAMING):
+        stream = cipher.decrypt_iter(chunks, key)
+    else:
+        raise JobError('Mode does not support file decryption')
+
+    return timed_iter(stream, CIPHER_SECONDS, mode=name, operation='decrypt'), {}
@@ -0,0 +1,248 @@
+"""
+CipherSafe Web Services (services.py)
+-------------------------------------
+Long-lived vault, key registry and pad services behind the web apps.
+
+Each worker process builds one ``WebServices`` on first use (so a
+gunicorn ``--preload`` master never hands its SQLite connection to the
+forked workers) and every request thread shares it. One-time pads issued
+over the web, message keys and file pad segments alike, are claimed in
+the key registry and logged in the diary vault, so each opens only once
+and the CLI and the web enforce the same single-use rules.
+"""
+
+import os
+import threading
+import time
+
+from src.ciphers.normalize import normalize
+from src.ciphers.registry import registry
+from src.diary.message import Message
+from src.diary.vault import DiaryVault
+from src.key_management.key_storage import KeyStorage
+from src.key_management.otp_manager import OTPKeyManager
+from src.key_management.pad_manager import PadFileManager, PadSegment
+from src.telemetry.metrics import CIPHER_SECONDS
+from src.web.errors import JobError
+
+# Vault sender / receiver of messages sealed through the web
+WEB_SENDER = "WEB"
+WEB_RECEIVER = "HQ"
+# Fresh keys tried per message before giving up on a unique one
+ISSUE_ATTEMPTS = 3
+
+
+def _segment_token(segment):
+    """Key-registry value recording an issued byte-pad segment."""
+    return f"PAD:{segment.pad_id}:{segment.offset}:{segment.length}"
+
+
+class WebServices:
+    """Process-wide storage services shared by every request thread."""
+
+    def __init__(self, data_dir=None):
+        """
+        Args:
+            data_dir (str, optional): Root of the vault, key store and pads;
+                defaults to ``$CIPHERSAFE_DATA_DIR`` or ``data/``.
+        """
+        self.data_dir = data_dir or os.environ.get("CIPHERSAFE_DATA_DIR", "data/")
+        self.pid = os.getpid()
+        self.vault = DiaryVault(os.path.join(self.data_dir, "diary_vault.db"))
+        self.keys = KeyStorage(os.path.join(self.data_dir, "keys/"))
+        self.pads = PadFileManager(os.path.join(self.data_dir, "pads/"))
+        self.otp = OTPKeyManager(pad_manager=self.pads, key_storage=self.keys)
+
+    def close(self):
+        self.vault.close()
+        self.keys.close()
+        self.pads.close()
+
+    # ---------------------
+    # One-Time Pads
+    # ---------------------
+
+    def seal_one_time(self, mode, plaintexts):
+        """
+        Encrypt messages under freshly issued, registered one-time pads.
+
+        Every key is claimed in the key registry under its vault message
+        id before it is handed out, then all messages are logged with a
+        single vault write. If that write fails the claims are released,
+        so the registry never names a message the vault does not hold.
+
+        Returns:
+            list: (ciphertext, key, message id) per plaintext, or the
+            ValueError that message failed with.
+        """
+        cipher = registry.get(mode)
+        label = registry.label(mode)
+        results, messages = [], []
+        elapsed = 0.0
+        try:
+            for text in plaintexts:
+                try:
+                    for _ in range(ISSUE_ATTEMPTS):
+                        start = time.perf_counter()
+                        ciphertext, key = cipher.encrypt_message(text, None)
+                        elapsed += time.perf_counter() - start
+                        message = Message(WEB_SENDER, WEB_RECEIVER, label, ciphertext, key_used=key)
+                        if self.otp.mark_key_used(key, key_id=message.id):
+                            break
+                    else:
+                        raise JobError("Could not issue an unused one-time pad", 503)
+                except ValueError as exc:
+                    results.append(exc)
+                    continue
+                messages.append(message)
+                results.append((ciphertext, key, message.id))
+            CIPHER_SECONDS.observe(elapsed, mode=mode, operation="encrypt")
+            self.vault.add_messages(messages)
+        except BaseException:
+            self.keys.release_keys("otp", [message.id for message in messages])
+            raise
+        return results
+
+    def open_one_time(self, mode, items):
+        """
+        Decrypt messages sealed by ``seal_one_time``, each exactly once.
+
+        The key must be one this service issued and the ciphertext the
+        message it was issued for; the vault entry is then marked
+        decrypted, and any later attempt with the same pad is refused.
+
+        Args:
+            items (list): (ciphertext, key) pairs.
+
+        Returns:
+            list: Plaintext per item, or the ValueError it failed with.
+        """
+        cipher = registry.get(mode)
+        claimed = set()
+        results, pending = [], {}  # pending: result position -> vault message id
+        elapsed = 0.0
+        for position, (ciphertext, key) in enumerate(items):
+            key_id = self.keys.find_key_id("otp", normalize(key or ""))
+            entry = self.vault.get_entry(key_id) if key_id else None
+            if entry is None:
+                results.append(JobError("Unknown one-time pad key"))
+                continue
+            if entry["status"] != "encrypted" or key_id in claimed:
+                results.append(JobError("One-time pad already used", 409))
+                continue
+            if normalize(ciphertext) != normalize(entry["ciphertext"]):
+                results.append(JobError("Ciphertext does not match this pad's message"))
+                continue
+            try:
+                start = time.perf_counter()
+                results.append(cipher.decrypt(ciphertext, key))
+                elapsed += time.perf_counter() - start
+            except ValueError as exc:
+                results.append(exc)
+                continue
+            pending[position] = key_id
+            claimed.add(key_id)
+        CIPHER_SECONDS.observe(elapsed, mode=mode, operation="decrypt")
+
+        # Re-checked in the vault's update: another worker may have won the race
+        opened = self.vault.update_entries({key_id: results[position]
+                                            for position, key_id in pending.items()},
+                                           expect_status="encrypted")
+        for position, key_id in pending.items():
+            if key_id not in opened:
+                results[position] = JobError("One-time pad already used", 409)
+        return results
+
+    # ---------------------
+    # Byte-Pad Segments (file streams)
+    # ---------------------
+
+    def issue_segment(self, mode, length):
+        """
+        Reserve byte-pad material for one file and register it.
+
+        The segment is claimed in the key registry and logged in the vault
+        before it is handed out (the claim is released if logging fails);
+        only segments issued here can be opened.
+
+        Returns:
+            tuple: (PadSegment, vault message id)
+        """
+        segment = self.pads.allocate_any(length, kind="bytes")
+        if segment is None:
+            raise JobError("No byte pad has enough material left", 503)
+        message = Message(WEB_SENDER, WEB_RECEIVER, registry.label(mode),
+                          f"<{length}-byte file>", pad_ref=segment._asdict())
+        # A freshly allocated range has never been registered, so this always succeeds
+        self.keys.claim_key("otp", message.id, _segment_token(segment))
+        try:
+            self.vault.add_messages([message])
+        except BaseException:
+            self.keys.release_keys("otp", [message.id])
+            raise
+        return segment, message.id
+
+    def open_segment(self, pad_ref):
+        """
+        Pad material of a segment issued by ``issue_segment``, exactly once.
+
+        The vault entry is marked decrypted before any material is handed
+        out, so a stream that fails part-way still uses up its segment.
+
+        Args:
+            pad_ref (dict): Client-supplied ``pad_id``, ``offset``, ``length``.
+
+        Returns:
+            bytes: The segment's pad bytes.
+
+        Raises:
+            JobError: If the reference is malformed or was never issued
+                (400), or the segment was already opened (409).
+        """
+        try:
+            segment = PadSegment(pad_ref["pad_id"], int(pad_ref["offset"]), int(pad_ref["length"]))
+            if not self.pads.is_allocated(segment):
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            raise JobError("Missing or invalid pad reference") from None
+        key_id = self.keys.find_key_id("otp", _segment_token(segment))
+        entry = self.vault.get_entry(key_id) if key_id else None
+        if entry is None or entry.get("pad_ref") != segment._asdict():
+            raise JobError("Unknown pad segment")
+        # Re-checked in the vault's update: another worker may be opening it too
+        if (entry["status"] != "encrypted"
+                or not self.vault.update_entries({key_id: None}, expect_status="encrypted")):
+            raise JobError("One-time pad already used", 409)
+        return self.pads.read(segment)
+
+
+# ---------------------
+# Per-Process Instance
+# ---------------------
+_services = None
+_services_lock = threading.Lock()
+
+
+def services():
+    """This process's ``WebServices``, created on first use in each worker."""
+    global _services
+    current = _services
+    if current is None or current.pid != os.getpid():
+        with _services_lock:
+            if _services is None or _services.pid != os.getpid():
+                _services = WebServices()
+            current = _services
+    return current
+
+
+def use_services(instance):
+    """
+    Install the services this process should use (tests, custom setups).
+
+    Returns:
+        WebServices | None: The previously installed instance.
+    """
+    global _services
+    with _services_lock:
+        previous, _services = _services, instance
+    return previous
@@ -0,0 +1,71 @@
+"""
+Test Suite: AES-GCM Cipher
+Checks one-shot and streaming round trips and tamper detection.
+"""
+
+import unittest
+import os
+from io import BytesIO
+from ciphers.aes_gcm import AESGCMCipher
+
+class TestAESGCMCipher(unittest.TestCase):
+
+    def setUp(self):
+        self.cipher = AESGCMCipher(chunk_size=1024)
+        self.key = self.cipher.generate_key()
+
+    def test_text_round_trip(self):
+        token = self.cipher.encrypt("Meet at the safehouse, 23:00 ✓", self.key)
+        self.assertEqual(self.cipher.decrypt(token, self.key), "Meet at the safehouse, 23:00 ✓")
+
+    def test_wrong_key_rejected(self):
+        token = self.cipher.encrypt("HELLO", self.key)
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt(token, self.cipher.generate_key())
+
+    def test_tampered_bytes_rejected(self):
+        sealed = bytearray(self.cipher.encrypt_bytes(b"PAYLOAD", self.key))
+        sealed[14] ^= 1
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt_bytes(bytes(sealed), self.key)
+
+    def test_stream_round_trip(self):
+        data = os.urandom(10 * 1024 + 77)
+        sealed = BytesIO()
+        self.cipher.encrypt_stream(BytesIO(data), sealed, self.key)
+        restored = BytesIO()
+        self.cipher.decrypt_stream(BytesIO(sealed.getvalue()), restored, self.key)
+        self.assertEqual(restored.getvalue(), data)
+
+    def test_stream_accepts_irregular_chunks(self):
+        data = os.urandom(5000)
+        pieces = [data[i:i + 333] for i in range(0, len(data), 333)]
+        sealed = b"".join(self.cipher.encrypt_iter(pieces, self.key))
+        odd = [sealed[i:i + 700] for i in range(0, len(sealed), 700)]
+        self.assertEqual(b"".join(self.cipher.decrypt_iter(odd, self.key)), data)
+
+    def test_empty_stream_round_trip(self):
+        sealed = b"".join(self.cipher.encrypt_iter([], self.key))
+        self.assertEqual(b"".join(self.cipher.decrypt_iter([sealed], self.key)), b"")
+
+    def test_truncated_stream_rejected(self):
+        sealed = b"".join(self.cipher.encrypt_iter([os.urandom(4096)], self.key))
+        truncated = sealed[:self.cipher.STREAM_HEADER.size + 2 * (1024 + 16)]
+        with self.assertRaises(ValueError):
+            b"".join(self.cipher.decrypt_iter([truncated], self.key))
+
+    def test_oversized_header_chunk_rejected(self):
+        def upload():
+            yield self.cipher.STREAM_HEADER.pack(self.cipher.STREAM_MAGIC, 0xFFFFFFF0, b"\0" * 7)
+            for _ in range(64):
+                yield b"\0" * 4096
+            self.fail("reader consumed the body before checking the header")
+        for size in (0, 1025, 0xFFFFFFF0):
+            header = self.cipher.STREAM_HEADER.pack(self.cipher.STREAM_MAGIC, size, b"\0" * 7)
+            with self.assertRaises(ValueError):
+                next(self.cipher.decrypt_iter([header, b"\0" * 64], self.key))
+        with self.assertRaises(ValueError):
+            next(self.cipher.decrypt_iter(upload(), self.key))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
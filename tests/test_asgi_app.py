@@ -0,0 +1,165 @@
+"""
+Test Suite: ASGI Application
+Exercises the Starlette variant of the web routes through its test client.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+from PIL import Image
+import asgi_app
+from asgi_app import app, WorkerPool
+from starlette.testclient import TestClient
+from ciphers.vigenere import VigenereCipher
+from src.web.services import WebServices, use_services, services
+
+def ndjson(lines):
+    return [json.loads(line) for line in lines.splitlines() if line]
+
+class TestAsgiRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app).__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def test_encrypt_decrypt_round_trip(self):
+        sealed = self.client.post("/encrypt", json={"text": "ATTACK AT DAWN", "mode": "vigenere", "key": "LEMON"})
+        self.assertEqual(sealed.json()["cipher"], "LXFOPVEFRNHR")
+        plain = self.client.post("/decrypt", json={"text": "LXFOPVEFRNHR", "mode": "vigenere", "key": "LEMON"})
+        self.assertEqual(plain.json(), {"plain": "ATTACKATDAWN"})
+
+    def test_invalid_mode(self):
+        response = self.client.post("/encrypt", json={"text": "HELLO", "mode": "enigma"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Invalid mode")
+
+    def test_ndjson_batch_spanning_chunks(self):
+        items = [{"text": f"MESSAGE {i}", "mode": "vigenere", "key": "GHOST"} for i in range(600)]
+        items[3] = {"text": "HELLO", "mode": "enigma"}
+        body = "\n".join(json.dumps(item) for item in items) + "\n{not json"
+        response = self.client.post("/encrypt/batch", content=body,
+                                    headers={"Content-Type": "application/x-ndjson"})
+        results = ndjson(response.text)
+        self.assertEqual([r["index"] for r in results], list(range(601)))
+        self.assertEqual(results[3]["error"], "Invalid mode")
+        self.assertEqual(results[600]["error"], "Malformed item")
+        self.assertEqual(results[599]["cipher"], VigenereCipher().encrypt("MESSAGE", "GHOST"))
+
+    def test_ndjson_lines_split_across_small_chunks(self):
+        body = "".join(json.dumps({"text": f"MESSAGE {i}", "key": "GHOST"}) + "\n" for i in range(50)).encode()
+        pieces = (body[i:i + 7] for i in range(0, len(body), 7))
+        response = self.client.post("/encrypt/batch", content=pieces,
+                                    headers={"Content-Type": "application/x-ndjson"})
+        results = ndjson(response.text)
+        self.assertEqual([r["index"] for r in results], list(range(50)))
+        self.assertNotIn("error", results[49])
+
+    def test_overlong_ndjson_line_is_413(self):
+        headers = {"Content-Type": "application/x-ndjson"}
+        with mock.patch.object(asgi_app, "MAX_NDJSON_LINE", 100):
+            response = self.client.post("/encrypt/batch", content=(b"A" * 60 for _ in range(3)),
+                                        headers=headers)
+            self.assertEqual(response.status_code, 413)
+
+            line = json.dumps({"text": "HI", "key": "KEY"}) + "\n"
+            body = (line * asgi_app.BATCH_CHUNK + "B" * 200).encode()
+            response = self.client.post("/encrypt/batch", content=body, headers=headers)
+            results = ndjson(response.text)
+        self.assertEqual(len(results), asgi_app.BATCH_CHUNK + 1)
+        self.assertIn("exceeds", results[-1]["error"])
+
+    def test_non_string_fields_are_malformed(self):
+        body = "\n".join(json.dumps(item) for item in [{"text": 5}, {"text": "HELLO", "key": "KEY"}])
+        response = self.client.post("/encrypt/batch", content=body,
+                                    headers={"Content-Type": "application/x-ndjson"})
+        results = ndjson(response.text)
+        self.assertEqual(results[0]["error"], "Malformed item")
+        self.assertEqual(results[1]["cipher"], "RIJVS")
+        response = self.client.post("/encrypt", json={"text": "HELLO", "key": 7})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_rejects_non_array_body(self):
+        response = self.client.post("/encrypt/batch", json={"text": "HELLO"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_saturated_pool_returns_503(self):
+        app.state.cipher_pool = WorkerPool("test", 1, 0)
+        response = self.client.post("/encrypt", json={"text": "HELLO", "key": "KEY"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+    def test_metrics_endpoint(self):
+        self.client.post("/encrypt", json={"text": "HELLO", "mode": "vigenere", "key": "KEY"})
+        text = self.client.get("/metrics").text
+        self.assertIn('ciphersafe_http_requests_total{route="/encrypt",method="POST",status="200"}', text)
+
+    def test_bad_stego_images_are_400(self):
+        cover = BytesIO()
+        Image.new("RGB", (64, 64)).save(cover, "PNG")
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            response = self.client.post("/stego/decode", files={"image": ("bomb.png", cover.getvalue())})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/stego/decode", files={"image": ("junk.png", b"not an image")})
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_page(self):
+        response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/static/style.css', response.text)
+
+
+class TestAsgiFileEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app).__enter__()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = use_services(WebServices(data_dir=self.tmp.name))
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        use_services(self.previous).close()
+        self.tmp.cleanup()
+
+    def test_vigenere_file_round_trip(self):
+        document = ("Dear diary,\nthe drop at pier 4 went as planned.\n" * 2000).encode()
+        chunks = (document[i:i + 1000] for i in range(0, len(document), 1000))
+        sealed = self.client.post("/encrypt/file?mode=vigenere", content=chunks,
+                                  headers={"X-Cipher-Key": "STEALTH"})
+        self.assertEqual(sealed.status_code, 200)
+        self.assertEqual(len(sealed.content), len(document))
+        opened = self.client.post("/decrypt/file?mode=vigenere", content=sealed.content,
+                                  headers={"X-Cipher-Key": "STEALTH"})
+        self.assertEqual(opened.content, document.upper())
+
+    def test_file_key_error_is_400(self):
+        response = self.client.post("/encrypt/file?mode=vigenere", content=b"HELLO")
+        self.assertEqual(response.status_code, 400)
+
+    def test_vernam_file_uses_byte_pad(self):
+        services().pads.create_pad("uploads", 20000, kind="bytes")
+        document = os.urandom(5000)
+        sealed = self.client.post("/encrypt/file?mode=vernam", content=document)
+        self.assertEqual(sealed.headers["X-Pad-Id"], "uploads")
+        query = f"mode=vernam&pad_id=uploads&offset={sealed.headers['X-Pad-Offset']}"
+        opened = self.client.post(f"/decrypt/file?{query}", content=sealed.content)
+        self.assertEqual(opened.content, document)
+        again = self.client.post(f"/decrypt/file?{query}", content=sealed.content)
+        self.assertEqual(again.status_code, 409)
+
+    def test_vernam_message_opens_once(self):
+        sealed = self.client.post("/encrypt", json={"text": "ONCE ONLY", "mode": "vernam"}).json()
+        request = {"text": sealed["cipher"], "mode": "vernam", "key": sealed["key"]}
+        self.assertEqual(self.client.post("/decrypt", json=request).json(), {"plain": "ONCEONLY"})
+        self.assertEqual(self.client.post("/decrypt", json=request).status_code, 409)
+
+    def test_vernam_file_without_pad(self):
+        response = self.client.post("/encrypt/file?mode=vernam", content=b"X" * 10)
+        self.assertEqual(response.status_code, 503)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
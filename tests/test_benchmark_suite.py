@@ -0,0 +1,61 @@
+"""
+Test Suite: Benchmark Suite
+Checks case naming and the baseline regression check.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.suite import SCENARIOS, DEFAULT_BASELINE, case_name, compare, main, measure, MB
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_case_names(self):
+        scenarios = {s.name: s for s in SCENARIOS}
+        self.assertEqual(case_name(scenarios["vernam-bytes"], 1024), "vernam-bytes[1KB]")
+        self.assertEqual(case_name(scenarios["vernam-bytes"], 100 * MB), "vernam-bytes[100MB]")
+        self.assertEqual(case_name(scenarios["stego-encode"], 0.1), "stego-encode[0.1MP]")
+        self.assertEqual(case_name(scenarios["vault-load"], 1_000_000), "vault-load[1M]")
+
+    def test_compare_flags_slowdowns_and_memory_growth(self):
+        baseline = {"a": {"throughput": 100.0, "peak_mb": 10.0, "unit": "MB/s"},
+                    "b": {"throughput": 100.0, "peak_mb": 10.0, "unit": "MB/s"},
+                    "c": {"throughput": 100.0, "peak_mb": 0.1, "unit": "MB/s"}}
+        results = {"a": {"throughput": 85.0, "peak_mb": 11.0, "unit": "MB/s"},
+                   "b": {"throughput": 70.0, "peak_mb": 20.0, "unit": "MB/s"},
+                   "c": {"throughput": 100.0, "peak_mb": 0.5, "unit": "MB/s"},
+                   "new": {"throughput": 1.0, "peak_mb": 1.0, "unit": "MB/s"}}
+        regressions = compare(results, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(line.startswith("b:") for line in regressions))
+
+    def test_measure_reports_throughput(self):
+        result = measure(lambda: bytearray(2 * MB), 2.0, repeat=2)
+        self.assertGreater(result["throughput"], 0)
+        self.assertGreaterEqual(result["peak_mb"], 2.0)
+
+    def test_default_run_compares_with_committed_baseline(self):
+        with open(DEFAULT_BASELINE) as f:
+            baseline = json.load(f)
+        self.assertIn("vernam-bytes[1KB]", baseline["results"])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = os.path.join(tmp, "run.json")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                main(["--only", "vernam-bytes[1KB]", "--repeat", "1", "--threshold", "100",
+                      "--save", saved])
+            self.assertIn("Compared 1 case(s) with", out.getvalue())
+            with open(saved) as f:
+                self.assertEqual(list(json.load(f)["results"]), ["vernam-bytes[1KB]"])
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(main(["--only", "vernam-bytes[1KB]", "--repeat", "1", "--no-compare"]), [])
+            self.assertNotIn("Compared", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
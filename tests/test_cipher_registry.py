@@ -0,0 +1,82 @@
+"""
+Test Suite: Cipher Registry
+Covers name resolution, lazy loading and capability dispatch.
+"""
+
+import unittest
+from ciphers.registry import CipherRegistry, registry, BATCH, BYTES, KEYGEN, ONE_TIME_PAD, STREAMING
+from ciphers.vigenere import VigenereCipher
+from ciphers.vernam import VernamCipher
+
+class TestCipherRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CipherRegistry()
+        self.registry.register("vigenere", "src.ciphers.vigenere:VigenereCipher",
+                               label="Vigenère", aliases=("vigenère",))
+
+    def test_resolves_labels_and_aliases(self):
+        self.assertEqual(registry.resolve("Vigenère"), "vigenere")
+        self.assertEqual(registry.resolve("Vernam OTP"), "vernam")
+        self.assertEqual(registry.resolve("AES"), "aes-gcm")
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            registry.resolve("enigma")
+
+    def test_lazy_cached_singleton(self):
+        self.assertEqual(self.registry.loaded(), [])
+        first = self.registry.get("VIGENERE")
+        self.assertIs(first, self.registry.get("Vigenère"))
+        self.assertEqual(self.registry.loaded(), ["vigenere"])
+
+    def test_declared_capabilities(self):
+        self.assertTrue(registry.supports("vernam", ONE_TIME_PAD))
+        self.assertTrue(registry.supports("aes-gcm", STREAMING))
+        self.assertIn(BYTES, registry.capabilities("aes-gcm"))
+        self.assertFalse(registry.supports("vigenere", KEYGEN))
+
+    def test_rejects_non_cipher_targets(self):
+        self.registry.register("bogus", "collections:OrderedDict")
+        with self.assertRaises(TypeError):
+            self.registry.get("bogus")
+
+    def test_uniform_encrypt_message(self):
+        for name in registry.names():
+            cipher = registry.get(name)
+            key = None if registry.supports(name, KEYGEN) else "GHOST"
+            ciphertext, used_key = cipher.encrypt_message("MEETATNOON", key)
+            self.assertEqual(cipher.decrypt(ciphertext, used_key), "MEETATNOON")
+
+
+class TestBatchAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.messages = [f"MESSAGE NUMBER {i} FROM THE FIELD" for i in range(40)]
+
+    def test_all_ciphers_declare_batch(self):
+        for name in registry.names():
+            self.assertTrue(registry.supports(name, BATCH))
+
+    def test_in_process_shared_key(self):
+        cipher = VigenereCipher()
+        results = cipher.encrypt_many(self.messages, "GHOST")
+        self.assertEqual(results[3], (cipher.encrypt(self.messages[3], "GHOST"), "GHOST"))
+        plain = cipher.decrypt_many([c for c, _ in results], "GHOST")
+        self.assertEqual(plain, [cipher._prepare_text(m) for m in self.messages])
+
+    def test_process_pool_keeps_order(self):
+        cipher = VernamCipher()
+        cipher.PARALLEL_MIN_ITEMS = 4
+        sealed = cipher.encrypt_many(self.messages, max_workers=2, chunk_size=7)
+        ciphertexts, keys = zip(*sealed)
+        self.assertEqual(len(set(keys)), len(keys))
+        plain = cipher.decrypt_many(ciphertexts, keys, max_workers=2, chunk_size=5)
+        self.assertEqual(plain, [cipher._prepare_text(m) for m in self.messages])
+
+    def test_key_count_mismatch(self):
+        with self.assertRaises(ValueError):
+            VigenereCipher().decrypt_many(["ABC", "DEF"], ["KEY"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
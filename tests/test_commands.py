@@ -0,0 +1,151 @@
+"""
+Test Suite: Scripting Commands
+Runs the non-interactive subcommands against a throwaway data directory.
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from PIL import Image
+from src.key_management.pad_manager import PadFileManager
+from src.ui import commands
+
+class TestCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name, content=None):
+        path = os.path.join(self.dir, name)
+        if content is not None:
+            with open(path, "wb" if isinstance(content, bytes) else "w") as f:
+                f.write(content)
+        return path
+
+    def run_command(self, *argv):
+        """Run one subcommand; returns (exit status, stdout records, stderr records)."""
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            status = commands.main(["--data-dir", self.dir, *argv])
+        parse = lambda text: [json.loads(line) for line in text.splitlines() if line]
+        return status, parse(out.getvalue()), parse(err.getvalue())
+
+    def test_line_encrypt_then_ndjson_decrypt(self):
+        source = self.path("messages.txt", "MEET AT DAWN\n\nABORT\n")
+        sealed = self.path("sealed.ndjson")
+        status, _, _ = self.run_command("encrypt", "-k", "LEMON", "-i", source, "-o", sealed)
+        self.assertEqual(status, 0)
+
+        # encrypt's output lines feed straight back into decrypt
+        status, plain, _ = self.run_command("decrypt", "--ndjson", "-i", sealed)
+        self.assertEqual(status, 0)
+        self.assertEqual([r["plain"] for r in plain], ["MEETATDAWN", "ABORT"])
+
+    def test_failed_items_set_exit_status(self):
+        source = self.path("items.ndjson", "\n".join([
+            json.dumps({"text": "HELLO", "key": "KEY"}),
+            "{not json",
+            json.dumps({"text": "HELLO", "mode": "enigma"}),
+            json.dumps({"text": 5, "key": "KEY"}),
+        ]))
+        status, results, _ = self.run_command("encrypt", "--ndjson", "-i", source)
+        self.assertEqual(status, 1)
+        self.assertEqual(results[0]["cipher"], "RIJVS")
+        self.assertEqual(results[1]["error"], "Malformed item")
+        self.assertEqual(results[2]["error"], "Invalid mode")
+        self.assertEqual(results[3]["error"], "Malformed item")
+
+    def test_one_time_pads_open_once(self):
+        source = self.path("messages.txt", "PAD ME\n")
+        sealed = self.path("sealed.ndjson")
+        self.run_command("encrypt", "-m", "vernam", "-i", source, "-o", sealed)
+        status, plain, _ = self.run_command("decrypt", "--ndjson", "-m", "vernam", "-i", sealed)
+        self.assertEqual((status, plain[0]["plain"]), (0, "PADME"))
+        status, again, _ = self.run_command("decrypt", "--ndjson", "-m", "vernam", "-i", sealed)
+        self.assertEqual(status, 1)
+        self.assertIn("error", again[0])
+
+    def test_raw_stream_round_trip(self):
+        data = os.urandom(200_000)
+        source, sealed, opened = self.path("blob", data), self.path("blob.enc"), self.path("blob.out")
+        status, meta, _ = self.run_command("encrypt", "--raw", "-m", "aes-gcm", "-i", source, "-o", sealed)
+        self.assertEqual((status, meta[0]["bytes"]), (0, os.path.getsize(sealed)))
+        status, _, _ = self.run_command("decrypt", "--raw", "-m", "aes-gcm", "-k", meta[0]["key"],
+                                        "-i", sealed, "-o", opened)
+        with open(opened, "rb") as f:
+            self.assertEqual((status, f.read()), (0, data))
+
+        status, _, errors = self.run_command("decrypt", "--raw", "-m", "aes-gcm", "-k", meta[0]["key"],
+                                             "-i", source, "-o", opened)
+        self.assertEqual((status, errors[0]["status"]), (1, 400))
+
+    def test_raw_vernam_uses_byte_pads(self):
+        pads = PadFileManager(os.path.join(self.dir, "pads/"))
+        pads.create_pad("BYTES", 1 << 16, kind="bytes")
+        pads.close()
+        data = os.urandom(5000)
+        source, sealed, opened = self.path("blob", data), self.path("blob.v"), self.path("blob.out")
+        status, meta, _ = self.run_command("encrypt", "--raw", "-m", "vernam", "-i", source, "-o", sealed)
+        self.assertEqual(status, 0)
+        self.assertEqual((meta[0]["pad_id"], meta[0]["pad_length"]), ("BYTES", len(data)))
+        pad_args = ("--pad-id", "BYTES", "--pad-offset", str(meta[0]["pad_offset"]))
+        self.run_command("decrypt", "--raw", "-m", "vernam", *pad_args, "-i", sealed, "-o", opened)
+        with open(opened, "rb") as f:
+            self.assertEqual(f.read(), data)
+        status, _, errors = self.run_command("decrypt", "--raw", "-m", "vernam", *pad_args,
+                                             "-i", sealed, "-o", opened)
+        self.assertEqual((status, errors[0]["status"]), (1, 409))
+
+    def test_pads_create_and_list(self):
+        status, created, _ = self.run_command("pads-create", "UPLOADS", "64K", "--kind", "bytes")
+        self.assertEqual((status, created[0]["size"]), (0, 65536))
+        self.run_command("pads-create", "DIARY", "4096")
+        status, _, errors = self.run_command("pads-create", "DIARY", "16")
+        self.assertEqual((status, len(errors)), (1, 1))
+
+        source = self.path("blob", os.urandom(1000))
+        status, meta, _ = self.run_command("encrypt", "--raw", "-m", "vernam", "-i", source,
+                                           "-o", self.path("blob.v"))
+        self.assertEqual((status, meta[0]["pad_id"]), (0, "UPLOADS"))
+        status, pads, _ = self.run_command("pads-list")
+        self.assertEqual([(p["pad_id"], p["kind"], p["remaining"]) for p in pads],
+                         [("DIARY", "letters", 4096), ("UPLOADS", "bytes", 64536)])
+
+    def test_stego_embed_and_extract(self):
+        cover = self.path("cover.png")
+        Image.new("RGB", (64, 64), (90, 120, 200)).save(cover)
+        payload, stego = self.path("payload", b"secret payload"), self.path("stego.png")
+        status, summary, _ = self.run_command("stego-embed", "--cover", cover, "-i", payload, "-o", stego)
+        self.assertEqual((status, summary[0]["payload_bytes"]), (0, 14))
+
+        status, found, _ = self.run_command("stego-extract", stego, "--json")
+        self.assertEqual(found, [{"message": "secret payload", "bytes": 14}])
+        status, _, errors = self.run_command("stego-extract", cover)
+        self.assertEqual((status, errors[0]["error"]), (1, "No hidden message found."))
+
+    def test_vault_export_hides_keys(self):
+        source = self.path("messages.txt", "FIRST\nSECOND\n")
+        self.run_command("encrypt", "-m", "vernam", "-i", source, "-o", self.path("sealed.ndjson"))
+        status, entries, _ = self.run_command("vault-export", "--status", "encrypted")
+        self.assertEqual((status, len(entries)), (0, 2))
+        self.assertNotIn("key_used", entries[0])
+        _, entries, _ = self.run_command("vault-export", "--include-keys")
+        self.assertIn("key_used", entries[0])
+        _, entries, _ = self.run_command("vault-export", "--status", "decrypted")
+        self.assertEqual(entries, [])
+
+    def test_keys_provision(self):
+        status, summary, _ = self.run_command("keys-provision", "otp", "5", "--length", "16")
+        self.assertEqual((status, summary[0]["count"]), (0, 5))
+        _, keys, _ = self.run_command("keys-provision", "vigenere", "3", "--emit-keys")
+        self.assertEqual(len({k["key"] for k in keys}), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Test Suite: Diary Vault
+Covers logging, one-time updates and migration of the JSON vault.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from diary.message import Message
+from diary.vault import DiaryVault
+
+class TestDiaryVault(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.vault = DiaryVault(os.path.join(self.tmp.name, "diary_vault.db"))
+
+    def tearDown(self):
+        self.vault.close()
+        self.tmp.cleanup()
+
+    def test_entries_keep_insertion_order(self):
+        ids = [self.vault.add_entry("ZOE", "MISATO", "Vigenère", text, key_used="STEALTH")
+               for text in ("ALPHA", "BRAVO", "CHARLIE")]
+        self.assertEqual([e["id"] for e in self.vault.list_all()], ids)
+        self.assertEqual(self.vault.get_entry(ids[1])["ciphertext"], "BRAVO")
+
+    def test_update_only_from_expected_status(self):
+        msg_id = self.vault.add_entry("ZOE", "MISATO", "Vernam", "XKZFP")
+        self.assertTrue(self.vault.update_entry(msg_id, "HELLO", expect_status="encrypted"))
+        self.assertFalse(self.vault.update_entry(msg_id, "AGAIN", expect_status="encrypted"))
+        entry = self.vault.get_entry(msg_id)
+        self.assertEqual((entry["status"], entry["plaintext"]), ("decrypted", "HELLO"))
+        self.assertEqual(self.vault.list_encrypted_only(), [])
+
+    def test_returned_entries_are_copies(self):
+        pad_ref = {"pad_id": "DEMO", "offset": 0, "length": 5}
+        msg_id = self.vault.add_messages([Message("ZOE", "MISATO", "Vernam", "XKZFP", pad_ref=pad_ref)])[0]
+        entry = self.vault.get_entry(msg_id)
+        entry["status"] = "decrypted"
+        entry["pad_ref"]["offset"] = 99
+        self.vault.list_all()[0]["ciphertext"] = "CHANGED"
+        self.assertEqual(self.vault.get_entry(msg_id)["status"], "encrypted")
+        self.assertEqual(self.vault.get_entry(msg_id)["pad_ref"], pad_ref)
+        self.assertEqual(self.vault.list_all()[0]["ciphertext"], "XKZFP")
+
+    def test_updates_seen_by_other_instances(self):
+        msg_id = self.vault.add_entry("ZOE", "MISATO", "Vernam", "XKZFP")
+        other = DiaryVault(self.vault.vault_path)
+        self.assertTrue(other.update_entry(msg_id, "HELLO", expect_status="encrypted"))
+        other.close()
+        self.assertFalse(self.vault.update_entry(msg_id, "HELLO", expect_status="encrypted"))
+
+    def test_migrates_legacy_json_vault(self):
+        legacy = os.path.join(self.tmp.name, "old", "diary_vault.json")
+        os.makedirs(os.path.dirname(legacy))
+        entries = [Message("ZOE", "MISATO", "Vigenère", "XKZFP", key_used="STEALTH").to_dict(),
+                   Message("ZOE", "HQ", "Vernam", "QWERT", "HELLO").to_dict()]
+        with open(legacy, "w") as f:
+            json.dump({"version": "1.0", "messages": entries}, f)
+        migrated = DiaryVault(legacy)
+        self.assertEqual(migrated.list_all(), entries)
+        self.assertTrue(migrated.vault_path.endswith("diary_vault.db"))
+        self.assertFalse(os.path.exists(legacy))
+        migrated.close()
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,68 @@
+"""
+Test Suite: Dictionary Attack
+Checks keyword discovery, early termination and checkpoint resume.
+"""
+
+import os
+import random
+import string
+import tempfile
+import unittest
+from ciphers.vigenere import VigenereCipher
+from ciphers.dictionary_attack import DictionaryAttack
+
+PLAINTEXT = ("The courier will cross the river at dawn and headquarters must confirm "
+             "the extraction route before midnight so that every agent in the field "
+             "knows which safehouse remains open after the storm passes tonight") * 3
+
+def decoy_words(count, seed=11):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+            for _ in range(count)]
+
+class TestDictionaryAttack(unittest.TestCase):
+
+    def setUp(self):
+        self.ciphertext = VigenereCipher().encrypt(PLAINTEXT, "STEALTH")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmp.name, "audit.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_finds_keyword_in_process(self):
+        words = decoy_words(3000) + ["stealth"] + decoy_words(3000, seed=12)
+        report = DictionaryAttack(self.ciphertext, batch_size=500, max_workers=1).run(words)
+        self.assertTrue(report["found"])
+        self.assertEqual(report["key"], "STEALTH")
+        self.assertLess(report["tested"], len(words))  # stopped early
+
+    def test_finds_keyword_with_process_pool(self):
+        words = decoy_words(4000) + ["Stealth"]
+        report = DictionaryAttack(self.ciphertext, batch_size=512, max_workers=2).run(words)
+        self.assertEqual(report["key"], "STEALTH")
+
+    def test_not_found_reports_best_guesses(self):
+        report = DictionaryAttack(self.ciphertext, max_workers=1, top=3).run(decoy_words(1000))
+        self.assertFalse(report["found"])
+        self.assertIsNone(report["key"])
+        self.assertEqual(len(report["top"]), 3)
+        self.assertEqual(report["tested"], 1000)
+
+    def test_resume_from_checkpoint(self):
+        first = decoy_words(2000)
+        attack = DictionaryAttack(self.ciphertext, batch_size=256, max_workers=1)
+        self.assertEqual(attack.run(first, checkpoint_path=self.checkpoint)["tested"], 2000)
+
+        report = attack.run(first + ["stealth"], checkpoint_path=self.checkpoint)
+        self.assertEqual(report["resumed_from"], 2000)
+        self.assertEqual(report["key"], "STEALTH")
+
+    def test_checkpoint_for_other_ciphertext_rejected(self):
+        DictionaryAttack(self.ciphertext, max_workers=1).run(["alpha"], checkpoint_path=self.checkpoint)
+        other = DictionaryAttack(VigenereCipher().encrypt(PLAINTEXT, "GHOST"), max_workers=1)
+        with self.assertRaises(ValueError):
+            other.run(["ghost"], checkpoint_path=self.checkpoint)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
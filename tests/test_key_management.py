@@ -8,6 +8,8 @@ import os
 from key_management.key_generator import KeyGenerator
 from key_management.otp_manager import OTPKeyManager
 from key_management.key_storage import KeyStorage
+from key_management.provision import provision_keys
+from key_management.pad_manager import PadFileManager
 
 class TestKeyManagement(unittest.TestCase):
 
@@ -36,10 +38,200 @@ class TestKeyManagement(unittest.TestCase):
         keys = self.storage.load_keys("vigenere")
         self.assertIn("E1", keys)
 
+    def test_key_exists_uses_index(self):
+        self.storage.save_key("otp", "M1", "QWERTYUIOP")
+        self.assertTrue(self.storage.key_exists("otp", "QWERTYUIOP"))
+        self.assertFalse(self.storage.key_exists("vigenere", "QWERTYUIOP"))
+        self.assertEqual(self.storage.find_key_id("otp", "QWERTYUIOP"), "M1")
+
+    def test_overwriting_key_id_updates_index(self):
+        self.storage.save_key("vigenere", "E1", "SECRET")
+        self.storage.save_key("vigenere", "E1", "GHOST")
+        self.assertFalse(self.storage.key_exists("vigenere", "SECRET"))
+        self.assertTrue(self.storage.key_exists("vigenere", "GHOST"))
+        self.assertEqual(len(self.storage.load_keys("vigenere")), 1)
+
+    def test_save_key_rejects_value_of_another_id(self):
+        self.storage.save_key("vigenere", "A", "XKEY")
+        with self.assertRaises(ValueError):
+            self.storage.save_key("vigenere", "B", "XKEY")
+        self.storage.save_key("vigenere", "A", "XKEY")  # re-saving the same id is fine
+        self.assertEqual(self.storage.find_key_id("vigenere", "XKEY"), "A")
+
+    def test_legacy_shared_value_keeps_first_id(self):
+        """Legacy files may hold one value under two ids; only the first survives."""
+        import json
+        legacy_dir = "data/keys_test/shared/"
+        os.makedirs(legacy_dir, exist_ok=True)
+        with open(os.path.join(legacy_dir, "shared_keys.json"), "w") as f:
+            json.dump({"keys": {"A": {"key_value": "XKEY"}, "B": {"key_value": "XKEY"}}}, f)
+        storage = KeyStorage(storage_path=legacy_dir)
+        self.assertEqual(storage.find_key_id("vigenere", "XKEY"), "A")
+        self.assertEqual(list(storage.load_keys("vigenere")), ["A"])
+        storage.close()
+
+    def test_saves_from_other_processes_are_seen(self):
+        """Another worker's saves are found and its values refused, despite a stale index."""
+        self.storage.key_exists("otp", "PRIMED")  # build this instance's index first
+        other = KeyStorage(storage_path="data/keys_test/")
+        other.save_key("otp", "W2", "FROMWORKERTWO")
+        other.close()
+        self.assertTrue(self.storage.key_exists("otp", "FROMWORKERTWO"))
+        self.assertTrue(OTPKeyManager(key_storage=self.storage).is_key_used("FROMWORKERTWO"))
+        other = KeyStorage(storage_path="data/keys_test/")
+        other.save_many("otp", {"W3": "ALSOFROMTWO"})
+        other.close()
+        with self.assertRaises(ValueError):
+            self.storage.save_many("otp", {"W4": "FRESHVALUE", "W5": "ALSOFROMTWO"})
+        self.assertFalse(self.storage.key_exists("otp", "FRESHVALUE"))
+
+    def test_keys_persist_across_instances(self):
+        self.storage.save_key("otp", "M2", "ASDFGHJKL")
+        reopened = KeyStorage(storage_path="data/keys_test/")
+        self.assertTrue(reopened.key_exists("otp", "ASDFGHJKL"))
+        reopened.close()
+
+    def test_claim_key_refuses_duplicates(self):
+        self.assertTrue(self.storage.claim_key("otp", "M3", "ZXCVBNM"))
+        self.assertFalse(self.storage.claim_key("otp", "M4", "ZXCVBNM"))
+        self.assertEqual(self.storage.find_key_id("otp", "ZXCVBNM"), "M3")
+
+    def test_otp_manager_with_storage_remembers_keys(self):
+        manager = OTPKeyManager(key_storage=self.storage)
+        self.assertTrue(manager.mark_key_used("LKJHGFDSA"))
+        self.assertFalse(manager.mark_key_used("LKJHGFDSA"))
+        reopened = KeyStorage(storage_path="data/keys_test/")
+        self.assertTrue(OTPKeyManager(key_storage=reopened).is_key_used("LKJHGFDSA"))
+        reopened.close()
+
+    def test_migrates_legacy_json_files(self):
+        import json
+        legacy_dir = "data/keys_test/legacy/"
+        os.makedirs(legacy_dir, exist_ok=True)
+        with open(os.path.join(legacy_dir, "shared_keys.json"), "w") as f:
+            json.dump({"version": "1.0", "keys": {
+                "EP1": {"key_value": "STEALTH", "timestamp": "2024-01-01T00:00:00Z"}}}, f)
+        migrated = KeyStorage(storage_path=legacy_dir)
+        self.assertTrue(migrated.key_exists("vigenere", "STEALTH"))
+        self.assertEqual(migrated.load_keys("vigenere")["EP1"]["timestamp"], "2024-01-01T00:00:00Z")
+        self.assertFalse(os.path.exists(os.path.join(legacy_dir, "shared_keys.json")))
+        migrated.close()
+
+    def test_generate_many_unique_keys(self):
+        keys = self.key_gen.generate_many("otp", 500, 16)
+        self.assertEqual(len(set(keys)), 500)
+        self.assertTrue(all(len(k) == 16 and k.isalpha() and k.isupper() for k in keys))
+
+    def test_generate_many_exhausts_short_keyspace(self):
+        """With only 26 possible 1-letter keys, all of them must be issued once."""
+        keys = self.key_gen.generate_many("vigenere", 26, 1)
+        self.assertEqual(sorted(keys), [chr(c) for c in range(ord('A'), ord('Z') + 1)])
+
+    def test_generate_many_gives_up_when_everything_is_excluded(self):
+        with self.assertRaises(ValueError):
+            self.key_gen.generate_many("vigenere", 30, 2, exclude=lambda key: key[0] != "Q")
+        with self.assertRaises(ValueError):
+            self.key_gen.generate_many("vigenere", 1, 3, exclude=lambda key: True)
+
+    def test_save_many_rejects_duplicates_atomically(self):
+        self.storage.save_key("vigenere", "E1", "SECRET")
+        with self.assertRaises(ValueError):
+            self.storage.save_many("vigenere", {"B1": "ALPHA", "B2": "SECRET"})
+        self.assertFalse(self.storage.key_exists("vigenere", "ALPHA"))
+        self.assertEqual(self.storage.save_many("vigenere", [("B1", "ALPHA"), ("B2", "BRAVO")]), 2)
+
+    def test_provision_keys(self):
+        keys = provision_keys(self.storage, "otp", 200, 32)
+        self.assertEqual(len(keys), 200)
+        stored = self.storage.load_keys("otp")
+        self.assertEqual(len(stored), 200)
+        for key_id, value in keys.items():
+            self.assertEqual(stored[key_id]["key_value"], value)
+
     def tearDown(self):
         # Clean up test directory
         import shutil
+        self.storage.close()
         shutil.rmtree("data/keys_test/", ignore_errors=True)
 
+class TestPadFileManager(unittest.TestCase):
+
+    def setUp(self):
+        self.pads = PadFileManager(pad_dir="data/pads_test/")
+        self.pads.create_pad("P1", 4096, chunk_size=1000)
+
+    def test_created_pad_is_letters(self):
+        key = self.pads.read_key(("P1", 0, 4096))
+        self.assertEqual(len(key), 4096)
+        self.assertTrue(key.isalpha() and key.isupper())
+
+    def test_allocations_never_overlap(self):
+        first = self.pads.allocate("P1", 100)
+        second = self.pads.allocate("P1", 50)
+        self.assertEqual((first.offset, second.offset), (0, 100))
+        self.assertEqual(self.pads.remaining("P1"), 4096 - 150)
+
+    def test_cursor_persists_across_instances(self):
+        self.pads.allocate("P1", 1000)
+        reopened = PadFileManager(pad_dir="data/pads_test/")
+        self.assertEqual(reopened.allocate("P1", 10).offset, 1000)
+
+    def test_exhausted_pad_raises(self):
+        self.pads.allocate("P1", 4000)
+        with self.assertRaises(ValueError):
+            self.pads.allocate("P1", 97)
+
+    def test_pad_ids_stay_inside_pad_directory(self):
+        for pad_id in ("../escape", "a/b", "..", ""):
+            with self.assertRaises(ValueError):
+                self.pads.create_pad(pad_id, 16)
+        with self.assertRaises(ValueError):
+            self.pads.read(("../P1", 0, 4))
+        self.assertFalse(self.pads.is_allocated(("../P1", 0, 4)))
+
+    def test_is_allocated_only_below_cursor(self):
+        self.assertFalse(self.pads.is_allocated(("P1", 0, 10)))
+        self.pads.allocate("P1", 100)
+        self.assertTrue(self.pads.is_allocated(("P1", 0, 100)))
+        self.assertTrue(self.pads.is_allocated(("P1", 40, 10)))
+        self.assertFalse(self.pads.is_allocated(("P1", 90, 20)))
+        self.assertFalse(self.pads.is_allocated(("P1", -5, 10)))
+        self.assertFalse(self.pads.is_allocated(("P1", 10, 0)))
+
+    def test_read_material_outlives_close(self):
+        material = self.pads.read(("P1", 10, 20))
+        self.pads.close()
+        self.assertEqual(material, self.pads.read(("P1", 10, 20)))
+        self.pads.close()
+
+    def test_allocate_any_skips_full_and_other_kinds(self):
+        self.pads.create_pad("B1", 64, kind="bytes")
+        self.pads.create_pad("P2", 4096)
+        self.pads.allocate("P1", 4000)
+        self.assertEqual(self.pads.allocate_any(200), ("P2", 0, 200))
+        self.assertEqual(self.pads.allocate_any(64, kind="bytes"), ("B1", 0, 64))
+        self.assertIsNone(self.pads.allocate_any(1, kind="bytes"))
+
+    def test_concurrent_allocate_any_never_fails_or_overlaps(self):
+        from concurrent.futures import ThreadPoolExecutor
+        managers = [PadFileManager(pad_dir="data/pads_test/") for _ in range(8)]
+        with ThreadPoolExecutor(8) as pool:
+            segments = list(pool.map(lambda m: [m.allocate_any(100) for _ in range(5)], managers))
+        offsets = sorted(s.offset for batch in segments for s in batch)
+        self.assertEqual(offsets, list(range(0, 4000, 100)))
+        for manager in managers:
+            manager.close()
+
+    def test_otp_manager_uses_pad_segments(self):
+        manager = OTPKeyManager(pad_manager=self.pads)
+        segment, key = manager.reserve_pad_key(12)
+        self.assertEqual(segment.pad_id, "P1")
+        self.assertEqual(manager.pad_key(segment._asdict()), key)
+
+    def tearDown(self):
+        import shutil
+        self.pads.close()
+        shutil.rmtree("data/pads_test/", ignore_errors=True)
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
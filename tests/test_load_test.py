@@ -0,0 +1,34 @@
+"""
+Test Suite: Load Test Harness
+Checks the workload mix parsing and a short in-process run.
+"""
+
+import unittest
+from benchmarks.load_test import Workload, parse_mix, run
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("vigenere:3,vernam"), [("vigenere", 3.0), ("vernam", 1.0)])
+        self.assertEqual(parse_mix("64:2,1024:1", int), [(64, 2.0), (1024, 1.0)])
+        with self.assertRaises(ValueError):
+            parse_mix("64:0", int)
+        with self.assertRaises(ValueError):
+            parse_mix("big", int)
+
+    def test_workload_only_picks_configured_requests(self):
+        workload = Workload([("vigenere", 1), ("aes", 1)], [(10, 1), (100, 1)])
+        kinds = {workload.next()[0] for _ in range(200)}
+        self.assertEqual(kinds, {("vigenere", 10), ("vigenere", 100), ("aes-gcm", 10), ("aes-gcm", 100)})
+
+    def test_test_client_run_reports_latency(self):
+        workload = Workload([("vigenere", 1), ("vernam", 1)], [(32, 1)])
+        result = run("test-client", workload, concurrency=2, duration=0.3, warmup=0)
+        self.assertGreater(result["requests"], 0)
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(set(result["statuses"]), {"200"})
+        self.assertEqual(set(result["by_mode"]), {"vigenere", "vernam"})
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
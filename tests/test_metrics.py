@@ -0,0 +1,120 @@
+"""
+Test Suite: Metrics
+Checks histogram bucketing, Prometheus rendering and cross-process merging.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from telemetry.metrics import MetricsRegistry, RETIRED_SNAPSHOT, timed_iter
+
+def exited_pid():
+    """Pid of a child process that has already exited."""
+    child = subprocess.Popen([sys.executable, "-c", ""])
+    child.wait()
+    return child.pid
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry(multiprocess_dir=None)
+        latency = registry.histogram("op_seconds", "Op time.", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, op="encrypt")
+        text = registry.render()
+        self.assertIn('op_seconds_bucket{op="encrypt",le="0.1"} 1', text)
+        self.assertIn('op_seconds_bucket{op="encrypt",le="1.0"} 3', text)
+        self.assertIn('op_seconds_bucket{op="encrypt",le="+Inf"} 4', text)
+        self.assertIn('op_seconds_count{op="encrypt"} 4', text)
+        self.assertIn("# TYPE op_seconds histogram", text)
+
+    def test_counter_label_escaping(self):
+        registry = MetricsRegistry(multiprocess_dir=None)
+        counter = registry.counter("hits_total", "Hits.", ("route",))
+        counter.inc(route='/say "hi"')
+        counter.inc(2, route='/say "hi"')
+        self.assertIn('hits_total{route="/say \\"hi\\""} 3', registry.render())
+
+    def test_wrong_labels_rejected(self):
+        counter = MetricsRegistry(multiprocess_dir=None).counter("c_total", "C.", ("mode",))
+        with self.assertRaises(ValueError):
+            counter.inc(route="/")
+
+    def test_snapshots_from_other_workers_are_merged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            worker = MetricsRegistry(multiprocess_dir=tmp)
+            worker.counter("req_total", "Requests.", ("route",)).inc(5, route="/encrypt")
+            worker.flush(force=True)
+            # Pretend the snapshot came from another process
+            os.replace(worker._snapshot_path(), os.path.join(tmp, "1-a.json"))
+
+            scraper = MetricsRegistry(multiprocess_dir=tmp)
+            scraper.counter("req_total", "Requests.", ("route",)).inc(2, route="/encrypt")
+            self.assertIn('req_total{route="/encrypt"} 7', scraper.render())
+
+    def test_recycled_pid_keeps_predecessor_totals(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Two workers that (like a recycled worker) share this pid
+            for count in (5, 3):
+                worker = MetricsRegistry(multiprocess_dir=tmp)
+                worker.counter("req_total", "Requests.", ("route",)).inc(count, route="/encrypt")
+                worker.flush(force=True)
+
+            scraper = MetricsRegistry(multiprocess_dir=tmp)
+            scraper.counter("req_total", "Requests.", ("route",))
+            self.assertIn('req_total{route="/encrypt"} 8', scraper.render())
+
+    def test_exit_flush_ignores_flush_interval(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            worker = MetricsRegistry(multiprocess_dir=tmp, flush_interval=3600)
+            requests = worker.counter("req_total", "Requests.", ("route",))
+            requests.inc(route="/encrypt")
+            worker.flush()
+            requests.inc(4, route="/encrypt")
+            worker.flush()  # within the interval: skipped
+            worker._flush_at_exit()
+
+            scraper = MetricsRegistry(multiprocess_dir=tmp)
+            scraper.counter("req_total", "Requests.", ("route",))
+            self.assertIn('req_total{route="/encrypt"} 5', scraper.render())
+
+    def test_exited_workers_are_folded_into_one_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for count in (5, 3):
+                worker = MetricsRegistry(multiprocess_dir=tmp)
+                worker.counter("req_total", "Requests.", ("route",)).inc(count, route="/encrypt")
+                worker.flush(force=True)
+                os.replace(worker._snapshot_path(), os.path.join(tmp, f"{exited_pid()}-{count}.json"))
+
+            scraper = MetricsRegistry(multiprocess_dir=tmp)
+            scraper.counter("req_total", "Requests.", ("route",)).inc(route="/encrypt")
+            for _ in range(2):
+                self.assertIn('req_total{route="/encrypt"} 9', scraper.render())
+            self.assertEqual(sorted(f for f in os.listdir(tmp) if f.endswith(".json")),
+                             [RETIRED_SNAPSHOT])
+
+    def test_snapshot_left_by_interrupted_compaction_counts_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            name = f"{exited_pid()}-a.json"
+            snapshot = {"req_total": [[["/encrypt"], 4]]}
+            with open(os.path.join(tmp, name), "w") as f:
+                json.dump(snapshot, f)
+            with open(os.path.join(tmp, RETIRED_SNAPSHOT), "w") as f:
+                json.dump({"metrics": snapshot, "folded": [name]}, f)
+
+            scraper = MetricsRegistry(multiprocess_dir=tmp)
+            scraper.counter("req_total", "Requests.", ("route",))
+            self.assertIn('req_total{route="/encrypt"} 4', scraper.render())
+            self.assertFalse(os.path.exists(os.path.join(tmp, name)))
+
+    def test_timed_iter_observes_once(self):
+        registry = MetricsRegistry(multiprocess_dir=None)
+        seconds = registry.histogram("stream_seconds", "Stream time.", ("mode",))
+        self.assertEqual(list(timed_iter(iter([b"a", b"b"]), seconds, mode="x")), [b"a", b"b"])
+        self.assertIn('stream_seconds_count{mode="x"} 1', registry.render())
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,32 @@
+"""
+Test Suite: Text Normalization
+Checks translate-based sanitizing and layout round trips.
+"""
+
+import unittest
+from ciphers.normalize import normalize, normalize_bytes, normalize_with_layout, restore_layout
+
+class TestNormalize(unittest.TestCase):
+
+    def test_matches_legacy_filter_on_ascii(self):
+        text = "Hello, Agent 47! Meet @ dawn_ok?"
+        legacy = ''.join(c.upper() for c in text if c.isalpha())
+        self.assertEqual(normalize(text), legacy)
+        self.assertEqual(normalize_bytes(text.encode()), legacy.encode())
+
+    def test_non_ascii_letters_dropped(self):
+        self.assertEqual(normalize("Vigenère ✓"), "VIGENRE")
+        self.assertEqual(normalize(""), "")
+
+    def test_layout_round_trip(self):
+        text = "  Meet, at 9 -- pier!"
+        letters, layout = normalize_with_layout(text)
+        self.assertEqual(letters, "MEETATPIER")
+        self.assertEqual(layout[0], (0, "  "))
+        self.assertEqual(restore_layout(letters, layout), text.upper())
+
+    def test_letters_only_has_empty_layout(self):
+        self.assertEqual(normalize_with_layout("abc"), ("ABC", []))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,66 @@
+"""
+Test Suite: Profiling
+Checks that spans are free when disabled and that operations, spans,
+prompt time and allocations end up in the report.
+"""
+
+import builtins
+import time
+import unittest
+from telemetry.profiling import Profiler, span
+
+class Engine:
+
+    @span("test", "engine.work")
+    def work(self, n):
+        return [i * i for i in range(n)]
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = Profiler()
+        self.input = builtins.input
+
+    def tearDown(self):
+        self.profiler.stop()
+        builtins.input = self.input
+
+    def test_span_is_the_plain_function_when_disabled(self):
+        self.assertFalse(hasattr(Engine.work, "__wrapped__"))
+        self.profiler.start(cpu=False, memory=False)
+        self.assertTrue(hasattr(Engine.work, "__wrapped__"))
+        self.profiler.stop()
+        self.assertFalse(hasattr(Engine.work, "__wrapped__"))
+
+    def test_operations_and_spans_are_reported(self):
+        self.profiler.start(cpu=True, memory=True)
+        with self.profiler.operation("crunch"):
+            Engine().work(50_000)
+            Engine().work(10)
+        self.profiler.stop()
+        calls, total, waiting, spans, peak = self.profiler.operations["crunch"]
+        self.assertEqual(calls, 1)
+        self.assertEqual(self.profiler.spans["test.engine.work"][0], 2)
+        self.assertLessEqual(spans, total)
+        self.assertGreater(peak, 0)
+        report = self.profiler.report()
+        for section in ("crunch", "test.engine.work", "Top functions", "Memory kept"):
+            self.assertIn(section, report)
+
+    def test_prompt_time_is_not_work(self):
+        self.profiler.start(cpu=True, memory=False)
+        self.profiler._input = lambda *args: time.sleep(0.05) or "y"
+        with self.profiler.operation("ask"):
+            self.assertEqual(input("Continue? "), "y")
+        self.profiler.stop()
+        calls, total, waiting, spans, peak = self.profiler.operations["ask"]
+        self.assertGreaterEqual(waiting, 0.05)
+        self.assertNotIn("sleep", self.profiler.report())
+
+    def test_operation_is_a_no_op_when_disabled(self):
+        with self.profiler.operation("idle"):
+            pass
+        self.assertEqual(self.profiler.operations, {})
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
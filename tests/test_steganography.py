@@ -5,18 +5,24 @@ Validates text encoding and decoding within images.
 
 import unittest
 import os
+import tempfile
+import zlib
+from io import BytesIO
 from steganography.lsb_stego import LSBSteganography
+from steganography.multi_stego import MultiImageSteganography
+from steganography.steganalysis import Steganalyzer
+from steganography.image_cache import PixelCache
 from PIL import Image
+import numpy as np
 
 class TestLSBSteganography(unittest.TestCase):
 
     def setUp(self):
         """Prepare base test image and steganography instance."""
         self.stego = LSBSteganography()
-        self.input_path = "assets/images/test_input.png"
-        self.output_path = "assets/stego_output/test_output.png"
-        os.makedirs("assets/images/", exist_ok=True)
-        os.makedirs("assets/stego_output/", exist_ok=True)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, "test_input.png")
+        self.output_path = os.path.join(self.tmp.name, "test_output.png")
 
         # Create small sample image
         Image.new("RGB", (100, 100), color="white").save(self.input_path, "PNG")
@@ -39,10 +45,199 @@ class TestLSBSteganography(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.stego.encode(self.input_path, self.output_path, large_text)
 
+    def test_encode_and_decode_bytes(self):
+        """Round-trip through the in-memory API without writing files."""
+        with open(self.input_path, "rb") as f:
+            cover = f.read()
+        stego_png = self.stego.encode_bytes(cover, "NO DISK NEEDED")
+        self.assertIsInstance(stego_png, bytes)
+        self.assertEqual(self.stego.decode_bytes(BytesIO(stego_png)), "NO DISK NEEDED")
+
+    def test_bytes_matches_path_encoding(self):
+        """Path and in-memory encoders produce identical pixels."""
+        self.stego.encode(self.input_path, self.output_path, "SAME BITS")
+        with open(self.input_path, "rb") as f:
+            stego_png = self.stego.encode_bytes(f, "SAME BITS")
+        from_path = Image.open(self.output_path)
+        from_bytes = Image.open(BytesIO(stego_png))
+        self.assertEqual(from_path.tobytes(), from_bytes.tobytes())
+
+    def test_unicode_round_trip(self):
+        """Characters above U+00FF survive via UTF-8 payloads."""
+        secret = "AGENT ZOË → 東京 ✓"
+        self.stego.encode(self.input_path, self.output_path, secret)
+        self.assertEqual(self.stego.decode(self.output_path), secret)
+
+    def test_binary_payload_round_trip(self):
+        payload = bytes(range(256)) + b"#####"
+        self.stego.encode(self.input_path, self.output_path, payload)
+        self.assertEqual(self.stego.decode(self.output_path, raw=True), payload)
+
+    def test_compressed_payload_exceeds_raw_capacity(self):
+        """zlib compression lets repetitive payloads beyond raw capacity fit."""
+        capacity = self.stego.estimate_capacity(self.input_path)
+        secret = "MEETATMIDNIGHT" * (capacity // 7)
+        self.assertGreater(len(secret), capacity)
+        self.stego.encode(self.input_path, self.output_path, secret, compress=True)
+        self.assertEqual(self.stego.decode(self.output_path), secret)
+
+    def test_decompression_bomb_is_refused(self):
+        """A compressed frame may not inflate past the decoder's limit."""
+        self.stego.encode(self.input_path, self.output_path, b"\0" * 300_000, compress=True)
+        small = LSBSteganography(cache=PixelCache(), max_inflated=100_000)
+        self.assertIsNone(small.decode(self.output_path, raw=True))
+        self.assertEqual(len(self.stego.decode(self.output_path, raw=True)), 300_000)
+
+    def test_repeated_embeds_reuse_decoded_cover(self):
+        cache = PixelCache()
+        stego = LSBSteganography(cache=cache)
+        stego.encode(self.input_path, self.output_path, "FIRST")
+        stego.encode(self.input_path, self.output_path, "SECOND")
+        stego.estimate_capacity(self.input_path)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(stego.decode(self.output_path), "SECOND")
+
+    def test_cache_reloads_modified_cover(self):
+        cache = PixelCache()
+        stego = LSBSteganography(cache=cache)
+        self.assertEqual(stego.estimate_capacity(self.input_path), 3750 - stego.HEADER.size)
+        cache.get(self.input_path)
+        Image.new("RGB", (20, 10), color="black").save(self.input_path, "PNG")
+        self.assertEqual(cache.get(self.input_path).shape, (10, 20, 3))
+        self.assertEqual(cache.misses, 2)
+
+    def test_cache_respects_byte_budget(self):
+        cache = PixelCache(max_bytes=100 * 100 * 3 + 10)
+        second = os.path.join(self.tmp.name, "second.png")
+        Image.new("RGB", (100, 100), color="red").save(second, "PNG")
+        cache.get(self.input_path)
+        cache.get(second)
+        self.assertEqual(cache.current_bytes, 100 * 100 * 3)
+        self.assertIsNone(cache.peek_shape(self.input_path))
+
     def tearDown(self):
         """Remove temp files."""
-        import shutil
-        shutil.rmtree("assets/", ignore_errors=True)
+        self.tmp.cleanup()
+
+class TestMultiImageSteganography(unittest.TestCase):
+
+    def setUp(self):
+        """Prepare three small covers that are individually too small."""
+        self.multi = MultiImageSteganography(max_workers=3)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.covers = []
+        self.outputs = []
+        for i, size in enumerate([(40, 40), (60, 30), (50, 50)]):
+            path = os.path.join(self.tmp.name, f"cover_{i}.png")
+            Image.new("RGB", size, color="gray").save(path, "PNG")
+            self.covers.append(path)
+            self.outputs.append(os.path.join(self.tmp.name, f"part_{i}.png"))
+
+    def test_split_and_reassemble_out_of_order(self):
+        secret = os.urandom(1500)
+        capacity = LSBSteganography().estimate_capacity(self.covers[2])
+        self.assertGreater(len(secret), capacity)
+        self.multi.encode(self.covers, self.outputs, secret)
+        decoded = self.multi.decode(list(reversed(self.outputs)), raw=True)
+        self.assertEqual(decoded, secret)
+
+    def test_bytes_mode_with_compression(self):
+        covers = []
+        for path in self.covers:
+            with open(path, "rb") as f:
+                covers.append(f.read())
+        secret = "EXTRACTION AT DAWN " * 400
+        stego_images = self.multi.encode_bytes(covers, secret, compress=True)
+        self.assertEqual(self.multi.decode(stego_images[::-1]), secret)
+
+    def test_file_like_covers_read_once(self):
+        covers = [open(path, "rb") for path in self.covers]
+        try:
+            stego_images = self.multi.encode_bytes(covers, "X" * 1200)
+        finally:
+            for f in covers:
+                f.close()
+        self.assertEqual(self.multi.decode(stego_images), "X" * 1200)
+
+    def test_forged_fragment_headers_rejected(self):
+        fragments = self.multi.split_payload(b"SECRET" * 10, [30, 30])
+        header = MultiImageSteganography.FRAGMENT
+        message_id, _, _, flags, crc = header.unpack_from(fragments[1])
+        chunk = fragments[1][header.size:]
+        stray = header.pack(message_id, 7, 2, flags, crc) + chunk
+        with self.assertRaises(ValueError):
+            self.multi.join_fragments([fragments[0], fragments[1], stray])
+        empty = header.pack(message_id, 0, 0, 0, zlib.crc32(b""))
+        with self.assertRaises(ValueError):
+            self.multi.join_fragments([empty])
+
+    def test_fragment_bomb_is_refused(self):
+        self.multi.stego.max_inflated = 1000
+        fragments = self.multi.split_payload(bytes(5000), [500], compress=True)
+        with self.assertRaises(ValueError):
+            self.multi.join_fragments(fragments)
+
+    def test_missing_fragment_detected(self):
+        self.multi.encode(self.covers, self.outputs, "X" * 1200)
+        with self.assertRaises(ValueError):
+            self.multi.decode(self.outputs[:2])
+
+    def test_corrupted_fragment_detected(self):
+        fragments = self.multi.split_payload(b"SECRET" * 10, [30, 30])
+        tampered = bytearray(fragments[1])
+        tampered[-1] ^= 0xFF
+        with self.assertRaises(ValueError):
+            self.multi.join_fragments([fragments[0], bytes(tampered)])
+
+    def test_total_capacity_exceeded(self):
+        with self.assertRaises(ValueError):
+            self.multi.encode(self.covers, self.outputs, "X" * 999999)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+class TestSteganalysis(unittest.TestCase):
+
+    def setUp(self):
+        """Build a smooth, noisy cover whose LSBs are all clear."""
+        self.analyzer = Steganalyzer(max_workers=2)
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(7)
+        y, x = np.mgrid[0:120, 0:120]
+        base = (x * 0.8 + y * 0.6)[..., None] + np.array([10, 40, 70]) + rng.normal(0, 6, (120, 120, 3))
+        self.cover = os.path.join(self.tmp.name, "cover.png")
+        self.stego_path = os.path.join(self.tmp.name, "stego.png")
+        Image.fromarray(np.clip(base, 0, 254).astype(np.uint8) & 0xFE).save(self.cover, "PNG")
+
+        stego = LSBSteganography()
+        stego.encode(self.cover, self.stego_path, rng.bytes(stego.estimate_capacity(self.cover)))
+
+    def test_clean_cover_scores_low(self):
+        report = self.analyzer.analyze(self.cover)
+        self.assertLess(report["detection_probability"], 0.5)
+        self.assertLess(report["rs_probability"], 0.5)
+
+    def test_full_embedding_detected(self):
+        report = self.analyzer.analyze(self.stego_path)
+        self.assertGreater(report["chi_square"], 0.9)
+        self.assertGreater(report["rs_rate"], 0.1)
+        self.assertEqual(report["estimated_fraction"], 1.0)
+        self.assertGreater(report["rs_probability"], 0.9)
+
+    def test_rs_rate_mapped_to_probability(self):
+        rates = [0.0, 0.02, Steganalyzer.RS_THRESHOLD, 0.1, 0.5, 1.0]
+        probabilities = [Steganalyzer.rs_probability(rate) for rate in rates]
+        self.assertEqual(probabilities, sorted(probabilities))
+        self.assertTrue(all(0.0 <= p <= 1.0 for p in probabilities))
+        self.assertAlmostEqual(probabilities[2], 0.5)
+
+    def test_scan_directory_ranks_stego_first(self):
+        reports = self.analyzer.scan_directory(self.tmp.name)
+        self.assertEqual(len(reports), 2)
+        self.assertTrue(reports[0]["path"].endswith("stego.png"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
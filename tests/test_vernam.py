@@ -5,6 +5,7 @@ Ensures that encryption/decryption works perfectly and keys are truly random.
 
 import unittest
 from ciphers.vernam import VernamCipher, OTPKeyManager
+from ciphers.compressed_vernam import CompressedVernamPipeline
 
 class TestVernamCipher(unittest.TestCase):
 
@@ -36,5 +37,132 @@ class TestVernamCipher(unittest.TestCase):
         otp_key = self.cipher.generate_otp(length)
         self.assertEqual(len(otp_key), length)
 
+    def test_known_answer_and_letter_spread(self):
+        ciphertext, _ = self.cipher.encrypt("HELLO", "XMCKL")
+        self.assertEqual(ciphertext, "EQNVZ")
+        self.assertEqual(self.cipher.decrypt("EQNVZ", "XMCKL"), "HELLO")
+        key = self.cipher.generate_otp(26 * 400)
+        self.assertEqual(set(key), set(self.cipher.alphabet))
+        self.assertLess(max(key.count(c) for c in set(key)), 600)
+
+    def test_decrypt_range_matches_full_decrypt(self):
+        plaintext = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 20
+        ciphertext, key = self.cipher.encrypt(plaintext)
+        window = self.cipher.decrypt_range(ciphertext, key.encode("ascii"), 137, 42)
+        self.assertEqual(window, plaintext[137:179])
+
+    def test_decrypt_range_key_too_short(self):
+        ciphertext, key = self.cipher.encrypt("ATTACKATDAWN")
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt_range(ciphertext, key[:5], 3, 6)
+
+    def test_decrypt_file_range_with_pad_offset(self):
+        import os
+        import tempfile
+        plaintext = "RECORD" * 500
+        pad = self.cipher.generate_otp(100 + len(plaintext))
+        ciphertext, _ = self.cipher.encrypt(plaintext, pad[100:])
+        with tempfile.TemporaryDirectory() as tmp:
+            ct_path = os.path.join(tmp, "intercept.txt")
+            pad_path = os.path.join(tmp, "shared.pad")
+            with open(ct_path, "w") as f:
+                f.write(ciphertext)
+            with open(pad_path, "w") as f:
+                f.write(pad)
+            window = self.cipher.decrypt_file_range(ct_path, pad_path, 1200, 18, key_offset=100)
+        self.assertEqual(window, plaintext[1200:1218])
+
+    def test_preserve_format_round_trip(self):
+        text = "Drop site: pier 4, 02:00."
+        ciphertext, key = self.cipher.encrypt(text, preserve_format=True)
+        self.assertEqual(len(ciphertext), len(text))
+        self.assertEqual(self.cipher.decrypt(ciphertext, key, preserve_format=True), text.upper())
+
+    def test_byte_mode_round_trip(self):
+        data = bytes(range(256)) * 3
+        ciphertext, pad = self.cipher.encrypt_bytes(data)
+        self.assertNotEqual(ciphertext, data)
+        self.assertEqual(self.cipher.decrypt_bytes(ciphertext, pad), data)
+
+
+class TestCompressedVernamPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = CompressedVernamPipeline()
+        self.entry = ("Dear diary, the drop at the old station went as planned. "
+                      "MISATO confirmed the package is safe. ") * 10
+
+    def test_round_trip_saves_pad(self):
+        frame, key, report = self.pipeline.encrypt(self.entry)
+        self.assertEqual(self.pipeline.decrypt_text(frame, key), self.entry)
+        self.assertLess(report["pad_bytes_used"], report["original_bytes"] // 2)
+        self.assertEqual(len(key), report["pad_bytes_used"])
+
+    def test_auto_never_expands_short_messages(self):
+        frame, key, report = self.pipeline.encrypt("HI")
+        self.assertEqual(report["codec"], "none")
+        self.assertEqual(report["pad_bytes_used"], 2)
+        self.assertEqual(self.pipeline.decrypt(frame, key), b"HI")
+
+    def test_explicit_codecs(self):
+        for codec in ("zlib", "lzma", "none"):
+            pipeline = CompressedVernamPipeline(codec=codec)
+            frame, key, report = pipeline.encrypt(self.entry)
+            self.assertEqual(report["codec"], codec)
+            self.assertEqual(pipeline.decrypt_text(frame, key), self.entry)
+
+    def test_wrong_pad_detected(self):
+        frame, key, _ = self.pipeline.encrypt(self.entry)
+        with self.assertRaises(ValueError):
+            self.pipeline.decrypt(frame, bytes(len(key)))
+
+    def test_inflation_bounded_by_header_length(self):
+        """A frame claiming a short original may not inflate beyond it."""
+        for codec in ("zlib", "lzma"):
+            pipeline = CompressedVernamPipeline(codec=codec)
+            frame, key, _ = pipeline.encrypt(b"\0" * 1_000_000)
+            forged = frame[:3] + (10).to_bytes(8, "big") + frame[11:]
+            with self.assertRaises(ValueError):
+                pipeline.decrypt(forged, key)
+            self.assertEqual(len(pipeline.decrypt(frame, key)), 1_000_000)
+
+    def test_segment_key_without_pad_manager(self):
+        from key_management.pad_manager import PadSegment
+        with self.assertRaises(ValueError):
+            self.pipeline.encrypt(self.entry, pad=PadSegment("P", 0, 16))
+        frame, _, _ = self.pipeline.encrypt(self.entry)
+        with self.assertRaises(ValueError):
+            self.pipeline.decrypt(frame, {"pad_id": "P", "offset": 0, "length": 16})
+
+    def test_pad_file_segments(self):
+        import tempfile
+        from key_management.pad_manager import PadFileManager
+        with tempfile.TemporaryDirectory() as tmp:
+            pads = PadFileManager(pad_dir=tmp)
+            pads.create_pad("BULK", 4096, kind="bytes")
+            pipeline = CompressedVernamPipeline(pad_manager=pads)
+            frame, segment, report = pipeline.encrypt(self.entry)
+            self.assertEqual(segment.length, report["pad_bytes_used"])
+            self.assertEqual(pipeline.decrypt_text(frame, segment._asdict()), self.entry)
+            pads.close()
+
+    def test_diary_entries_use_byte_pads(self):
+        import tempfile
+        from key_management.pad_manager import PadFileManager
+        with tempfile.TemporaryDirectory() as pad_dir:
+            pads = PadFileManager(pad_dir)
+            pipeline = CompressedVernamPipeline(pad_manager=pads)
+            with self.assertRaises(ValueError):
+                pipeline.seal_entry(self.entry)
+            pads.create_pad("DIARY", 4096, kind="bytes")
+            pads.create_pad("LETTERS", 64)
+            ciphertext, segment, report = pipeline.seal_entry(self.entry)
+            self.assertEqual(pads.remaining("DIARY"), 4096 - report["pad_bytes_used"])
+            self.assertLess(report["pad_bytes_used"], len(self.entry) // 2)
+            self.assertTrue(pipeline.sealed_entry(segment._asdict()))
+            self.assertFalse(pipeline.sealed_entry({"pad_id": "LETTERS", "offset": 0, "length": 8}))
+            self.assertEqual(pipeline.open_entry(ciphertext, segment._asdict()), self.entry)
+            pads.close()
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -41,5 +41,29 @@ class TestVigenereCipher(unittest.TestCase):
         decrypted = self.cipher.decrypt(encrypted, key)
         self.assertEqual(decrypted, text)
 
+    def test_non_letters_stripped(self):
+        self.assertEqual(self.cipher.encrypt("attack at dawn!", self.keyword),
+                         self.cipher.encrypt("ATTACKATDAWN", self.keyword))
+
+    def test_preserve_format_round_trip(self):
+        text = "Meet me at 9pm, by the old pier."
+        encrypted = self.cipher.encrypt(text, self.keyword, preserve_format=True)
+        self.assertEqual(encrypted[4], " ")
+        self.assertEqual(encrypted.replace(" ", "").replace(",", "").replace(".", "")
+                         .replace("9", ""), self.cipher.encrypt(text, self.keyword))
+        self.assertEqual(self.cipher.decrypt(encrypted, self.keyword, preserve_format=True),
+                         text.upper())
+
+    def test_keyword_longer_than_text(self):
+        self.assertEqual(self.cipher.encrypt("AB", "LEMON"), "LF")
+
+    def test_stream_matches_format_preserving_encrypt(self):
+        text = "Meet me at 9pm, by the old pier. Bring the ledger!"
+        chunks = [text[i:i + 7].encode() for i in range(0, len(text), 7)]
+        sealed = b"".join(self.cipher.encrypt_iter(chunks, self.keyword))
+        self.assertEqual(sealed.decode(), self.cipher.encrypt(text, self.keyword, preserve_format=True))
+        opened = b"".join(self.cipher.decrypt_iter([sealed[:5], sealed[5:]], self.keyword))
+        self.assertEqual(opened.decode(), text.upper())
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
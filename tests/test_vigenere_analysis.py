@@ -0,0 +1,54 @@
+"""
+Test Suite: Vigenère Cryptanalysis
+Checks key-length estimation and key recovery without the keyword.
+"""
+
+import random
+import unittest
+from ciphers.vigenere import VigenereCipher
+from ciphers.vigenere_analysis import VigenereAnalyzer
+
+WORDS = ("agent zoe reports that the courier will cross the river at dawn "
+         "headquarters must confirm the extraction route before midnight "
+         "and every message after this one moves to a one time pad").split()
+
+def english_text(words, seed=7):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+class TestVigenereAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.cipher = VigenereCipher()
+        self.analyzer = VigenereAnalyzer()
+
+    def test_recovers_demo_keyword(self):
+        ciphertext = self.cipher.encrypt(english_text(600), "STEALTH")
+        report = self.analyzer.analyze(ciphertext)
+        self.assertEqual(report["key"], "STEALTH")
+        self.assertEqual(report["key_length"], 7)
+
+    def test_ioc_separates_english_from_ciphertext(self):
+        ciphertext = self.cipher.encrypt(english_text(600), "LEMON")
+        self.assertGreater(self.analyzer.index_of_coincidence(ciphertext, 5), 0.06)
+        self.assertLess(self.analyzer.index_of_coincidence(ciphertext, 3), 0.05)
+
+    def test_kasiski_favours_key_length(self):
+        ciphertext = self.cipher.encrypt(english_text(600), "LEMON")
+        shares = self.analyzer.kasiski(ciphertext)
+        self.assertGreater(shares[5], shares[3])
+        self.assertGreater(shares[5], shares[7])
+
+    def test_parallel_periods_match_in_process(self):
+        ciphertext = self.cipher.encrypt(english_text(400), "GHOST")
+        serial = VigenereAnalyzer(max_key_length=8, max_workers=1).score_periods(ciphertext)
+        parallel = VigenereAnalyzer(max_key_length=8, max_workers=2)
+        parallel.PARALLEL_MIN_WORK = 0
+        self.assertEqual(parallel.score_periods(ciphertext), serial)
+
+    def test_no_letters_rejected(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze("1234 !!")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
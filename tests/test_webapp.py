@@ -0,0 +1,218 @@
+"""
+Test Suite: Web Application
+Exercises the JSON and NDJSON HTTP endpoints through Flask's test client.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+from PIL import Image
+import webapp
+from webapp import app
+from src.key_management.pad_manager import PadFileManager
+from src.web.services import WebServices, use_services, services
+
+def ndjson(lines):
+    return [json.loads(line) for line in lines.splitlines() if line]
+
+class TempServices:
+    """Point the web app at a throwaway data directory."""
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = use_services(WebServices(data_dir=self.tmp.name))
+
+    def tearDown(self):
+        use_services(self.previous).close()
+        self.tmp.cleanup()
+
+class TestBatchEndpoints(TempServices, unittest.TestCase):
+
+    def test_json_array_round_trip(self):
+        items = [{"text": f"MESSAGE {i}", "mode": "vigenere", "key": "GHOST"} for i in range(5)]
+        items.append({"text": "PAD ME", "mode": "vernam"})
+        response = self.client.post("/encrypt/batch", json=items)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        sealed = ndjson(response.get_data(as_text=True))
+        self.assertEqual([r["index"] for r in sealed], list(range(6)))
+
+        back = [{"text": r["cipher"], "mode": i["mode"], "key": r["key"]}
+                for r, i in zip(sealed, items)]
+        plain = ndjson(self.client.post("/decrypt/batch", json=back).get_data(as_text=True))
+        self.assertEqual(plain[2]["plain"], "MESSAGE")
+        self.assertEqual(plain[5]["plain"], "PADME")
+
+    def test_ndjson_body_with_bad_items(self):
+        body = "\n".join([
+            json.dumps({"text": "HELLO", "mode": "vigenere", "key": "KEY"}),
+            "{not json",
+            json.dumps({"text": "HELLO", "mode": "enigma"}),
+            json.dumps({"text": "HELLO", "mode": "vigenere", "key": ""}),
+        ])
+        response = self.client.post("/encrypt/batch", data=body,
+                                    content_type="application/x-ndjson")
+        results = ndjson(response.get_data(as_text=True))
+        self.assertEqual(results[0]["cipher"], "RIJVS")
+        self.assertEqual(results[1]["error"], "Malformed item")
+        self.assertEqual(results[2]["error"], "Invalid mode")
+        self.assertIn("error", results[3])
+
+    def test_metrics_endpoint(self):
+        self.client.post("/encrypt", json={"text": "HELLO", "mode": "vigenere", "key": "KEY"})
+        text = self.client.get("/metrics").get_data(as_text=True)
+        self.assertIn('ciphersafe_http_requests_total{route="/encrypt",method="POST",status="200"}', text)
+        self.assertIn('ciphersafe_cipher_duration_seconds_count{mode="vigenere",operation="encrypt"}', text)
+
+    def test_rejects_non_array_body(self):
+        response = self.client.post("/encrypt/batch", json={"text": "HELLO"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_string_fields_are_malformed(self):
+        items = [{"text": 5, "key": "KEY"}, {"text": "HELLO", "key": ["KEY"]},
+                 {"text": "HELLO", "key": "KEY"}]
+        results = ndjson(self.client.post("/encrypt/batch", json=items).get_data(as_text=True))
+        self.assertEqual([r.get("error") for r in results], ["Malformed item", "Malformed item", None])
+        self.assertEqual(results[2]["cipher"], "RIJVS")
+
+        response = self.client.post("/encrypt", json={"text": 5, "key": "KEY"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/decrypt", json=["not", "an", "object"])
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_stego_images_are_400(self):
+        cover = BytesIO()
+        Image.new("RGB", (64, 64)).save(cover, "PNG")
+        with mock.patch.object(Image, "MAX_IMAGE_PIXELS", 100):
+            response = self.client.post("/stego/decode", data={"image": (BytesIO(cover.getvalue()), "bomb.png")})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.get_json())
+        response = self.client.post("/stego/encode", data={"image": (BytesIO(b"not an image"), "junk.png"),
+                                                           "text": "HI"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestOneTimePads(TempServices, unittest.TestCase):
+
+    def test_vernam_message_is_logged_and_opens_once(self):
+        sealed = self.client.post("/encrypt", json={"text": "BURN AFTER READING", "mode": "vernam"}).get_json()
+        entry = services().vault.get_entry(sealed["id"])
+        self.assertEqual(entry["ciphertext"], sealed["cipher"])
+        self.assertTrue(services().otp.is_key_used(sealed["key"]))
+
+        request = {"text": sealed["cipher"], "mode": "vernam", "key": sealed["key"]}
+        opened = self.client.post("/decrypt", json=request)
+        self.assertEqual(opened.get_json(), {"plain": "BURNAFTERREADING"})
+        self.assertEqual(services().vault.get_entry(sealed["id"])["status"], "decrypted")
+        self.assertEqual(self.client.post("/decrypt", json=request).status_code, 409)
+
+    def test_unknown_pad_is_rejected(self):
+        response = self.client.post("/decrypt", json={"text": "ABCDE", "mode": "vernam", "key": "QWERT"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_reuse_of_a_pad(self):
+        sealed = self.client.post("/encrypt", json={"text": "ONCE", "mode": "vernam"}).get_json()
+        item = {"text": sealed["cipher"], "mode": "vernam", "key": sealed["key"]}
+        results = ndjson(self.client.post("/decrypt/batch", json=[item, item]).get_data(as_text=True))
+        self.assertEqual(results[0]["plain"], "ONCE")
+        self.assertIn("already used", results[1]["error"])
+
+    def test_failed_vault_write_releases_claims(self):
+        vault = services().vault
+        with mock.patch.object(vault, "add_messages", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                services().seal_one_time("vernam", ["FIRST", "SECOND"])
+        self.assertEqual(services().keys.load_keys("otp"), {})
+        sealed = services().seal_one_time("vernam", ["THIRD"])
+        self.assertEqual(vault.get_entry(sealed[0][2])["ciphertext"], sealed[0][0])
+
+
+class TestFileEndpoints(TempServices, unittest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.saved_chunk = webapp.UPLOAD_CHUNK
+        webapp.UPLOAD_CHUNK = 1000  # force many chunks
+
+    def tearDown(self):
+        webapp.UPLOAD_CHUNK = self.saved_chunk
+        super().tearDown()
+
+    def test_vigenere_file_round_trip(self):
+        document = ("Dear diary,\nthe drop at pier 4 went as planned.\n" * 200).encode()
+        sealed = self.client.post("/encrypt/file?mode=vigenere", data=document,
+                                  headers={"X-Cipher-Key": "STEALTH"})
+        self.assertEqual(sealed.status_code, 200)
+        self.assertEqual(len(sealed.data), len(document))
+        opened = self.client.post("/decrypt/file?mode=vigenere", data=sealed.data,
+                                  headers={"X-Cipher-Key": "STEALTH"})
+        self.assertEqual(opened.data, document.upper())
+
+    def test_vigenere_file_requires_key(self):
+        response = self.client.post("/encrypt/file?mode=vigenere", data=b"HELLO")
+        self.assertEqual(response.status_code, 400)
+
+    def test_vernam_file_uses_byte_pad(self):
+        services().pads.create_pad("uploads", 20000, kind="bytes")
+        document = os.urandom(5000)
+        sealed = self.client.post("/encrypt/file?mode=vernam", data=document)
+        self.assertEqual(sealed.headers["X-Pad-Id"], "uploads")
+        self.assertNotEqual(sealed.data, document)
+
+        query = f"mode=vernam&pad_id=uploads&offset={sealed.headers['X-Pad-Offset']}"
+        opened = self.client.post(f"/decrypt/file?{query}", data=sealed.data)
+        self.assertEqual(opened.data, document)
+        self.assertEqual(services().pads.remaining("uploads"), 15000)
+
+        again = self.client.post(f"/decrypt/file?{query}", data=sealed.data)
+        self.assertEqual(again.status_code, 409)
+        entry = services().vault.get_entry(sealed.headers["X-Message-Id"])
+        self.assertEqual(entry["status"], "decrypted")
+
+    def test_unissued_pad_ranges_are_refused(self):
+        pads = services().pads
+        pads.create_pad("uploads", 20000, kind="bytes")
+        query = "mode=vernam&pad_id=uploads&offset=0&length=64"
+        response = self.client.post(f"/decrypt/file?{query}", data=bytes(64))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(pads.remaining("uploads"), 20000)
+
+        # Consumed, but not through /encrypt/file
+        pads.allocate("uploads", 64)
+        response = self.client.post(f"/decrypt/file?{query}", data=bytes(64))
+        self.assertEqual(response.status_code, 400)
+
+    def test_pad_id_cannot_leave_pad_directory(self):
+        outside = PadFileManager(self.tmp.name)
+        outside.create_pad("other", 11, kind="bytes")
+        outside.allocate("other", 11)
+        secret = bytes(outside.read(("other", 0, 11)))
+        outside.close()
+        response = self.client.post("/decrypt/file?mode=vernam&pad_id=../other&offset=0&length=11",
+                                    data=bytes(11))
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn(secret, response.data)
+
+    def test_vernam_file_without_pad(self):
+        response = self.client.post("/encrypt/file?mode=vernam", data=b"X" * 10)
+        self.assertEqual(response.status_code, 503)
+
+    def test_aes_file_issues_key(self):
+        document = os.urandom(3000)
+        sealed = self.client.post("/encrypt/file?mode=aes-gcm", data=document)
+        key = sealed.headers["X-Cipher-Key"]
+        opened = self.client.post("/decrypt/file?mode=aes-gcm", data=sealed.data,
+                                  headers={"X-Cipher-Key": key})
+        self.assertEqual(opened.data, document)
+
+        forged = bytearray(sealed.data)
+        forged[4:8] = (0xFFFFFFF0).to_bytes(4, "big")
+        response = self.client.post("/decrypt/file?mode=aes-gcm", data=bytes(forged),
+                                    headers={"X-Cipher-Key": key})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -1,10 +1,44 @@
-from flask import Flask, render_template, request, jsonify
-from src.ciphers.vigenere import VigenereCipher
-from src.ciphers.vernam import VernamCipher
+import json
+import time
+from io import BytesIO
+from itertools import chain, islice
+
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, stream_with_context
+from src.steganography.lsb_stego import IMAGE_ERRORS, LSBSteganography
+from src.telemetry.metrics import metrics, HTTP_LATENCY, HTTP_REQUESTS, PAYLOAD_BYTES
+from src.web.errors import JobError
+from src.web.jobs import (decrypt_text, encrypt_text, open_decrypt_stream,
+                          open_encrypt_stream, parse_item, parse_items, run_chunk)
 
 app = Flask(__name__)
-vigenere = VigenereCipher()
-vernam = VernamCipher()
+stego = LSBSteganography()
+
+# Batch items handled per encrypt_many/decrypt_many call while streaming
+BATCH_CHUNK = 256
+# Bytes read from an upload per step of the file endpoints
+UPLOAD_CHUNK = 64 * 1024
+
+# ---------------------
+# Instrumentation
+# ---------------------
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    HTTP_LATENCY.observe(time.perf_counter() - g.started, route=route, method=request.method)
+    HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    if request.content_length is not None:
+        PAYLOAD_BYTES.observe(request.content_length, route=route)
+    metrics.flush()
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/')
 def home():
@@ -12,35 +46,158 @@ def home():
 
 @app.route('/encrypt', methods=['POST'])
 def encrypt():
-    data = request.json
-    text = data.get('text', '')
-    mode = data.get('mode', 'vigenere')
-    key = data.get('key', '')
-
-    if mode == 'vigenere':
-        result = vigenere.encrypt(text, key)
-    elif mode == 'vernam':
-        result, key = vernam.encrypt(text)
-    else:
-        return jsonify({'error': 'Invalid mode'}), 400
-
-    return jsonify({'cipher': result, 'key': key})
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    try:
+        result = encrypt_text(data.get('mode', 'vigenere'), data.get('text', ''), data.get('key', ''))
+    except JobError as exc:
+        return jsonify({'error': str(exc)}), exc.status
+    return jsonify(result)
 
 @app.route('/decrypt', methods=['POST'])
 def decrypt():
-    data = request.json
-    text = data.get('text', '')
-    mode = data.get('mode', 'vigenere')
-    key = data.get('key', '')
-
-    if mode == 'vigenere':
-        result = vigenere.decrypt(text, key)
-    elif mode == 'vernam':
-        result = vernam.decrypt(text, key)
-    else:
-        return jsonify({'error': 'Invalid mode'}), 400
-
-    return jsonify({'plain': result})
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    try:
+        result = decrypt_text(data.get('mode', 'vigenere'), data.get('text', ''), data.get('key', ''))
+    except JobError as exc:
+        return jsonify({'error': str(exc)}), exc.status
+    return jsonify(result)
+
+# ---------------------
+# Batch Endpoints
+# ---------------------
+
+def _batch_items():
+    """
+    Yield request items from a JSON array or an NDJSON body.
+
+    NDJSON is read line by line from the request stream, so the body is
+    never buffered whole. Malformed lines yield None.
+    """
+    if request.mimetype == 'application/x-ndjson':
+        for line in request.stream:
+            if line.strip():
+                yield parse_item(line)
+        return
+    yield from parse_items(request.get_data())
+
+def _stream_batch(operation):
+    """Stream NDJSON results for a batch request, chunk by chunk."""
+    items = _batch_items()
+    try:
+        # Pull the first item now so a bad body still gets a plain 400
+        first = list(islice(items, 1))
+    except JobError as exc:
+        return jsonify({'error': str(exc)}), exc.status
+
+    def generate():
+        numbered = enumerate(chain(first, items))
+        while True:
+            chunk = list(islice(numbered, BATCH_CHUNK))
+            if not chunk:
+                break
+            for result in run_chunk(operation, chunk):
+                yield json.dumps(result) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/encrypt/batch', methods=['POST'])
+def encrypt_batch():
+    return _stream_batch('encrypt')
+
+@app.route('/decrypt/batch', methods=['POST'])
+def decrypt_batch():
+    return _stream_batch('decrypt')
+
+# ---------------------
+# File Endpoints
+# ---------------------
+
+def _upload_chunks():
+    """Read the request body in UPLOAD_CHUNK pieces without buffering it."""
+    stream = request.stream
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK)
+        if not chunk:
+            break
+        yield chunk
+
+def _file_response(open_stream, filename):
+    """Stream cipher output as a download, or an error if it fails to start."""
+    try:
+        stream, headers = open_stream()
+        # Run the cipher up to its first output so key errors still get a plain 400
+        first = list(islice(stream, 1))
+    except JobError as exc:
+        return jsonify({'error': str(exc)}), exc.status
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return Response(stream_with_context(chain(first, stream)),
+                    mimetype='application/octet-stream', headers=headers)
+
+@app.route('/encrypt/file', methods=['POST'])
+def encrypt_file():
+    """
+    Encrypt an uploaded file, streaming it in and the ciphertext out.
+
+    The mode comes from the ``mode`` query parameter and the key from the
+    ``X-Cipher-Key`` header. Vernam consumes a shared byte pad and reports
+    the segment used in ``X-Pad-*`` headers (and its vault entry in
+    ``X-Message-Id``); only segments issued this way can be decrypted.
+    """
+    return _file_response(lambda: open_encrypt_stream(
+        request.args.get('mode', 'vigenere'), _upload_chunks(),
+        key=request.headers.get('X-Cipher-Key', ''), length=request.content_length),
+        'encrypted.bin')
+
+@app.route('/decrypt/file', methods=['POST'])
+def decrypt_file():
+    """
+    Decrypt an uploaded file produced by ``/encrypt/file``.
+
+    Vernam takes the pad reference as ``pad_id``, ``offset`` and optional
+    ``length`` query parameters; other modes take ``X-Cipher-Key``.
+    """
+    pad_ref = dict(request.args)
+    pad_ref.setdefault('length', request.content_length)
+    return _file_response(lambda: open_decrypt_stream(
+        request.args.get('mode', 'vigenere'), _upload_chunks(),
+        key=request.headers.get('X-Cipher-Key', ''), pad_ref=pad_ref),
+        'decrypted.bin')
+
+@app.route('/stego/encode', methods=['POST'])
+def stego_encode():
+    image = request.files.get('image')
+    text = request.form.get('text', '')
+    compress = request.form.get('compress', '').lower() in ('1', 'true', 'yes')
+    if image is None:
+        return jsonify({'error': 'Missing image upload'}), 400
+
+    try:
+        stego_png = stego.encode_bytes(image.stream, text, compress)
+    except IMAGE_ERRORS as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    return send_file(BytesIO(stego_png), mimetype='image/png',
+                     as_attachment=True, download_name='stego.png')
+
+@app.route('/stego/decode', methods=['POST'])
+def stego_decode():
+    image = request.files.get('image')
+    if image is None:
+        return jsonify({'error': 'Missing image upload'}), 400
+
+    try:
+        message = stego.decode_bytes(image.stream)
+    except IMAGE_ERRORS as exc:
+        return jsonify({'error': str(exc)}), 400
+
+    return jsonify({'message': message})
 
 if __name__ == '__main__':
     app.run(debug=True)